@@ -0,0 +1,46 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.scraper import chunk_text, chunk_text_optimal, chunk_text_bounded, count_tokens, html_to_markdown
+from src.config import CHUNK_BODY_TOKENS, OVERLAP_PERCENTAGE
+from benchmarks.bench_clean_html import SAMPLE_BODY, load_bodies
+
+# Usage: python benchmarks/bench_chunk_modes.py [raw_dir]
+# Compares chunk counts and budget fill of the greedy, optimal and bounded chunkers on the same corpus.
+
+def summarize(chunker, texts):
+    chunk_counts = []
+    fills = []
+    for text in texts:
+        chunks = chunker(text, CHUNK_BODY_TOKENS, OVERLAP_PERCENTAGE)
+        chunk_counts.append(len(chunks))
+        fills.extend(count_tokens(chunk) / CHUNK_BODY_TOKENS for chunk in chunks)
+    return chunk_counts, fills
+
+def main():
+    raw_dir = Path(sys.argv[1]) if len(sys.argv) > 1 else Path(__file__).parent.parent / "data" / "raw"
+    bodies = load_bodies(raw_dir) if raw_dir.exists() else []
+    
+    if not bodies:
+        print(f"No article bodies under {raw_dir}, using a synthetic sample")
+        bodies = [SAMPLE_BODY * repeat for repeat in (5, 20, 60, 120)] * 5
+    
+    texts = [html_to_markdown(body) for body in bodies]
+    greedy_counts, greedy_fills = summarize(chunk_text, texts)
+    optimal_counts, optimal_fills = summarize(chunk_text_optimal, texts)
+    
+    fewer = sum(1 for greedy, optimal in zip(greedy_counts, optimal_counts) if optimal < greedy)
+    more = sum(1 for greedy, optimal in zip(greedy_counts, optimal_counts) if optimal > greedy)
+    
+    print(f"Articles:          {len(texts)} (budget {CHUNK_BODY_TOKENS} tokens, overlap {OVERLAP_PERCENTAGE:.0%})")
+    print(f"Greedy chunks:     {sum(greedy_counts):5}  mean fill {sum(greedy_fills) / len(greedy_fills):.0%}")
+    print(f"Optimal chunks:    {sum(optimal_counts):5}  mean fill {sum(optimal_fills) / len(optimal_fills):.0%}")
+    print(f"Saved:             {sum(greedy_counts) - sum(optimal_counts)} chunk(s); fewer in {fewer} article(s), more in {more}")
+    
+    bounded_counts, bounded_fills = summarize(chunk_text_bounded, texts)
+    print(f"Bounded chunks:    {sum(bounded_counts):5}  mean fill {sum(bounded_fills) / len(bounded_fills):.0%}")
+
+if __name__ == "__main__":
+    main()
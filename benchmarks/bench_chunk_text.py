@@ -0,0 +1,112 @@
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import src.scraper as scraper
+from src.scraper import chunk_text, count_tokens, find_backward_safe_split, build_structure_index, html_to_markdown
+from src.config import CHUNK_BODY_TOKENS, OVERLAP_PERCENTAGE
+from benchmarks.bench_clean_html import SAMPLE_BODY, load_bodies
+
+# Usage: python benchmarks/bench_chunk_text.py [raw_dir]
+# Counts tokenizer.encode calls and time per article for chunk_text against the
+# previous chars-per-token estimator, which re-counted every candidate chunk.
+
+def legacy_chunk_text(text, max_tokens=1000, overlap_pct=0.15):
+    if not text or not text.strip():
+        return []
+    
+    total_tokens = count_tokens(text)
+    if total_tokens <= max_tokens:
+        return [text]
+    
+    chunks = []
+    structure_index = build_structure_index(text)
+    overlap_tokens = int(max_tokens * overlap_pct)
+    chars_per_token = len(text) / total_tokens
+    target_chars = int(max_tokens * chars_per_token * 0.9)
+    
+    pos = 0
+    while pos < len(text):
+        end_pos = min(pos + target_chars, len(text))
+        
+        if end_pos < len(text):
+            end_pos = find_backward_safe_split(text, end_pos, structure_index)
+        
+        chunk = text[pos:end_pos].strip()
+        
+        chunk_tokens = count_tokens(chunk)
+        if chunk_tokens > max_tokens * 1.3:
+            while count_tokens(chunk) > max_tokens and len(chunk) > 100:
+                last_space = chunk.rfind(' ', 0, int(len(chunk) * 0.9))
+                if last_space > len(chunk) * 0.5:
+                    chunk = chunk[:last_space]
+                else:
+                    tokens = scraper.get_tokenizer().encode(chunk)
+                    chunk = scraper.get_tokenizer().decode(tokens[:max_tokens])
+                    break
+        
+        if chunk:
+            chunks.append(chunk)
+        
+        if end_pos >= len(text):
+            break
+        
+        overlap_chars = int(overlap_tokens * chars_per_token)
+        pos = max(pos + 1, end_pos - overlap_chars)
+    
+    return chunks
+
+class CountingTokenizer:
+    def __init__(self, tokenizer):
+        self.tokenizer = tokenizer
+        self.encode_calls = 0
+
+    def encode(self, text, *args, **kwargs):
+        self.encode_calls += 1
+        return self.tokenizer.encode(text, *args, **kwargs)
+
+    def encode_batch(self, texts, *args, **kwargs):
+        # One batched call counts once, however many texts it carries
+        self.encode_calls += 1
+        return self.tokenizer.encode_batch(texts, *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.tokenizer, name)
+
+@contextmanager
+def counting_tokenizer():
+    counting = CountingTokenizer(scraper.get_tokenizer())
+    original = scraper.get_tokenizer
+    scraper.get_tokenizer = lambda: counting
+    try:
+        yield counting
+    finally:
+        scraper.get_tokenizer = original
+
+def run(chunker, texts):
+    with counting_tokenizer() as counting:
+        start = time.perf_counter()
+        total_chunks = sum(len(chunker(text, CHUNK_BODY_TOKENS, OVERLAP_PERCENTAGE)) for text in texts)
+        elapsed = time.perf_counter() - start
+    return total_chunks, counting.encode_calls, elapsed
+
+def main():
+    raw_dir = Path(sys.argv[1]) if len(sys.argv) > 1 else Path(__file__).parent.parent / "data" / "raw"
+    bodies = load_bodies(raw_dir) if raw_dir.exists() else []
+    
+    if not bodies:
+        print(f"No article bodies under {raw_dir}, using a synthetic sample")
+        bodies = [SAMPLE_BODY * repeat for repeat in (5, 20, 60, 120)] * 5
+    
+    texts = [html_to_markdown(body) for body in bodies]
+    
+    print(f"Articles: {len(texts)}")
+    for name, chunker in (("Legacy estimator", legacy_chunk_text), ("Encode once", chunk_text)):
+        total_chunks, encode_calls, elapsed = run(chunker, texts)
+        print(f"{name:17} chunks={total_chunks:5}  encode calls={encode_calls:5} ({encode_calls / len(texts):.1f}/article)  {elapsed * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main()
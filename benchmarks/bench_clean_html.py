@@ -0,0 +1,74 @@
+import sys
+import time
+from pathlib import Path
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.scraper import clean_html, HTML_PARSER
+from src.archive import iter_raw_articles
+
+# Usage: python benchmarks/bench_clean_html.py [raw_dir]
+# Times clean_html against the previous one-select-per-selector cleaner on the
+# article bodies saved under data/raw/ by the last sync.
+
+LEGACY_SELECTORS = [
+    'nav', 'header', 'footer',
+    '[class*="nav"]', '[class*="menu"]',
+    '[class*="sidebar"]', '[class*="ad"]',
+    '[id*="nav"]', '[id*="menu"]',
+    '[id*="sidebar"]', '[id*="ad"]',
+    'script', 'style', 'iframe'
+]
+
+SAMPLE_BODY = """
+<nav class="breadcrumbs">Home / Guides</nav>
+<h1 id="getting-started">Getting Started</h1>
+<p>Open the <a href="https://app.optisigns.com">OptiSigns portal</a> and sign in.</p>
+<div class="sidebar-widget"><ul><li>Related</li><li>Popular</li></ul></div>
+<h2>Steps</h2>
+<ol><li>Click <strong>Add Asset</strong></li><li>Choose a file</li><li>Click <em>Save</em></li></ol>
+<div class="ad-slot"><iframe src="https://ads.example.com"></iframe></div>
+<p><img src="https://support.optisigns.com/img.png" alt="Screenshot"></p>
+<pre><code>curl https://api.optisigns.com/v1/screens</code></pre>
+<script>trackPageView();</script>
+"""
+
+def legacy_clean_html(html_content):
+    soup = BeautifulSoup(html_content, 'html.parser')
+    for selector in LEGACY_SELECTORS:
+        for element in soup.select(selector):
+            element.decompose()
+    return str(soup)
+
+def load_bodies(raw_dir):
+    return [article["body"] for article in iter_raw_articles(raw_dir) if article.get("body")]
+
+def best_time(function, bodies, rounds):
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for body in bodies:
+            function(body)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    raw_dir = Path(sys.argv[1]) if len(sys.argv) > 1 else Path(__file__).parent.parent / "data" / "raw"
+    bodies = load_bodies(raw_dir) if raw_dir.exists() else []
+    
+    if not bodies:
+        print(f"No article bodies under {raw_dir}, using a synthetic sample")
+        bodies = [SAMPLE_BODY * 20] * 50
+    
+    legacy = best_time(legacy_clean_html, bodies, rounds=3)
+    current = best_time(clean_html, bodies, rounds=3)
+    
+    print(f"Articles:       {len(bodies)}")
+    print(f"Parser:         {HTML_PARSER}")
+    print(f"Legacy select:  {legacy * 1000:.1f} ms")
+    print(f"Single pass:    {current * 1000:.1f} ms")
+    print(f"Speedup:        {legacy / current:.2f}x")
+
+if __name__ == "__main__":
+    main()
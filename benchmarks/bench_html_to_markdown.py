@@ -0,0 +1,37 @@
+import sys
+from pathlib import Path
+from markdownify import markdownify
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.scraper import clean_html, html_to_markdown, HTML_PARSER
+from benchmarks.bench_clean_html import SAMPLE_BODY, load_bodies, best_time
+
+# Usage: python benchmarks/bench_html_to_markdown.py [raw_dir]
+# Times html_to_markdown against the previous clean_html -> str -> markdownify path.
+
+def legacy_html_to_markdown(html_content):
+    return markdownify(clean_html(html_content), heading_style="ATX")
+
+def main():
+    raw_dir = Path(sys.argv[1]) if len(sys.argv) > 1 else Path(__file__).parent.parent / "data" / "raw"
+    bodies = load_bodies(raw_dir) if raw_dir.exists() else []
+    
+    if not bodies:
+        print(f"No article bodies under {raw_dir}, using a synthetic sample")
+        bodies = [SAMPLE_BODY * 20] * 50
+    
+    mismatches = sum(1 for body in bodies if legacy_html_to_markdown(body) != html_to_markdown(body))
+    
+    legacy = best_time(legacy_html_to_markdown, bodies, rounds=3)
+    current = best_time(html_to_markdown, bodies, rounds=3)
+    
+    print(f"Articles:        {len(bodies)}")
+    print(f"Parser:          {HTML_PARSER}")
+    print(f"Mismatches:      {mismatches}")
+    print(f"Parse twice:     {legacy * 1000:.1f} ms")
+    print(f"Parse once:      {current * 1000:.1f} ms")
+    print(f"Speedup:         {legacy / current:.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import random
+
+# Deterministic article bodies shaped like the three kinds of help-center pages that
+# dominate processing time. The same seed always yields the same HTML, so timings on
+# these bodies can be compared against the baselines in benchmarks/baselines.json.
+
+WORDS = (
+    "screen display player playlist asset schedule upload device content app "
+    "account settings zone layout widget template sync network browser signage "
+    "click select open save choose enable configure preview publish assign"
+).split()
+
+FOOTER = (
+    "<h3>Still need help?</h3>"
+    "<p>Contact our support team at <a href=\"mailto:support@optisigns.com\">support@optisigns.com</a> "
+    "and we will get back to you within one business day.</p>"
+)
+
+def sentence(rng, min_words=8, max_words=20):
+    words = [rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words))]
+    return " ".join(words).capitalize() + "."
+
+def paragraph(rng, sentences=4):
+    return "<p>" + " ".join(sentence(rng) for _ in range(sentences)) + "</p>"
+
+def make_faq_body(seed=1):
+    # A short FAQ answer: a few paragraphs, one list, the standard footer
+    rng = random.Random(seed)
+    steps = "".join(f"<li>{sentence(rng, 4, 10)}</li>" for _ in range(4))
+    return (
+        f"<h2>{sentence(rng, 3, 6)}</h2>"
+        + paragraph(rng, 3)
+        + f"<ol>{steps}</ol>"
+        + paragraph(rng, 2)
+        + FOOTER
+    )
+
+def make_tutorial_body(seed=2, sections=40):
+    # A long tutorial: many headed sections with lists, images and fenced code
+    rng = random.Random(seed)
+    parts = [f"<h1>{sentence(rng, 3, 6)}</h1>", paragraph(rng, 5)]
+    for index in range(sections):
+        parts.append(f"<h2 id=\"step-{index}\">Step {index + 1}: {sentence(rng, 3, 6)}</h2>")
+        parts.append(paragraph(rng, rng.randint(2, 6)))
+        if index % 3 == 0:
+            items = "".join(f"<li>{sentence(rng, 4, 12)}</li>" for _ in range(rng.randint(3, 7)))
+            parts.append(f"<ul>{items}</ul>")
+        if index % 4 == 1:
+            code = "\n".join(f"curl -X POST https://api.optisigns.com/v1/{rng.choice(WORDS)} -d '{{\"id\": {n}}}'" for n in range(rng.randint(3, 10)))
+            parts.append(f"<pre><code>{code}\n\n# {sentence(rng, 3, 6)}\n{code}</code></pre>")
+        if index % 5 == 2:
+            parts.append(f"<p><img src=\"https://support.optisigns.com/hc/step-{index}.png\" alt=\"{sentence(rng, 2, 4)}\"></p>")
+    parts.append(FOOTER)
+    return "".join(parts)
+
+def make_table_body(seed=3, rows=600, columns=6):
+    # A huge reference page: one wide table with short cells and links
+    rng = random.Random(seed)
+    header = "".join(f"<th>{rng.choice(WORDS).capitalize()}</th>" for _ in range(columns))
+    body_rows = []
+    for row in range(rows):
+        cells = [f"<td><a href=\"https://support.optisigns.com/articles/{row}\">{rng.choice(WORDS)}</a></td>"]
+        cells.extend(f"<td>{' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 5)))}</td>" for _ in range(columns - 1))
+        body_rows.append("<tr>" + "".join(cells) + "</tr>")
+    return (
+        f"<h1>{sentence(rng, 3, 6)}</h1>"
+        + paragraph(rng, 2)
+        + f"<table><thead><tr>{header}</tr></thead><tbody>{''.join(body_rows)}</tbody></table>"
+        + FOOTER
+    )
+
+def build_corpora():
+    # name -> list of bodies; several FAQs so per-article overhead shows up
+    return {
+        "faq": [make_faq_body(seed) for seed in range(1, 21)],
+        "tutorial": [make_tutorial_body(seed) for seed in (2, 12)],
+        "table": [make_table_body()],
+    }
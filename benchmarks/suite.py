@@ -0,0 +1,196 @@
+import argparse
+import json
+import re
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.scraper import clean_html, html_to_markdown, chunk_text, find_backward_safe_split, build_structure_index, process_article
+from src.config import CHUNK_BODY_TOKENS, OVERLAP_PERCENTAGE
+from benchmarks.bench_clean_html import load_bodies, best_time
+from benchmarks.bench_chunk_text import counting_tokenizer
+from benchmarks.corpus import build_corpora
+
+# Usage: python benchmarks/suite.py [--raw-dir DIR] [--rounds N] [--threshold 0.5] [--update-baselines]
+# Times the scraper hot paths on the synthetic corpora in benchmarks/corpus.py and
+# exits with status 1 when a case is slower than its baseline by more than the threshold.
+# Timings are stored relative to a fixed pure-Python calibration loop, so a baseline
+# recorded on one machine stays meaningful on another.
+# chunk_text and process_article spend most of their time in the tokenizer's native encode,
+# so they are gated on tokenizer calls per article instead. The budget is fixed by the code's
+# structure, not recorded: how many articles skip the encode depends on the encoding, but no
+# article may go over its budget under any encoding.
+# tests/test_benchmarks.py runs that check with the rest of the test suite.
+
+BASELINES_PATH = Path(__file__).parent / "baselines.json"
+REGRESSION_THRESHOLD = 0.5
+# Cases this small are mostly timer noise and are reported but never gated
+MIN_GATED_RELATIVE = 0.005
+SPLIT_STRIDE = 2000
+# Tokenizer calls allowed per article: chunk_text encodes an article at most once, and
+# process_article adds one count of the title and URL frame and one batched num_tokens count
+TOKENIZER_CALL_BUDGETS = {"chunk_text": 1, "process_article": 3}
+
+def split_at_stride(text):
+    # chunk_text's access pattern: one index per article, one lookup per chunk
+    index = build_structure_index(text)
+    for target in range(SPLIT_STRIDE, len(text), SPLIT_STRIDE):
+        find_backward_safe_split(text, target, index)
+
+def make_cases(work_dir):
+    def process_fresh(article):
+        # A fresh hash store, so every call takes the full ADDED path
+        process_article(article, {"articles": {}}, work_dir, work_dir)
+
+    return {
+        "clean_html": ("html", clean_html),
+        "html_to_markdown": ("html", html_to_markdown),
+        "chunk_text": ("markdown", lambda text: chunk_text(text, CHUNK_BODY_TOKENS, OVERLAP_PERCENTAGE)),
+        "find_backward_safe_split": ("markdown", split_at_stride),
+        "process_article": ("article", process_fresh),
+    }
+
+def make_inputs(bodies):
+    return {
+        "html": bodies,
+        "markdown": [html_to_markdown(body) for body in bodies],
+        "article": [
+            {"id": 900000 + i, "title": f"Benchmark article {i}", "body": body,
+             "html_url": f"https://support.optisigns.com/articles/{900000 + i}", "updated_at": ""}
+            for i, body in enumerate(bodies)
+        ],
+    }
+
+def calibrate(rounds):
+    text = " ".join(build_corpora()["faq"])
+
+    def workload(sample):
+        for _ in range(50):
+            sorted(re.findall(r'\w+', sample))
+
+    return best_time(workload, [text], rounds)
+
+def run_suite(corpora, rounds, work_dir):
+    calibration = calibrate(rounds)
+    results = {}
+
+    for case, (kind, function) in make_cases(work_dir).items():
+        results[case] = {}
+        for corpus, bodies in corpora.items():
+            inputs = make_inputs(bodies)[kind]
+            elapsed = best_time(function, inputs, rounds)
+            megabytes = sum(len(body.encode('utf-8')) for body in bodies) / 1_000_000
+            results[case][corpus] = {
+                "per_article_ms": elapsed * 1000 / len(bodies),
+                "per_mb_ms": elapsed * 1000 / megabytes,
+                "relative": elapsed / calibration,
+            }
+
+    return results
+
+def count_tokenizer_calls(corpora, work_dir):
+    # case -> corpus -> encode and encode_batch calls for the whole corpus
+    cases = make_cases(work_dir)
+    counts = {}
+
+    for case in TOKENIZER_CALL_BUDGETS:
+        kind, function = cases[case]
+        counts[case] = {}
+        for corpus, bodies in corpora.items():
+            inputs = make_inputs(bodies)[kind]
+            with counting_tokenizer() as counting:
+                for item in inputs:
+                    function(item)
+            counts[case][corpus] = counting.encode_calls
+
+    return counts
+
+def find_call_regressions(counts, corpora):
+    # Any call over the budget is a regression: the counts are exact, so there is no noise to allow for
+    regressions = []
+    for case, case_counts in counts.items():
+        for corpus, calls in case_counts.items():
+            budget = TOKENIZER_CALL_BUDGETS[case] * len(corpora[corpus])
+            if calls > budget:
+                regressions.append((case, corpus, calls, budget))
+    return regressions
+
+def find_regressions(results, baselines, threshold=REGRESSION_THRESHOLD):
+    regressions = []
+    for case, corpora in results.items():
+        for corpus, result in corpora.items():
+            baseline = baselines.get(case, {}).get(corpus)
+            if baseline is None or baseline < MIN_GATED_RELATIVE:
+                continue
+            if result["relative"] > baseline * (1 + threshold):
+                regressions.append((case, corpus, result["relative"], baseline))
+    return regressions
+
+def load_baselines(path=BASELINES_PATH):
+    if not path.exists():
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_baselines(results, path=BASELINES_PATH):
+    baselines = load_baselines(path)
+    for case, corpora in results.items():
+        for corpus, result in corpora.items():
+            if corpus != "recorded":
+                baselines.setdefault(case, {})[corpus] = round(result["relative"], 4)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(baselines, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--raw-dir", type=Path, help="also time recorded bodies from a data/raw folder (never baselined)")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    parser.add_argument("--update-baselines", action="store_true")
+    args = parser.parse_args()
+
+    corpora = build_corpora()
+    if args.raw_dir:
+        recorded = load_bodies(args.raw_dir)
+        if recorded:
+            corpora["recorded"] = recorded
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        results = run_suite(corpora, args.rounds, Path(work_dir))
+    with tempfile.TemporaryDirectory() as work_dir:
+        counts = count_tokenizer_calls(corpora, Path(work_dir))
+
+    baselines = load_baselines()
+    print(f"{'case':26}{'corpus':10}{'ms/article':>12}{'ms/MB':>12}{'relative':>10}{'baseline':>10}")
+    for case, corpora_results in results.items():
+        for corpus, result in corpora_results.items():
+            baseline = baselines.get(case, {}).get(corpus)
+            baseline_text = f"{baseline:.4f}" if baseline is not None else "-"
+            print(f"{case:26}{corpus:10}{result['per_article_ms']:12.2f}{result['per_mb_ms']:12.1f}{result['relative']:10.4f}{baseline_text:>10}")
+
+    print(f"\n{'case':26}{'corpus':10}{'tokenizer calls':>16}{'budget':>10}")
+    for case, corpora_counts in counts.items():
+        for corpus, calls in corpora_counts.items():
+            budget = TOKENIZER_CALL_BUDGETS[case] * len(corpora[corpus])
+            print(f"{case:26}{corpus:10}{calls:16}{budget:>10}")
+
+    if args.update_baselines:
+        save_baselines(results)
+        print(f"Baselines written to {BASELINES_PATH}")
+        return
+
+    regressions = find_regressions(results, baselines, args.threshold)
+    for case, corpus, relative, baseline in regressions:
+        print(f"REGRESSION {case} on {corpus}: {relative:.4f} vs baseline {baseline:.4f} (+{relative / baseline - 1:.0%})")
+    call_regressions = find_call_regressions(counts, corpora)
+    for case, corpus, calls, budget in call_regressions:
+        print(f"REGRESSION {case} on {corpus}: {calls} tokenizer calls vs budget {budget}")
+    regressions += call_regressions
+    if regressions:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
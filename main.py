@@ -1,6 +1,38 @@
+import argparse
+import sys
+from pathlib import Path
+from src.archive import compact_archives
 from src.scraper import *
 from src.uploader import *
 
 if __name__ == "__main__":
-    changed_articles = scraper()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--probe", action="store_true", help="exit early when no article changed since the last sync")
+    parser.add_argument("--workers", type=int, default=1, help="number of processes used to process articles")
+    parser.add_argument("--time-budget", type=float, help="stop processing after this many seconds and resume on the next run")
+    parser.add_argument("--boilerplate-report", action="store_true", help="report tokens and chunks saved by stripping repeated paragraphs, then exit")
+    parser.add_argument("--sweep-chunks", action="store_true", help="rebuild the chunk manifests, delete orphaned chunk files, then exit")
+    parser.add_argument("--compact", action="store_true", help="compact the packed raw and markdown archives, then exit")
+    args = parser.parse_args()
+    
+    if args.compact:
+        data_dir = Path(__file__).parent / "data"
+        reclaimed = compact_archives([data_dir / "raw", data_dir / "markdown"])
+        print(f"Compacted archives, reclaimed {reclaimed} bytes")
+        sys.exit(0)
+    
+    if args.sweep_chunks:
+        sweep_chunks()
+        sys.exit(0)
+    
+    if args.boilerplate_report:
+        report_boilerplate()
+        sys.exit(0)
+    
+    # --probe: read only the newest article and exit when nothing changed since the last sync
+    if args.probe and not probe_updates():
+        print("No articles updated since last sync, skipping")
+        sys.exit(0)
+    
+    changed_articles = scraper(workers=args.workers, time_budget=args.time_budget)
     uploader(changed_articles=changed_articles)
\ No newline at end of file
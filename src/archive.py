@@ -0,0 +1,388 @@
+import json
+import os
+import re
+import struct
+import zlib
+from contextlib import contextmanager
+from itertools import groupby
+from pathlib import Path
+from .config import STORAGE_FORMAT, PACKED_SEGMENT_BYTES, PACKED_COMPACT_RATIO
+from .write_behind import WriteBehind, apply_operation
+
+# Raw articles and chunk files go through here. With STORAGE_FORMAT = "files" every
+# article is one JSON file in data/raw and every chunk one .md file in data/markdown.
+# With "packed" they are zlib-compressed records appended to a few segment files in
+# the same folders, found through an offset index:
+#   raw article   -> key "raw/{article_id}"
+#   chunk file    -> key "chunk/{article_id}/{part}"
+# Chunk paths keep their usual names, so the journal and the uploader don't change.
+
+RECORD_MAGIC = b"OPK1"
+# magic, kind, key length, payload length, crc32 of the payload
+RECORD_HEADER = struct.Struct(">4sBHII")
+PUT, DELETE = 0, 1
+SEGMENT_PATTERN = "segment-*.pack"
+INDEX_FILE = "index.json"
+CHUNK_PART_PATTERN = re.compile(r'^(\d+)-.*-part(\d+)\.md$')
+
+class PackedArchive:
+    def __init__(self, directory, segment_bytes=PACKED_SEGMENT_BYTES):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_bytes = segment_bytes
+        # key -> (segment name, record offset, record length)
+        self.entries = {}
+        self.segment_sizes = {}
+        self.dead_bytes = 0
+        self.writer = None
+        self.dirty = False
+        self.load_index()
+
+    def segment_path(self, name):
+        return self.directory / name
+
+    def segment_names(self):
+        return sorted(path.name for path in self.directory.glob(SEGMENT_PATTERN))
+
+    def load_index(self):
+        index_path = self.directory / INDEX_FILE
+        if index_path.exists():
+            with open(index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            self.entries = {key: tuple(entry) for key, entry in index["entries"].items()}
+            self.segment_sizes = index["segments"]
+            self.dead_bytes = index["dead_bytes"]
+
+        # Records appended after the index was last written (a crash, a killed job) are
+        # recovered by scanning each segment from where the index stopped
+        for name in self.segment_names():
+            self.scan_segment(name, self.segment_sizes.get(name, 0))
+        self.segment_sizes = {name: size for name, size in self.segment_sizes.items() if self.segment_path(name).exists()}
+
+    def scan_segment(self, name, offset):
+        path = self.segment_path(name)
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            while True:
+                header = f.read(RECORD_HEADER.size)
+                if len(header) < RECORD_HEADER.size:
+                    break
+                magic, kind, key_length, payload_length, crc = RECORD_HEADER.unpack(header)
+                key_bytes = f.read(key_length)
+                payload = f.read(payload_length)
+                if magic != RECORD_MAGIC or len(key_bytes) < key_length or len(payload) < payload_length or zlib.crc32(payload) != crc:
+                    break
+                self.apply_record(key_bytes.decode('utf-8'), kind, name, offset, f.tell() - offset)
+                offset = f.tell()
+
+        # A torn record at the end is dropped so new records are never appended after garbage
+        if offset < path.stat().st_size:
+            with open(path, 'r+b') as f:
+                f.truncate(offset)
+        self.segment_sizes[name] = offset
+
+    def apply_record(self, key, kind, name, offset, length):
+        previous = self.entries.pop(key, None)
+        if previous is not None:
+            self.dead_bytes += previous[2]
+        if kind == PUT:
+            self.entries[key] = (name, offset, length)
+        else:
+            self.dead_bytes += length
+
+    def open_writer(self, new_segment=False):
+        names = self.segment_names()
+        if names and not new_segment and self.segment_sizes.get(names[-1], 0) < self.segment_bytes:
+            name = names[-1]
+        else:
+            number = int(names[-1][len("segment-"):-len(".pack")]) + 1 if names else 1
+            name = f"segment-{number:06d}.pack"
+            self.segment_sizes[name] = 0
+        self.writer = (name, open(self.segment_path(name), 'ab'))
+
+    def append(self, key, kind, payload=b""):
+        if self.writer is None or self.segment_sizes[self.writer[0]] >= self.segment_bytes:
+            self.close_writer()
+            self.open_writer()
+
+        name, f = self.writer
+        key_bytes = key.encode('utf-8')
+        record = RECORD_HEADER.pack(RECORD_MAGIC, kind, len(key_bytes), len(payload), zlib.crc32(payload)) + key_bytes + payload
+        offset = self.segment_sizes[name]
+        f.write(record)
+        self.segment_sizes[name] = offset + len(record)
+        self.apply_record(key, kind, name, offset, len(record))
+        self.dirty = True
+
+    def put(self, key, data):
+        self.append(key, PUT, zlib.compress(data))
+
+    def delete(self, key):
+        if key in self.entries:
+            self.append(key, DELETE)
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if self.writer is not None:
+            self.writer[1].flush()
+
+        name, offset, length = entry
+        with open(self.segment_path(name), 'rb') as f:
+            f.seek(offset)
+            record = f.read(length)
+        _, _, key_length, _, crc = RECORD_HEADER.unpack_from(record)
+        payload = record[RECORD_HEADER.size + key_length:]
+        if zlib.crc32(payload) != crc:
+            raise ValueError(f"Corrupt record for {key} in {name} at offset {offset}")
+        return zlib.decompress(payload)
+
+    def keys(self, prefix=""):
+        return [key for key in self.entries if key.startswith(prefix)]
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def close_writer(self):
+        if self.writer is not None:
+            self.writer[1].close()
+            self.writer = None
+
+    def flush(self):
+        # Makes appended records durable; the hash store is only checkpointed after this
+        if self.writer is not None:
+            self.writer[1].flush()
+            os.fsync(self.writer[1].fileno())
+
+    def save_index(self):
+        self.flush()
+        index_path = self.directory / INDEX_FILE
+        temp_path = index_path.with_suffix(".tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({"segments": self.segment_sizes, "dead_bytes": self.dead_bytes, "entries": self.entries}, f)
+        os.replace(temp_path, index_path)
+        self.dirty = False
+
+    def total_bytes(self):
+        return sum(self.segment_sizes.values())
+
+    def compact(self):
+        # Copies live records into fresh segments and drops the old ones; returns bytes reclaimed.
+        # Until the old segments are deleted, a crash leaves duplicates that the index scan resolves.
+        self.close_writer()
+        before = self.total_bytes()
+        old_names = self.segment_names()
+        live = sorted(self.entries.items(), key=lambda item: (item[1][0], item[1][1]))
+
+        self.open_writer(new_segment=True)
+        for name, records in groupby(live, key=lambda item: item[1][0]):
+            with open(self.segment_path(name), 'rb') as source:
+                for key, (_, offset, length) in records:
+                    source.seek(offset)
+                    record = source.read(length)
+                    if self.segment_sizes[self.writer[0]] >= self.segment_bytes:
+                        self.close_writer()
+                        self.open_writer(new_segment=True)
+                    new_name, f = self.writer
+                    f.write(record)
+                    self.entries[key] = (new_name, self.segment_sizes[new_name], length)
+                    self.segment_sizes[new_name] += length
+
+        self.dead_bytes = 0
+        for name in old_names:
+            self.segment_sizes.pop(name, None)
+        self.save_index()
+        self.close_writer()
+        for name in old_names:
+            self.segment_path(name).unlink()
+
+        return before - self.total_bytes()
+
+    def close(self):
+        if self.dirty:
+            self.save_index()
+        self.close_writer()
+
+_archives = {}
+# Set in pool workers: writes are collected here and applied by the parent process,
+# which is the only one that appends to the segments
+_deferred_writes = None
+# Set while the scraper runs: loose files are written by a background thread
+_write_behind = None
+
+def is_packed():
+    return STORAGE_FORMAT == "packed"
+
+def open_archive(directory):
+    directory = Path(directory)
+    if directory not in _archives:
+        _archives[directory] = PackedArchive(directory)
+    return _archives[directory]
+
+def flush_archives():
+    # Raises if a background write failed, so the caller never commits records for missing files
+    wait_for_writes()
+    for archive in _archives.values():
+        archive.flush()
+
+def close_archives():
+    # Writes the offset indexes and compacts archives that are mostly dead records
+    for archive in _archives.values():
+        if archive.dead_bytes > archive.total_bytes() * PACKED_COMPACT_RATIO:
+            archive.compact()
+        archive.close()
+    _archives.clear()
+
+def compact_archives(directories):
+    reclaimed = 0
+    for directory in directories:
+        reclaimed += open_archive(directory).compact()
+    close_archives()
+    return reclaimed
+
+@contextmanager
+def defer_writes():
+    global _deferred_writes
+    _deferred_writes = []
+    try:
+        yield _deferred_writes
+    finally:
+        _deferred_writes = None
+
+@contextmanager
+def write_behind():
+    # Loose-file writes inside the block go to a background thread. Leaving the block
+    # normally waits for them and raises if one failed; an exception drops what is still queued.
+    global _write_behind
+    stage = WriteBehind()
+    _write_behind = stage
+    try:
+        yield stage
+        stage.flush()
+    finally:
+        _write_behind = None
+        stage.close(discard=True)
+
+def wait_for_writes():
+    if _write_behind is not None:
+        _write_behind.flush()
+
+def write_file(path, data):
+    if _write_behind is not None:
+        _write_behind.write(path, data)
+    else:
+        apply_operation(path, data)
+
+def delete_file(path):
+    if _write_behind is not None:
+        _write_behind.delete(path)
+    else:
+        path.unlink(missing_ok=True)
+
+def apply_writes(writes):
+    for operation, *args in writes:
+        WRITE_OPERATIONS[operation](*args)
+
+def chunk_key(chunk_path):
+    match = CHUNK_PART_PATTERN.match(Path(chunk_path).name)
+    if match is None:
+        return None
+    return f"chunk/{match.group(1)}/{int(match.group(2))}"
+
+def write_raw_article(article, raw_path):
+    if _deferred_writes is not None:
+        _deferred_writes.append(("write_raw_article", article, raw_path))
+        return
+
+    if is_packed():
+        payload = json.dumps(article, ensure_ascii=False).encode('utf-8')
+        open_archive(raw_path.parent).put(f"raw/{article['id']}", payload)
+        return
+
+    write_file(raw_path, json.dumps(article, ensure_ascii=False, indent=2).encode('utf-8'))
+
+def read_raw_article(article_id, raw_data_dir, raw_file=None):
+    # raw_file is the name the article's hash record stores; without it only an
+    # unambiguous loose file is read, since a renamed article may have left its old slug behind
+    wait_for_writes()
+    if is_packed():
+        payload = open_archive(raw_data_dir).get(f"raw/{article_id}")
+        if payload is not None:
+            return json.loads(payload)
+
+    if raw_file is None:
+        raw_paths = list(raw_data_dir.glob(f"{article_id}-*.json"))
+        if len(raw_paths) != 1:
+            return None
+        raw_path = raw_paths[0]
+    else:
+        raw_path = raw_data_dir / raw_file
+
+    try:
+        with open(raw_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def iter_raw_files(article_id, raw_data_dir):
+    # (file name, article) for each loose raw file of one article
+    wait_for_writes()
+    for path in sorted(raw_data_dir.glob(f"{article_id}-*.json")):
+        with open(path, 'r', encoding='utf-8') as f:
+            yield path.name, json.load(f)
+
+def iter_raw_articles(raw_data_dir):
+    raw_data_dir = Path(raw_data_dir)
+    if is_packed():
+        archive = open_archive(raw_data_dir)
+        for key in sorted(archive.keys("raw/")):
+            yield json.loads(archive.get(key))
+
+    for path in sorted(raw_data_dir.glob("*.json")):
+        with open(path, 'r', encoding='utf-8') as f:
+            yield json.load(f)
+
+def write_chunk(chunk_path, text):
+    if _deferred_writes is not None:
+        _deferred_writes.append(("write_chunk", chunk_path, text))
+        return
+
+    key = chunk_key(chunk_path) if is_packed() else None
+    if key is not None:
+        open_archive(chunk_path.parent).put(key, text.encode('utf-8'))
+        return
+
+    write_file(chunk_path, text.encode('utf-8'))
+
+def read_chunk(chunk_path):
+    wait_for_writes()
+    # Loose files win, so chunks written before switching to "packed" stay readable
+    key = chunk_key(chunk_path) if is_packed() else None
+    if key is not None and not Path(chunk_path).exists():
+        data = open_archive(chunk_path.parent).get(key)
+        if data is not None:
+            return data
+
+    with open(chunk_path, 'rb') as f:
+        return f.read()
+
+def delete_packed_chunks(article_id, markdown_dir):
+    # Loose chunk files are removed by the caller; this drops the article's packed chunks
+    if _deferred_writes is not None:
+        _deferred_writes.append(("delete_packed_chunks", article_id, markdown_dir))
+        return
+
+    if is_packed():
+        # Parts are always written as 1..n, so this stops at the first missing one
+        archive = open_archive(markdown_dir)
+        part = 1
+        while f"chunk/{article_id}/{part}" in archive:
+            archive.delete(f"chunk/{article_id}/{part}")
+            part += 1
+
+WRITE_OPERATIONS = {
+    "write_raw_article": write_raw_article,
+    "write_chunk": write_chunk,
+    "delete_packed_chunks": delete_packed_chunks,
+}
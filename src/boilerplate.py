@@ -0,0 +1,120 @@
+import re
+from collections import Counter
+from .config import BOILERPLATE_MIN_ARTICLES, BOILERPLATE_MIN_CHARS
+from .helper import calculate_content_hash
+from .store import HashStore
+
+# Paragraphs are fingerprinted per article in the hash store ("paragraph_fingerprints").
+# Counted over every record they form the corpus-wide frequency index, which the SQLite
+# store persists and adjusts as records change; paragraphs that appear in at least
+# BOILERPLATE_MIN_ARTICLES articles are stripped before chunking, when that is set.
+
+BLANK_LINE_PATTERN = re.compile(r'\n[^\S\n]*\n')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+def split_paragraphs(markdown):
+    # Returns (start, end) spans of blank-line separated blocks; a fenced code block stays one block
+    spans = []
+    start = None
+    in_fence = False
+    pos = 0
+
+    for line in markdown.splitlines(keepends=True):
+        stripped = line.strip()
+        if stripped.startswith('```'):
+            in_fence = not in_fence
+
+        if not stripped and not in_fence:
+            if start is not None:
+                spans.append((start, pos))
+                start = None
+        elif start is None:
+            start = pos
+        pos += len(line)
+
+    if start is not None:
+        spans.append((start, pos))
+
+    return spans
+
+def paragraph_fingerprint(paragraph):
+    # Headings, code and short lines are never treated as boilerplate
+    text = WHITESPACE_PATTERN.sub(' ', paragraph).strip().lower()
+    if len(text) < BOILERPLATE_MIN_CHARS or text.startswith(('#', '```')):
+        return None
+    return calculate_content_hash(text)[:16]
+
+def paragraph_fingerprints(markdown):
+    fingerprints = {paragraph_fingerprint(markdown[start:end]) for start, end in split_paragraphs(markdown)}
+    fingerprints.discard(None)
+    return sorted(fingerprints)
+
+def count_paragraph_fingerprints(hash_store, min_articles=1, fingerprints=None):
+    # min_articles leaves out the long tail of paragraphs that appear only once or twice;
+    # fingerprints, when given, limits the counts to those paragraphs
+    if isinstance(hash_store, HashStore):
+        return hash_store.paragraph_counts(min_articles, fingerprints)
+
+    # Plain dict stores (tests, benchmarks) have no persisted index, so sum their records
+    counts = Counter()
+    for record in hash_store.get("articles", {}).values():
+        counts.update(record.get("paragraph_fingerprints", []))
+    return Counter({
+        fingerprint: count for fingerprint, count in counts.items()
+        if count >= min_articles and (fingerprints is None or fingerprint in fingerprints)
+    })
+
+def count_run_fingerprints(hash_store, fetched, min_articles=1):
+    # fetched maps article id -> fingerprints of the articles a run is about to process.
+    # Their stored fingerprints are swapped for these, so the counts are what the hash store
+    # will hold once the run has committed them.
+    counts = count_paragraph_fingerprints(hash_store, min_articles)
+    stored = {}
+    for article_id in fetched:
+        record = hash_store["articles"].get(article_id)
+        stored[article_id] = record.get("paragraph_fingerprints", []) if record else []
+    
+    touched = set().union(*fetched.values(), *stored.values())
+    touched_counts = count_paragraph_fingerprints(hash_store, 1, touched)
+    for article_id, fingerprints in fetched.items():
+        touched_counts.subtract(stored[article_id])
+        touched_counts.update(fingerprints)
+    
+    for fingerprint in touched:
+        counts.pop(fingerprint, None)
+        if touched_counts[fingerprint] >= min_articles:
+            counts[fingerprint] = touched_counts[fingerprint]
+    return counts
+
+def find_unindexed_articles(hash_store):
+    # Records written before boilerplate detection, which have no paragraph_fingerprints yet
+    if isinstance(hash_store, HashStore):
+        return hash_store["articles"].without_fingerprints()
+    return [article_id for article_id, record in hash_store["articles"].items() if "paragraph_fingerprints" not in record]
+
+def find_restrip_articles(hash_store, boilerplate):
+    if isinstance(hash_store, HashStore):
+        return hash_store["articles"].restrip_candidates(boilerplate, lambda record: needs_restrip(record, boilerplate))
+    return [article_id for article_id, record in hash_store["articles"].items() if needs_restrip(record, boilerplate)]
+
+def find_boilerplate(counts, min_articles=BOILERPLATE_MIN_ARTICLES):
+    if min_articles <= 0:
+        return frozenset()
+    return frozenset(fingerprint for fingerprint, count in counts.items() if count >= min_articles)
+
+def needs_restrip(record, boilerplate):
+    # True when the boilerplate set changed since this article's chunks were written
+    expected = set(record.get("paragraph_fingerprints", [])) & boilerplate
+    return set(record.get("stripped_paragraphs", [])) != expected
+
+def strip_boilerplate(markdown, boilerplate):
+    if not boilerplate:
+        return markdown
+
+    spans = split_paragraphs(markdown)
+    kept = [markdown[start:end].rstrip('\n') for start, end in spans
+            if paragraph_fingerprint(markdown[start:end]) not in boilerplate]
+
+    if len(kept) == len(spans):
+        return markdown
+    return "\n\n".join(kept)
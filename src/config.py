@@ -6,8 +6,58 @@ BATCH_SIZE = 500
 CHUNK_BODY_TOKENS = 800
 MAX_CHUNK_TOKENS = CHUNK_BODY_TOKENS + 100
 OVERLAP_PERCENTAGE = 0.15
+# "greedy": split at the last safe point before each chunk fills up
+# "optimal": pick the boundary set with the fewest chunks (see chunk_text_optimal)
+# "bounded": fixed stride with a boundary search near each chunk end; guaranteed progress on any input
+CHUNKING_MODE = "greedy"
+# bounded mode cuts the rest of an article at raw token offsets once it spends this long on it
+CHUNK_TIME_BUDGET_SECONDS = 2.0
+# BeautifulSoup parser for article HTML. "lxml" parses faster but repairs malformed markup
+# differently, which changes the markdown and content hashes: switching re-uploads every article
+HTML_PARSER = "html.parser"
+# Paragraphs repeated in at least this many articles are stripped before chunking. Off (0) by
+# default: shared troubleshooting steps repeat too, and stripping removes every copy of them
+BOILERPLATE_MIN_ARTICLES = 0
+# --boilerplate-report previews this threshold while stripping is off
+BOILERPLATE_REPORT_MIN_ARTICLES = 5
+BOILERPLATE_MIN_CHARS = 40
+# The vector store embeds chunks with this model. Chunks are sized in its encoding, so the
+# server-side MAX_CHUNK_TOKENS limit counts the same tokens we do and never re-splits a chunk
+EMBEDDING_MODEL = "text-embedding-3-large"
+TOKENIZER_MODEL = EMBEDDING_MODEL
+# Pinned BPE file per encoding: (url, sha256). The one TOKENIZER_MODEL uses is baked into the image
+TOKENIZER_ENCODINGS = {
+    "cl100k_base": (
+        "https://openaipublic.blob.core.windows.net/encodings/cl100k_base.tiktoken",
+        "223921b76ee99bde995b7ff738513eef100fb51d18c93597a113bcffe865b2a7"
+    ),
+    "o200k_base": (
+        "https://openaipublic.blob.core.windows.net/encodings/o200k_base.tiktoken",
+        "446a9538cb6c348e3516120d7c08b09f57c36495e2acfffe59a5bf8b0cfb1a2d"
+    ),
+}
+TOKENIZER_THREADS = 8
+TOKEN_COUNT_BATCH_ARTICLES = 32
+# "files": one JSON file per article in data/raw and one .md file per chunk in data/markdown
+# "packed": compressed append-only segment files in the same folders (see src/archive.py)
+STORAGE_FORMAT = "files"
+PACKED_SEGMENT_BYTES = 64 * 1024 * 1024
+# Archives are compacted when dead records take more than this share of their segments
+PACKED_COMPACT_RATIO = 0.5
+# Raw and chunk files queued for the background writer before processing waits for it
+WRITE_BEHIND_MAX_PENDING = 256
+# The scraper commits finished articles to the hash store at least this often
+CHECKPOINT_ARTICLES = 100
+FETCH_WORKERS = 8
+FETCH_QUEUE_SIZE = 200
+FETCH_MAX_RETRIES = 5
+FETCH_BACKOFF_BASE = 1
+FETCH_BACKOFF_MAX = 60
+# (connect, read) seconds for every API request; a stalled socket is retried like a 5xx
+FETCH_TIMEOUT = (10, 60)
 VECTOR_STORE_ID="vs_695d0cc82a1481919b47306479820757"
 RAW_DATA_BASE_URL="support.optisigns.com"
+API_BASE_URL=f"https://{RAW_DATA_BASE_URL}/api/v2/help_center"
 
 # Environment Modes:
 # - Production (ENV = "production"): Scrapes all articles from the API for full data sync
@@ -0,0 +1,267 @@
+import requests
+import hashlib
+import json
+import os
+import queue
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from requests.adapters import HTTPAdapter
+from .config import FETCH_MAX_RETRIES, FETCH_BACKOFF_BASE, FETCH_BACKOFF_MAX, FETCH_TIMEOUT
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+# Only these mean Zendesk is shedding load; other retries back off without cutting concurrency
+THROTTLE_STATUS_CODES = {429, 503}
+RETRYABLE_ERRORS = (requests.ConnectionError, requests.Timeout)
+
+class FetchThrottle:
+    # AIMD concurrency shared by every page fetch in one crawl: halve the
+    # in-flight limit when Zendesk throttles us, grow it by one after a full
+    # window of successful requests
+    def __init__(self, max_concurrency):
+        self.max_concurrency = max(1, max_concurrency)
+        self.concurrency = self.max_concurrency
+        self.throttled_count = 0
+        self.throttled_seconds = 0.0
+        self.successes = 0
+        self.lock = threading.Lock()
+
+    def on_success(self):
+        with self.lock:
+            self.successes += 1
+            if self.successes >= self.concurrency:
+                self.successes = 0
+                self.concurrency = min(self.max_concurrency, self.concurrency + 1)
+
+    def on_throttle(self, delay):
+        with self.lock:
+            self.successes = 0
+            self.concurrency = max(1, self.concurrency // 2)
+            self.throttled_count += 1
+            self.throttled_seconds += delay
+
+def create_session(pool_size, headers=None):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    
+    if headers:
+        session.headers.update(headers)
+    
+    return session
+
+def get_zendesk_auth():
+    email = os.getenv("ZENDESK_EMAIL")
+    api_token = os.getenv("ZENDESK_API_TOKEN")
+    
+    if not email or not api_token:
+        return None
+    
+    return (f"{email}/token", api_token)
+
+def get_cache_path(cache_dir, url):
+    url_hash = hashlib.sha256(url.encode('utf-8')).hexdigest()
+    return cache_dir / f"{url_hash}.json"
+
+def load_cached_page(cache_dir, url):
+    cache_path = get_cache_path(cache_dir, url)
+    
+    if not cache_path.exists():
+        return None
+    
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    
+    return cached if cached.get("url") == url else None
+
+def save_cached_page(cache_dir, url, response_headers, data):
+    etag = response_headers.get("ETag")
+    last_modified = response_headers.get("Last-Modified")
+    
+    # Nothing to revalidate against next time, so don't keep the body around
+    if not etag and not last_modified:
+        return
+    
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    cache_path = get_cache_path(cache_dir, url)
+    tmp_path = cache_path.with_suffix(".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "body": data
+        }, f, ensure_ascii=False)
+    tmp_path.replace(cache_path)
+
+def get_retry_delay(response, attempt):
+    retry_after = response.headers.get("Retry-After")
+    
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
+        
+        try:
+            retry_at = parsedate_to_datetime(retry_after)
+            return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            pass
+    
+    return get_backoff_delay(attempt)
+
+def get_backoff_delay(attempt):
+    # Full jitter keeps concurrent workers from retrying in lockstep
+    return random.uniform(0, min(FETCH_BACKOFF_MAX, FETCH_BACKOFF_BASE * 2 ** attempt))
+
+def fetch_page(session, url, cache_dir=None, throttle=None):
+    cached = load_cached_page(cache_dir, url) if cache_dir else None
+    
+    headers = {}
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+    
+    for attempt in range(FETCH_MAX_RETRIES + 1):
+        try:
+            response = session.get(url, headers=headers, timeout=FETCH_TIMEOUT)
+        except RETRYABLE_ERRORS:
+            if attempt == FETCH_MAX_RETRIES:
+                raise
+            delay = get_backoff_delay(attempt)
+        else:
+            if response.status_code not in RETRYABLE_STATUS_CODES or attempt == FETCH_MAX_RETRIES:
+                break
+            delay = get_retry_delay(response, attempt)
+            if throttle and response.status_code in THROTTLE_STATUS_CODES:
+                throttle.on_throttle(delay)
+        
+        time.sleep(delay)
+    
+    if throttle and response.status_code not in RETRYABLE_STATUS_CODES:
+        throttle.on_success()
+    
+    if cached and response.status_code == 304:
+        return cached["body"]
+    
+    response.raise_for_status()
+    data = response.json()
+    
+    if cache_dir:
+        save_cached_page(cache_dir, url, response.headers, data)
+    
+    return data
+
+def build_page_url(url, page):
+    parts = urlsplit(url)
+    query = [(key, value) for key, value in parse_qsl(parts.query) if key != "page"]
+    query.append(("page", str(page)))
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+def iter_all_pages(session, url, workers, cache_dir=None, throttle=None):
+    if throttle is None:
+        throttle = FetchThrottle(workers)
+    
+    first_page = fetch_page(session, url, cache_dir, throttle)
+    page_count = first_page.get("page_count")
+    yield first_page.get("articles", [])
+    
+    # Without page_count we can't know the remaining URLs up front, so walk next_page
+    if not page_count:
+        next_url = first_page.get("next_page")
+        while next_url:
+            data = fetch_page(session, next_url, cache_dir, throttle)
+            yield data.get("articles", [])
+            next_url = data.get("next_page")
+        return
+    
+    page_urls = [build_page_url(url, page) for page in range(2, page_count + 1)]
+    workers = max(1, workers)
+    
+    # Keep at most workers pages in flight (fewer while throttled) and yield them in page order,
+    # so article order stays deterministic and memory doesn't grow with the catalog
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = []
+        for page_url in page_urls:
+            while pending and len(pending) >= min(workers, throttle.concurrency):
+                yield pending.pop(0).result().get("articles", [])
+            pending.append(executor.submit(fetch_page, session, page_url, cache_dir, throttle))
+        
+        for future in pending:
+            yield future.result().get("articles", [])
+
+def fetch_all_pages(session, url, workers, cache_dir=None, throttle=None):
+    all_articles = []
+    for page_articles in iter_all_pages(session, url, workers, cache_dir, throttle):
+        all_articles.extend(page_articles)
+    return all_articles
+
+def iter_incremental_pages(session, url, state, throttle=None):
+    end_time = None
+    
+    while True:
+        data = fetch_page(session, url, throttle=throttle)
+        page_articles = data.get("articles", [])
+        end_time = data.get("end_time", end_time)
+        yield page_articles
+        
+        # Cursor exports use after_url, time-based exports use next_page
+        next_url = data.get("after_url") or data.get("next_page")
+        
+        if data.get("end_of_stream") or not page_articles or not next_url or next_url == url:
+            state["end_time"] = end_time
+            state["cursor"] = next_url or url
+            return
+        
+        url = next_url
+
+def prefetch(iterable, maxsize):
+    # Drive `iterable` from a background thread through a bounded queue, so the
+    # next pages download while the caller is still busy with earlier items
+    buffer = queue.Queue(maxsize=max(1, maxsize))
+    stopped = threading.Event()
+    done = object()
+    
+    def put(item):
+        while not stopped.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def produce():
+        try:
+            for item in iterable:
+                if not put((item, None)):
+                    return
+            put((done, None))
+        except BaseException as e:
+            put((done, e))
+    
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    
+    try:
+        while True:
+            item, error = buffer.get()
+            if error is not None:
+                raise error
+            if item is done:
+                return
+            yield item
+    finally:
+        stopped.set()
+        producer.join()
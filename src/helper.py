@@ -1,22 +1,37 @@
 import hashlib
-import json
+from .store import HashStore, open_hash_store
 
 def calculate_content_hash(content):
     return hashlib.md5(content.encode('utf-8')).hexdigest()
 
+def calculate_source_hash(title, url, body):
+    return calculate_content_hash("\x00".join([title, url, body]))
+
 def load_hash_store(data_dir):
-    hash_store_path = data_dir / "hash_store.json"
-    
-    if hash_store_path.exists():
-        with open(hash_store_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    
-    return {
-        "last_fetching_time": None,
-        "articles": {}
-    }
+    # Opens data/hash_store.db, importing a hash_store.json left by older versions on first use
+    return open_hash_store(data_dir)
     
 def save_hash_store(hash_store, data_dir):
-    hash_store_path = data_dir / "hash_store.json"
-    with open(hash_store_path, 'w', encoding='utf-8') as f:
-        json.dump(hash_store, f, ensure_ascii=False, indent=2)
\ No newline at end of file
+    # Writes back only the articles that changed since they were loaded
+    if not isinstance(hash_store, HashStore):
+        store = open_hash_store(data_dir)
+        for key, value in hash_store.items():
+            store[key] = value
+        hash_store = store
+    return hash_store.flush()
+
+# Plain dict stores (tests, benchmarks) have no journal, so these do nothing for them
+
+def checkpoint_hash_store(hash_store, article_ids, entries):
+    if isinstance(hash_store, HashStore):
+        hash_store.checkpoint(article_ids, entries)
+
+def load_journal(hash_store):
+    return hash_store.read_journal() if isinstance(hash_store, HashStore) else []
+
+def clear_journal(hash_store):
+    if isinstance(hash_store, HashStore):
+        hash_store.clear_journal()
+
+def load_retry_articles(hash_store):
+    return hash_store.retry_articles() if isinstance(hash_store, HashStore) else []
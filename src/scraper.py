@@ -1,42 +1,107 @@
+import itertools
 import requests
 import json
 import re
 import os
 import time
+import multiprocessing
+from bisect import bisect_left, bisect_right
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, as_completed, FIRST_COMPLETED
 from datetime import datetime
+from functools import partial
 from pathlib import Path
 from dotenv import load_dotenv
 from .config import *
 from .helper import *
-from markdownify import markdownify
-import tiktoken
-from bs4 import BeautifulSoup
+from .tokenizer import get_tokenizer, token_upper_bound
+from .archive import write_raw_article, read_raw_article, iter_raw_files, write_chunk, delete_packed_chunks, defer_writes, apply_writes, flush_archives, close_archives, is_packed, open_archive, write_behind, delete_file
+from .boilerplate import split_paragraphs, paragraph_fingerprint, paragraph_fingerprints, count_paragraph_fingerprints, count_run_fingerprints, find_unindexed_articles, find_restrip_articles, find_boilerplate, needs_restrip, strip_boilerplate
+from .fetcher import create_session, fetch_page, iter_all_pages, iter_incremental_pages, get_zendesk_auth, prefetch, FetchThrottle
+from markdownify import markdownify, MarkdownConverter
+from bs4 import BeautifulSoup, Tag
 
 load_dotenv()
 
-tokenizer = tiktoken.encoding_for_model("gpt-4o")
-
 def count_tokens(text):
-    return len(tokenizer.encode(text))
+    return len(get_tokenizer().encode(text))
 
-def clean_html(html_content):
-    soup = BeautifulSoup(html_content, 'html.parser')
+def count_tokens_batch(texts):
+    # One encode_batch call spreads the texts over tiktoken's thread pool
+    if not texts:
+        return []
+    return [len(tokens) for tokens in get_tokenizer().encode_batch(texts, num_threads=TOKENIZER_THREADS)]
+
+def record_token_counts(pending):
+    # pending holds (hash record, chunk texts) pairs; every record gets its per-chunk "num_tokens"
+    counts = iter(count_tokens_batch([text for _, texts in pending for text in texts]))
+    for record, texts in pending:
+        record["num_tokens"] = [next(counts) for _ in texts]
+        # The exact count validates what the chunker sized: past MAX_CHUNK_TOKENS the vector store re-splits the file
+        oversized = sum(1 for count in record["num_tokens"] if count > MAX_CHUNK_TOKENS)
+        if oversized:
+            print(f"Warning: {oversized} chunk(s) over {MAX_CHUNK_TOKENS} tokens will be re-split by the vector store")
+    pending.clear()
+
+# Removal rules, compiled once into a tag set and a single substring pattern
+# (same semantics as the CSS selectors nav, header, footer, [class*="nav"],
+# [id*="ad"], script, style, iframe, ...)
+UNWANTED_TAGS = frozenset(['nav', 'header', 'footer', 'script', 'style', 'iframe'])
+UNWANTED_ATTR_PATTERN = re.compile('nav|menu|sidebar|ad')
+
+def is_unwanted_element(element):
+    if element.name in UNWANTED_TAGS:
+        return True
     
-    unwanted_selectors = [
-        'nav', 'header', 'footer',
-        '[class*="nav"]', '[class*="menu"]',
-        '[class*="sidebar"]', '[class*="ad"]',
-        '[id*="nav"]', '[id*="menu"]',
-        '[id*="sidebar"]', '[id*="ad"]',
-        'script', 'style', 'iframe'
-    ]
+    class_attr = element.get('class')
+    if class_attr:
+        if not isinstance(class_attr, str):
+            class_attr = ' '.join(class_attr)
+        if UNWANTED_ATTR_PATTERN.search(class_attr):
+            return True
     
-    for selector in unwanted_selectors:
-        for element in soup.select(selector):
-            element.decompose()
+    id_attr = element.get('id')
+    return bool(id_attr and UNWANTED_ATTR_PATTERN.search(id_attr))
+
+def clean_html_soup(html_content):
+    soup = BeautifulSoup(html_content, HTML_PARSER)
+    
+    # One walk over the tree: drop matching elements whole and never descend into them
+    stack = [soup]
+    while stack:
+        node = stack.pop()
+        for child in list(node.children):
+            if not isinstance(child, Tag):
+                continue
+            if is_unwanted_element(child):
+                child.decompose()
+            else:
+                stack.append(child)
+    
+    # Removing elements leaves neighbouring text split across nodes; re-parsing the
+    # serialized HTML would merge them, so merge them here too
+    soup.smooth()
+    return soup
+
+def clean_html(html_content):
+    soup = clean_html_soup(html_content)
+    
+    # lxml wraps fragments in <html><body>; keep the output shaped like the input
+    if HTML_PARSER == "lxml" and soup.body and '<body' not in html_content.lower():
+        return soup.body.decode_contents()
     
     return str(soup)
 
+def html_to_markdown(html_content):
+    # Same output as markdownify(clean_html(html_content), heading_style="ATX"),
+    # without serializing the cleaned tree and parsing it a second time.
+    # markdownify re-parses with html.parser, and lxml repairs malformed markup
+    # differently, so an lxml tree can't be handed over directly.
+    if HTML_PARSER != "html.parser":
+        return markdownify(clean_html(html_content), heading_style="ATX")
+    
+    return MarkdownConverter(heading_style="ATX").convert_soup(clean_html_soup(html_content))
+
 def create_slug(article_id, title):
     title_slug = re.sub(r'[^\w\s-]', '', title.lower())
     title_slug = re.sub(r'[-\s]+', '-', title_slug).strip('-')
@@ -83,225 +148,664 @@ def find_safe_split_point(text, max_pos):
     
     return max_pos
 
+HEADING_PATTERN = re.compile(r'^#{1,6}\s')
+LIST_ITEM_PATTERN = re.compile(r'^[\*\-\+\d]+\.?\s')
+
 def is_heading(line):
-    return bool(re.match(r'^#{1,6}\s', line.strip()))
+    return bool(HEADING_PATTERN.match(line.strip()))
+
+def is_list_item(line):
+    return bool(LIST_ITEM_PATTERN.match(line.strip()))
+
+HEADING_CANDIDATE_PATTERN = re.compile(r'^[^\S\n]*#', re.MULTILINE)
+LIST_ITEM_CANDIDATE_PATTERN = re.compile(r'^[^\S\n]*[\*\-\+\d]', re.MULTILINE)
+
+def find_all(text, sub):
+    # Every start index of sub, overlapping ones included (what str.rfind can return)
+    positions = []
+    pos = text.find(sub)
+    while pos != -1:
+        positions.append(pos)
+        pos = text.find(sub, pos + 1)
+    return positions
+
+def index_heading_lines(text, index):
+    line_starts = index["line_starts"]
+    heading_lines = []
+    
+    # Cheap regex prefilter, then the exact is_heading check on each candidate line
+    for match in HEADING_CANDIDATE_PATTERN.finditer(text):
+        i = bisect_right(line_starts, match.start()) - 1
+        if is_heading(get_indexed_line(text, line_starts, i)):
+            heading_lines.append(i)
+    
+    return heading_lines
+
+def index_list_end_lines(text, index):
+    line_starts = index["line_starts"]
+    list_end_lines = []
+    
+    for match in LIST_ITEM_CANDIDATE_PATTERN.finditer(text):
+        i = bisect_right(line_starts, match.start()) - 1
+        if i + 1 < len(line_starts) and is_list_item(get_indexed_line(text, line_starts, i)):
+            next_line = get_indexed_line(text, line_starts, i + 1)
+            if not next_line.strip() or not is_list_item(next_line):
+                list_end_lines.append(i)
+    
+    return list_end_lines
+
+def get_indexed_line(text, line_starts, i):
+    end = line_starts[i + 1] - 1 if i + 1 < len(line_starts) else len(text)
+    return text[line_starts[i]:end]
+
+STRUCTURE_INDEX_FIELDS = {
+    "newlines": lambda text, index: find_all(text, '\n'),
+    "line_starts": lambda text, index: [0] + [pos + 1 for pos in index["newlines"]],
+    "heading_lines": index_heading_lines,
+    "list_end_lines": index_list_end_lines,
+    # str.count matches fences greedily left to right, without overlaps
+    "fence_starts": lambda text, index: [match.start() for match in re.finditer('```', text)],
+    "fence_markers": lambda text, index: find_all(text, '```'),
+    "paragraph_breaks": lambda text, index: find_all(text, '\n\n'),
+    "sentence_ends": lambda text, index: sorted(
+        find_all(text, '. ') + find_all(text, '.\n') + find_all(text, '!\n') + find_all(text, '?\n')
+    ),
+    "link_markers": lambda text, index: sorted(find_all(text, '](') + find_all(text, '![')),
+    "open_brackets": lambda text, index: find_all(text, '[')
+}
+
+class StructureIndex(dict):
+    # Each field is built on first lookup and then reused for every split in the article;
+    # most lookups stop at the heading check and never need the later fields
+    def __init__(self, text):
+        super().__init__()
+        self.text = text
+
+    def __missing__(self, key):
+        value = STRUCTURE_INDEX_FIELDS[key](self.text, self)
+        self[key] = value
+        return value
+
+def build_structure_index(text):
+    return StructureIndex(text)
 
-def find_backward_safe_split(text, target_pos):
+def rfind_indexed(positions, length, start, end):
+    # Same result as text.rfind(sub, start, end) given every start index of sub
+    i = bisect_right(positions, end - length) - 1
+    if i >= 0 and positions[i] >= start:
+        return positions[i]
+    return -1
+
+def find_backward_safe_split(text, target_pos, index=None):
     if target_pos >= len(text):
         return len(text)
     
+    if index is None:
+        index = build_structure_index(text)
+    
     search_start = max(0, int(target_pos * 0.5))
-    substring = text[search_start:target_pos]
     
-    if is_in_code_block(text, target_pos):
-        code_start = text.rfind('```', 0, target_pos)
+    if is_in_code_block(text, target_pos, index):
+        code_start = rfind_indexed(index["fence_markers"], 3, 0, target_pos)
         if code_start > search_start:
             return code_start
     
-    lines = text[:target_pos].split('\n')
-    for i in range(len(lines) - 1, max(0, len(lines) - 20), -1):
-        if i >= len(lines):
-            continue
-        line = lines[i].strip()
-        
-        if is_heading(line):
-            return sum(len(l) + 1 for l in lines[:i])
+    line_starts = index["line_starts"]
+    # text[:target_pos] ends inside line `last_line`, which is cut off at target_pos
+    last_line = bisect_right(line_starts, target_pos) - 1
+    last_line_text = text[line_starts[last_line]:target_pos]
+    
+    if last_line > 0 and is_heading(last_line_text):
+        return line_starts[last_line]
     
-    next_line_start = text.rfind('\n', search_start, target_pos)
+    heading_lines = index["heading_lines"]
+    i = bisect_left(heading_lines, last_line) - 1
+    if i >= 0 and heading_lines[i] > max(0, last_line - 19):
+        return line_starts[heading_lines[i]]
+    
+    next_line_start = rfind_indexed(index["newlines"], 1, search_start, target_pos)
     if next_line_start != -1 and next_line_start > search_start:
-        potential_line = text[next_line_start:target_pos].strip()
-        if '](' in potential_line or '![' in potential_line:
-            link_start = text.rfind('[', search_start, next_line_start)
+        if rfind_indexed(index["link_markers"], 2, next_line_start, target_pos) != -1:
+            link_start = rfind_indexed(index["open_brackets"], 1, search_start, next_line_start)
             if link_start > search_start:
                 return link_start
     
-    para_break = text.rfind('\n\n', search_start, target_pos)
+    para_break = rfind_indexed(index["paragraph_breaks"], 2, search_start, target_pos)
     if para_break > search_start:
         return para_break + 2
     
-    for i in range(len(lines) - 1, max(0, len(lines) - 10), -1):
-        if i >= len(lines):
-            continue
-        line = lines[i].strip()
-        if re.match(r'^[\*\-\+\d]+\.?\s', line):
-            if i < len(lines) - 1:
-                next_line = lines[i + 1].strip() if i + 1 < len(lines) else ""
-                if not next_line or not re.match(r'^[\*\-\+\d]+\.?\s|^\s+', next_line):
-                    pos = sum(len(l) + 1 for l in lines[:i+1])
-                    if pos > search_start:
-                        return pos
+    list_floor = max(0, last_line - 9)
+    list_end = None
     
-    sentence_end = max(
-        text.rfind('. ', search_start, target_pos),
-        text.rfind('.\n', search_start, target_pos),
-        text.rfind('!\n', search_start, target_pos),
-        text.rfind('?\n', search_start, target_pos)
-    )
+    # The line right before the cut-off one ends a list depending on how much of the next line we can see
+    if last_line - 1 > list_floor:
+        previous_line = text[line_starts[last_line - 1]:line_starts[last_line] - 1]
+        if is_list_item(previous_line) and (not last_line_text.strip() or not is_list_item(last_line_text)):
+            list_end = last_line - 1
+    
+    if list_end is None:
+        list_end_lines = index["list_end_lines"]
+        i = bisect_left(list_end_lines, last_line - 1) - 1
+        if i >= 0 and list_end_lines[i] > list_floor:
+            list_end = list_end_lines[i]
+    
+    if list_end is not None and line_starts[list_end + 1] > search_start:
+        return line_starts[list_end + 1]
+    
+    sentence_end = rfind_indexed(index["sentence_ends"], 2, search_start, target_pos)
     if sentence_end > search_start:
         return sentence_end + 2
     
-    last_newline = text.rfind('\n', search_start, target_pos)
+    last_newline = rfind_indexed(index["newlines"], 1, search_start, target_pos)
     if last_newline > search_start:
         return last_newline + 1
     
     return target_pos
 
-def is_in_code_block(text, position):
-    before_text = text[:position]
-    code_fence_count = before_text.count('```')
+def is_in_code_block(text, position, index=None):
+    if index is None:
+        return text[:position].count('```') % 2 == 1
+    
+    # Fences that end at or before position
+    code_fence_count = bisect_right(index["fence_starts"], position - 3)
     return code_fence_count % 2 == 1
 
 def chunk_text(text, max_tokens=1000, overlap_pct=0.15):
     if not text or not text.strip():
         return []
+    if token_upper_bound(text) <= max_tokens:
+        return [text]
     
-    total_tokens = count_tokens(text)
-    if total_tokens <= max_tokens:
+    # Encode once; every split decision below works on token indices into this list
+    tokenizer = get_tokenizer()
+    tokens = tokenizer.encode(text)
+    if len(tokens) <= max_tokens:
         return [text]
     
+    _, token_starts = tokenizer.decode_with_offsets(tokens)
+    structure_index = build_structure_index(text)
+    
+    def token_index(char_pos):
+        # Number of tokens that start before char_pos
+        return bisect_left(token_starts, char_pos)
+    
+    def char_offset(token_idx):
+        return token_starts[token_idx] if token_idx < len(token_starts) else len(text)
+    
     chunks = []
     overlap_tokens = int(max_tokens * overlap_pct)
-    chars_per_token = len(text) / total_tokens
-    target_chars = int(max_tokens * chars_per_token * 0.9)
     
     pos = 0
     while pos < len(text):
-        end_pos = min(pos + target_chars, len(text))
+        start_token = token_index(pos)
+        end_token = min(start_token + max_tokens, len(tokens))
+        target_pos = char_offset(end_token)
+        end_pos = target_pos
         
         if end_pos < len(text):
-            end_pos = find_backward_safe_split(text, end_pos)
+            end_pos = find_backward_safe_split(text, end_pos, structure_index)
+            # No safe split inside this chunk, so cut at the token budget
+            if end_pos <= pos:
+                end_pos = target_pos
         
         chunk = text[pos:end_pos].strip()
         
-        chunk_tokens = count_tokens(chunk)
-        if chunk_tokens > max_tokens * 1.3:
-            while count_tokens(chunk) > max_tokens and len(chunk) > 100:
-                last_space = chunk.rfind(' ', 0, int(len(chunk) * 0.9))
-                if last_space > len(chunk) * 0.5:
-                    chunk = chunk[:last_space]
-                else:
-                    tokens = tokenizer.encode(chunk)
-                    chunk = tokenizer.decode(tokens[:max_tokens])
-                    break
-        
         if chunk:
             chunks.append(chunk)
         
         if end_pos >= len(text):
             break
         
-        overlap_chars = int(overlap_tokens * chars_per_token)
-        pos = max(pos + 1, end_pos - overlap_chars)
+        next_token = max(start_token + 1, token_index(end_pos) - overlap_tokens)
+        pos = max(pos + 1, char_offset(next_token))
     
     return chunks
 
-def fetch_articles(max_articles=None):
-    url = f"https://{RAW_DATA_BASE_URL}/api/v2/help_center/en-us/articles"
+# Boundary preference for chunk_text_optimal; raw token cuts (0) only fill gaps with no structure
+BOUNDARY_SCORES = {"heading": 5, "paragraph": 4, "list": 3, "sentence": 2, "newline": 1}
+
+def find_boundary_candidates(text, index):
+    line_starts = index["line_starts"]
+    candidates = {}
+    
+    def add(pos, kind):
+        if 0 < pos < len(text) and not is_in_code_block(text, pos, index):
+            candidates[pos] = max(candidates.get(pos, 0), BOUNDARY_SCORES[kind])
+    
+    for i in index["heading_lines"]:
+        add(line_starts[i], "heading")
+    for pos in index["paragraph_breaks"]:
+        add(pos + 2, "paragraph")
+    for i in index["list_end_lines"]:
+        add(line_starts[i + 1], "list")
+    for pos in index["sentence_ends"]:
+        add(pos + 2, "sentence")
+    for pos in index["newlines"]:
+        add(pos + 1, "newline")
+    
+    return candidates
+
+def chunk_text_optimal(text, max_tokens=1000, overlap_pct=0.15):
+    if not text or not text.strip():
+        return []
+    if token_upper_bound(text) <= max_tokens:
+        return [text]
+    
+    tokenizer = get_tokenizer()
+    tokens = tokenizer.encode(text)
+    if len(tokens) <= max_tokens:
+        return [text]
+    
+    _, token_starts = tokenizer.decode_with_offsets(tokens)
+    overlap_tokens = int(max_tokens * overlap_pct)
+    # Every chunk after the first also carries overlap_tokens from the previous one
+    core_tokens = max(1, max_tokens - overlap_tokens)
+    
+    def char_offset(token_idx):
+        return token_starts[token_idx] if token_idx < len(token_starts) else len(text)
+    
+    candidates = find_boundary_candidates(text, build_structure_index(text))
+    positions = [0] + sorted(candidates) + [len(text)]
+    
+    # Raw token cuts wherever structure leaves a gap too wide for one chunk, so a solution always exists
+    cuts = [(0, 0)]
+    for pos in positions[1:]:
+        token_idx = bisect_left(token_starts, pos)
+        while token_idx - cuts[-1][0] > core_tokens:
+            gap_token = cuts[-1][0] + core_tokens
+            cuts.append((gap_token, char_offset(gap_token)))
+        cuts.append((token_idx, pos))
+    
+    scores = [candidates.get(pos, 0) for _, pos in cuts]
+    
+    def chunk_start_token(i):
+        return max(0, cuts[i][0] - overlap_tokens) if i > 0 else 0
+    
+    # dp[j]: cheapest way to end a chunk at cut j. Fewest chunks wins outright
+    # (chunk_cost outweighs any score total), boundary scores break ties.
+    # Feasible predecessors form a sliding window, kept in a monotonic deque: O(len(cuts)).
+    chunk_cost = BOUNDARY_SCORES["heading"] * len(cuts) + 1
+    dp = [0] + [None] * (len(cuts) - 1)
+    parent = [0] * len(cuts)
+    window = deque()
+    lowest = 0
+    
+    for j in range(1, len(cuts)):
+        if dp[j - 1] is not None:
+            while window and dp[window[-1]] >= dp[j - 1]:
+                window.pop()
+            window.append(j - 1)
+        
+        while lowest < j and cuts[j][0] - chunk_start_token(lowest) > max_tokens:
+            lowest += 1
+        while window and window[0] < lowest:
+            window.popleft()
+        
+        if window:
+            dp[j] = dp[window[0]] + chunk_cost - scores[j]
+            parent[j] = window[0]
+    
+    ends = []
+    j = len(cuts) - 1
+    while j > 0:
+        ends.append(j)
+        j = parent[j]
+    
+    chunks = []
+    previous = 0
+    for j in reversed(ends):
+        chunk = text[char_offset(chunk_start_token(previous)):cuts[j][1]].strip()
+        if chunk:
+            chunks.append(chunk)
+        previous = j
+    
+    return chunks
+
+def last_outside_code(text, positions, low, high, index, offset=0):
+    # Latest positions[i] + offset in [low, high] that isn't inside a code block, or -1
+    i = bisect_right(positions, high - offset) - 1
+    while i >= 0 and positions[i] + offset >= low:
+        if not is_in_code_block(text, positions[i] + offset, index):
+            return positions[i] + offset
+        i -= 1
+    return -1
+
+def find_window_split(text, low, high, index):
+    # Best boundary in [low, high] by BOUNDARY_SCORES, latest first within a kind
+    line_starts = index["line_starts"]
+    first_line = bisect_left(line_starts, low)
+    last_line = bisect_right(line_starts, high) - 1
+    
+    def line_boundary(lines, line_offset):
+        i = bisect_right(lines, last_line - line_offset) - 1
+        while i >= 0 and lines[i] + line_offset >= first_line:
+            pos = line_starts[lines[i] + line_offset]
+            if not is_in_code_block(text, pos, index):
+                return pos
+            i -= 1
+        return -1
+    
+    for find in (
+        lambda: line_boundary(index["heading_lines"], 0),
+        lambda: last_outside_code(text, index["paragraph_breaks"], low, high, index, 2),
+        lambda: line_boundary(index["list_end_lines"], 1),
+        lambda: last_outside_code(text, index["sentence_ends"], low, high, index, 2),
+        lambda: last_outside_code(text, index["newlines"], low, high, index, 1),
+    ):
+        pos = find()
+        if 0 < pos:
+            return pos
+    return high
+
+def chunk_text_bounded(text, max_tokens=1000, overlap_pct=0.15, time_budget=None):
+    # Every chunk starts exactly max_tokens - overlap_tokens tokens after the previous one,
+    # and ends at the best boundary in its last overlap_tokens tokens (a raw token cut if none).
+    # For n tokens that is at most ceil((n - overlap_tokens) / stride) chunks, and each step
+    # costs O(log n) lookups into a structure index built once in O(n).
+    # Past time_budget seconds the rest of the article is cut at token offsets only.
+    if not text or not text.strip():
+        return []
+    if token_upper_bound(text) <= max_tokens:
+        return [text]
+    
+    tokenizer = get_tokenizer()
+    tokens = tokenizer.encode(text)
+    if len(tokens) <= max_tokens:
+        return [text]
+    
+    _, token_starts = tokenizer.decode_with_offsets(tokens)
+    structure_index = build_structure_index(text)
+    overlap_tokens = min(int(max_tokens * overlap_pct), max_tokens - 1)
+    stride = max_tokens - overlap_tokens
+    deadline = time.perf_counter() + (CHUNK_TIME_BUDGET_SECONDS if time_budget is None else time_budget)
+    
+    def char_offset(token_idx):
+        return token_starts[token_idx] if token_idx < len(token_starts) else len(text)
+    
+    chunks = []
+    start_token = 0
+    while True:
+        end_token = start_token + max_tokens
+        if end_token >= len(tokens):
+            end_pos = len(text)
+        elif time.perf_counter() > deadline:
+            end_pos = char_offset(end_token)
+        else:
+            end_pos = find_window_split(text, char_offset(start_token + stride), char_offset(end_token), structure_index)
+        
+        chunk = text[char_offset(start_token):end_pos].strip()
+        if chunk:
+            chunks.append(chunk)
+        
+        if end_pos >= len(text):
+            break
+        start_token += stride
+    
+    return chunks
+
+# CHUNKING_MODE -> chunker; all take (text, max_tokens, overlap_pct)
+CHUNKERS = {"greedy": chunk_text, "optimal": chunk_text_optimal, "bounded": chunk_text_bounded}
+
+def print_throttle_summary(throttle):
+    if throttle.throttled_count:
+        print(f"Throttled {throttle.throttled_count} time(s), waited {throttle.throttled_seconds:.1f}s (final concurrency: {throttle.concurrency})")
+
+def iter_articles(max_articles=None, cache_dir=None, fetch_state=None):
+    url = f"{API_BASE_URL}/en-us/articles"
     
     headers = {
         "Content-Type": "application/json",
         "Accept-Encoding": "gzip, deflate"
     }
     
+    if fetch_state is None:
+        fetch_state = {}
+    
     if ENV == "development":
         if max_articles:
             url += f"?per_page={max_articles}"
             
-        response = requests.get(url, headers=headers)
+        response = requests.get(url, headers=headers, timeout=FETCH_TIMEOUT)
         response.raise_for_status()
         data = response.json()
         articles = data.get("articles", [])
         
         print(f"Total fetched articles: {len(articles)}")
         
-        return articles
+        yield from articles
+        fetch_state["end_time"] = int(time.time())
+        return
 
     url += "?per_page=100"
     
-    all_articles = []
-    page_cnt = 0
+    session = create_session(FETCH_WORKERS, headers)
+    throttle = FetchThrottle(FETCH_WORKERS)
+    total = 0
+    for page_articles in iter_all_pages(session, url, FETCH_WORKERS, cache_dir, throttle):
+        total += len(page_articles)
+        yield from page_articles
+
+    print(f"Total fetched articles: {total}")
+    print_throttle_summary(throttle)
+    fetch_state["end_time"] = int(time.time())
+
+def fetch_articles(max_articles=None, cache_dir=None):
+    return list(iter_articles(max_articles, cache_dir))
+
+def iter_incremental_articles(start_time, auth, incremental_state, fetch_state):
+    headers = {
+        "Content-Type": "application/json",
+        "Accept-Encoding": "gzip, deflate"
+    }
     
-    while url:
-        page_cnt += 1
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        data = response.json()
-        
-        all_articles.extend(data.get("articles", []))
-        url = data.get("next_page")
+    session = create_session(FETCH_WORKERS, headers)
+    session.auth = auth
+    
+    url = incremental_state.get("cursor") or f"{API_BASE_URL}/incremental/articles?start_time={start_time}"
+    throttle = FetchThrottle(1)
+    export_state = {}
+    total = 0
+    
+    for page_articles in iter_incremental_pages(session, url, export_state, throttle):
+        # The incremental export spans every locale and includes drafts
+        for article in page_articles:
+            if article.get("locale", "en-us") == "en-us" and not article.get("draft"):
+                total += 1
+                yield article
+    
+    end_time = export_state["end_time"] or start_time
+    incremental_state["cursor"] = export_state["cursor"]
+    incremental_state["end_time"] = end_time
+    fetch_state["end_time"] = end_time
+    
+    print(f"Total fetched updated articles (incremental): {total}")
+    print_throttle_summary(throttle)
+
+def get_updated_timestamp(article):
+    updated_at_str = article.get("updated_at")
+    
+    if not updated_at_str:
+        return None
+    
+    updated_at = datetime.fromisoformat(updated_at_str.replace('Z', '+00:00'))
+    return int(updated_at.timestamp())
+
+def has_updated_articles(start_time):
+    if start_time is None:
+        return True
+    
+    # The newest article alone tells us whether a sync has anything to do
+    url = f"{API_BASE_URL}/en-us/articles?per_page=1&sort_by=updated_at&sort_order=desc"
+    
+    headers = {
+        "Content-Type": "application/json",
+        "Accept-Encoding": "gzip, deflate"
+    }
+    
+    session = create_session(1, headers)
+    articles = fetch_page(session, url).get("articles", [])
+    
+    if not articles:
+        return False
+    
+    newest_timestamp = get_updated_timestamp(articles[0])
+    return newest_timestamp is None or newest_timestamp > start_time
 
-    print(f"Total fetched articles: {len(all_articles)}")
-    return all_articles
+def iter_sorted_updated_articles(session, url, start_time, cache_dir, throttle):
+    total = 0
+    previous_timestamp = None
+    is_sorted = True
+    
+    # One page in flight at a time, so stopping early doesn't waste prefetched pages
+    pages = iter_all_pages(session, url, 1, cache_dir, throttle)
+    try:
+        for page_articles in pages:
+            reached_older = False
+            
+            for article in page_articles:
+                updated_at_timestamp = get_updated_timestamp(article)
+                if updated_at_timestamp is None:
+                    continue
+                
+                # If the API ignored sort_by we can't stop early, so keep filtering every page
+                if previous_timestamp is not None and updated_at_timestamp > previous_timestamp:
+                    is_sorted = False
+                previous_timestamp = updated_at_timestamp
+                
+                if updated_at_timestamp > start_time:
+                    total += 1
+                    yield article
+                else:
+                    reached_older = True
+            
+            if reached_older and is_sorted:
+                break
+    finally:
+        pages.close()
+    
+    print(f"Total fetched updated articles: {total}")
 
-def fetch_updated_articles(start_time, max_articles=None):
+def iter_updated_articles(start_time, max_articles=None, cache_dir=None, incremental_state=None, fetch_state=None):
     start_time = start_time or 0
     
+    if fetch_state is None:
+        fetch_state = {}
+    
+    auth = get_zendesk_auth()
+    if auth:
+        if incremental_state is None:
+            incremental_state = {}
+        yield from iter_incremental_articles(start_time, auth, incremental_state, fetch_state)
+        return
+    
     def filter_updated_articles(articles):
         updated_articles = []
         for article in articles:
-            updated_at_str = article.get("updated_at")
-            
-            if updated_at_str:
-                updated_at = datetime.fromisoformat(updated_at_str.replace('Z', '+00:00'))
-                updated_at_timestamp = int(updated_at.timestamp())
+            updated_at_timestamp = get_updated_timestamp(article)
 
-                if updated_at_timestamp > start_time:
-                    updated_articles.append(article)
+            if updated_at_timestamp is not None and updated_at_timestamp > start_time:
+                updated_articles.append(article)
                 
         return updated_articles
     
-    # API is authorized
-    # url = f"https://{RAW_DATA_BASE_URL}/api/v2/help_center/incremental/articles?start_time={start_time}"
-    
-    url = f"https://{RAW_DATA_BASE_URL}/api/v2/help_center/en-us/articles"
+    # No credentials for the incremental export, so crawl the public listing and filter client-side
+    url = f"{API_BASE_URL}/en-us/articles"
     
     headers = {
         "Content-Type": "application/json",
         "Accept-Encoding": "gzip, deflate"
     }
     
-    end_time = int(time.time())
+    fetch_state["end_time"] = int(time.time())
     
     if ENV == "development":
         if max_articles:
             url += f"?per_page={max_articles}"
             
-        response = requests.get(url, headers=headers)
+        response = requests.get(url, headers=headers, timeout=FETCH_TIMEOUT)
         response.raise_for_status()
         data = response.json()
         articles = data.get("articles", [])
         
         updated_articles = filter_updated_articles(articles)
         print(f"Total fetched updated articles: {len(updated_articles)}")
-        return updated_articles, end_time
+        yield from updated_articles
+        return
 
-    url += "?per_page=100"
+    # Newest first, so the crawl can stop at the first article older than start_time
+    url += "?per_page=100&sort_by=updated_at&sort_order=desc"
     
-    all_articles = []
-    page_cnt = 0
+    session = create_session(FETCH_WORKERS, headers)
+    throttle = FetchThrottle(FETCH_WORKERS)
+    yield from iter_sorted_updated_articles(session, url, start_time, cache_dir, throttle)
+    print_throttle_summary(throttle)
+
+def fetch_updated_articles(start_time, max_articles=None, cache_dir=None, incremental_state=None):
+    fetch_state = {}
+    articles = list(iter_updated_articles(start_time, max_articles, cache_dir, incremental_state, fetch_state))
+    return articles, fetch_state["end_time"]
+
+def delete_old_chunks(article_id, chunk_files, markdown_dir):
+    # chunk_files is the record's manifest, so this never scans the directory.
+    # Records written before the manifest fall back to every chunk file of the article.
+    if chunk_files is None:
+        chunk_files = [path.name for path in markdown_dir.glob(f"{article_id}-*-part*.md")]
     
-    while url:
-        page_cnt += 1
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        data = response.json()
-        
-        all_articles.extend(data.get("articles", []))
-        url = data.get("next_page")
+    for chunk_file in chunk_files:
+        delete_file(markdown_dir / chunk_file)
+    delete_packed_chunks(article_id, markdown_dir)
 
-    all_updated_articles = filter_updated_articles(all_articles)
-    print(f"Total fetched updated articles: {len(all_updated_articles)}")
-    return all_updated_articles, end_time
+def delete_old_raw_files(article_id, raw_file, raw_filename, raw_data_dir):
+    # A new title gives the article a new slug; its previous raw file would linger as a stale copy.
+    # Records written before raw_file was stored fall back to every other raw file of the article.
+    if raw_file is None:
+        old_raw_files = [path.name for path in raw_data_dir.glob(f"{article_id}-*.json")]
+    else:
+        old_raw_files = [raw_file]
+    
+    for old_raw_file in old_raw_files:
+        if old_raw_file != raw_filename:
+            delete_file(raw_data_dir / old_raw_file)
 
-def delete_old_chunks(article_id, slug, markdown_dir):
-    # Pattern: {article_id}-{slug}-part*.md
-    pattern = f"{article_id}-{slug}-part*.md"
-    old_files = list(markdown_dir.glob(pattern))
+def find_raw_file(article_id_str, record, raw_data_dir):
+    # The raw file this record was built from. Records written before raw_file was stored are
+    # matched by source_hash, so a renamed article's stale raw file is never mistaken for it
+    if "raw_file" in record:
+        return record["raw_file"]
     
-    for old_file in old_files:
-        old_file.unlink() 
+    for name, article in iter_raw_files(article_id_str, raw_data_dir):
+        source_hash = calculate_source_hash(article.get("title", ""), article.get("html_url", ""), article.get("body") or "")
+        if source_hash == record.get("source_hash"):
+            return name
+    return None
 
-def process_article(article, hash_store, raw_data_dir, markdown_dir):
+def read_stored_article(article_id_str, record, raw_data_dir):
+    raw_file = find_raw_file(article_id_str, record, raw_data_dir)
+    if raw_file is None and not is_packed():
+        return None
+    return read_raw_article(article_id_str, raw_data_dir, raw_file)
+
+def build_chunk_frame(title, url):
+    # A long title or URL eats into the body so the whole file still fits MAX_CHUNK_TOKENS,
+    # down to half of CHUNK_BODY_TOKENS; past that the title is shortened instead, so an
+    # overlong title can't split the article into thousands of tiny chunks
+    min_body_tokens = max(1, CHUNK_BODY_TOKENS // 2)
+    footer = f"\n\n---\n\nArticle URL: {url}"
+    header = f"# {title}\n\nArticle URL: {url}\n\n\n"
+    body_tokens = MAX_CHUNK_TOKENS - count_tokens(header + footer)
+    
+    if body_tokens < min_body_tokens:
+        tokenizer = get_tokenizer()
+        title_tokens = tokenizer.encode(title)
+        keep = max(0, len(title_tokens) - (min_body_tokens - body_tokens))
+        title = tokenizer.decode(title_tokens[:keep]).rstrip() + "..."
+        header = f"# {title}\n\nArticle URL: {url}\n\n\n"
+        body_tokens = MAX_CHUNK_TOKENS - count_tokens(header + footer)
+    
+    # Still short only when the URL alone is too long; the oversized-chunk warning reports it
+    return header, footer, max(min_body_tokens, min(CHUNK_BODY_TOKENS, body_tokens))
+
+def process_article(article, hash_store, raw_data_dir, markdown_dir, token_batch=None, boilerplate=frozenset()):
     article_id = article["id"]
     article_title = article["title"]
     article_body = article.get("body", "")
@@ -309,62 +813,323 @@ def process_article(article, hash_store, raw_data_dir, markdown_dir):
     updated_at = article.get("updated_at", "")
     
     slug = create_slug(article_id, article_title)
+    article_id_str = str(article_id)
+    stored_article = hash_store["articles"].get(article_id_str)
     
-    cleaned_html = clean_html(article_body)
-    markdown_content = markdownify(cleaned_html, heading_style="ATX")
+    # Same raw body, title and URL as last time: skip before parsing any HTML,
+    # unless the corpus boilerplate set changed for one of its paragraphs
+    source_hash = calculate_source_hash(article_title, article_url, article_body)
+    if stored_article and stored_article.get("source_hash") == source_hash and not needs_restrip(stored_article, boilerplate):
+        return "HASH_SKIPPED", []
+    
+    markdown_content = html_to_markdown(article_body)
+    fingerprints = paragraph_fingerprints(markdown_content)
+    stripped_paragraphs = sorted(boilerplate.intersection(fingerprints))
+    if stripped_paragraphs:
+        markdown_content = strip_boilerplate(markdown_content, boilerplate)
     
     content_hash = calculate_content_hash(markdown_content)
     
-    article_id_str = str(article_id)
     action = "ADDED"
     
-    if article_id_str in hash_store["articles"]:
-        stored_hash = hash_store["articles"][article_id_str].get("hash", "")
+    if stored_article:
+        stored_hash = stored_article.get("hash", "")
         if stored_hash == content_hash:
+            # Raw body changed but the markdown didn't; remember it so next run takes the fast path
+            stored_article["source_hash"] = source_hash
+            stored_article["paragraph_fingerprints"] = fingerprints
+            stored_article["stripped_paragraphs"] = stripped_paragraphs
             return "HASH_SKIPPED", []
         else:
             action = "UPDATED"
-            delete_old_chunks(article_id, slug, markdown_dir)
+            delete_old_chunks(article_id, stored_article.get("chunk_files"), markdown_dir)
     
     raw_filename = f"{slug}.json"
     raw_filepath = raw_data_dir / raw_filename
-    with open(raw_filepath, 'w', encoding='utf-8') as f:
-        json.dump(article, f, ensure_ascii=False, indent=2)
+    if stored_article:
+        delete_old_raw_files(article_id, stored_article.get("raw_file"), raw_filename, raw_data_dir)
+    write_raw_article(article, raw_filepath)
 
-    chunks = chunk_text(markdown_content, max_tokens=CHUNK_BODY_TOKENS, overlap_pct=OVERLAP_PERCENTAGE)
+    chunk_header, chunk_footer, body_tokens = build_chunk_frame(article_title, article_url)
+    
+    chunker = CHUNKERS[CHUNKING_MODE]
+    chunks = chunker(markdown_content, max_tokens=body_tokens, overlap_pct=OVERLAP_PERCENTAGE)
     chunk_paths = []
+    chunk_texts = []
     
     for idx, chunk_content in enumerate(chunks, start=1):
-        chunk_with_metadata = f"# {article_title}\n\n"
-        
-        chunk_with_metadata += f"Article URL: {article_url}\n\n\n"
-        
-        chunk_with_metadata += chunk_content
-        chunk_with_metadata += f"\n\n---\n\nArticle URL: {article_url}"
-        
-        chunk_token_count = count_tokens(chunk_with_metadata)
-        # print(f"  Chunk {idx}: {chunk_token_count} tokens")
+        chunk_with_metadata = chunk_header + chunk_content + chunk_footer
+        chunk_texts.append(chunk_with_metadata)
         
         chunk_filename = f"{slug}-part{idx}.md"
         chunk_filepath = markdown_dir / chunk_filename
-        with open(chunk_filepath, 'w', encoding='utf-8') as f:
-            f.write(chunk_with_metadata)
+        write_chunk(chunk_filepath, chunk_with_metadata)
         chunk_paths.append(chunk_filepath)
     
-    hash_store["articles"][article_id_str] = {
+    record = {
         "hash": content_hash,
+        "source_hash": source_hash,
         "openai_file_ids": hash_store["articles"].get(article_id_str, {}).get("openai_file_ids", []),
+        "chunk_file_ids": hash_store["articles"].get(article_id_str, {}).get("chunk_file_ids", {}),
         "updated_at": updated_at,
-        "num_chunks": len(chunks)
+        "num_chunks": len(chunks),
+        "raw_file": raw_filename,
+        "chunk_files": [chunk_path.name for chunk_path in chunk_paths],
+        "paragraph_fingerprints": fingerprints,
+        "stripped_paragraphs": stripped_paragraphs
     }
+    hash_store["articles"][article_id_str] = record
+    
+    # Token counts are filled in by one batched encode: for this article alone,
+    # or for the whole batch when the caller collects them in token_batch
+    if token_batch is None:
+        record_token_counts([(record, chunk_texts)])
+    else:
+        token_batch.append((record, chunk_texts))
     
     return action, chunk_paths
 
-def scraper(max_articles=None):
+def process_article_isolated(article, stored_article, raw_data_dir, markdown_dir, boilerplate=frozenset()):
+    # Runs in a worker process, so only this article's hash record crosses the process boundary
+    article_id_str = str(article["id"])
+    article_store = {"articles": {}}
+    if stored_article is not None:
+        article_store["articles"][article_id_str] = stored_article
+    
+    # Packed archives have a single writer, so their writes go back to the parent with the record
+    if is_packed():
+        with defer_writes() as writes:
+            action, chunk_paths = process_article(article, article_store, raw_data_dir, markdown_dir, boilerplate=boilerplate)
+    else:
+        writes = []
+        action, chunk_paths = process_article(article, article_store, raw_data_dir, markdown_dir, boilerplate=boilerplate)
+    return action, chunk_paths, article_store["articles"].get(article_id_str), writes
+
+def merge_processed_article(article, future, hash_store):
+    action, chunk_paths, record, writes = future.result()
+    apply_writes(writes)
+    if record is not None:
+        hash_store["articles"][str(article["id"])] = record
+    return action, chunk_paths
+
+def iter_article_outcomes(articles, hash_store, raw_data_dir, markdown_dir, workers=1, token_batch=None, boilerplate=frozenset()):
+    # Yields (article, outcome); calling outcome() returns (action, chunk_paths) or raises.
+    # token_batch only applies serially; pool workers count each article's tokens themselves
+    if workers <= 1:
+        for article in articles:
+            yield article, partial(process_article, article, hash_store, raw_data_dir, markdown_dir, token_batch, boilerplate)
+        return
+    
+    # Up to workers * 2 articles are in flight and each outcome is yielded as soon as it finishes,
+    # so a large article only holds up its own worker. Outcomes are merged per article id,
+    # so hash_store ends up the same whatever order they complete in.
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        pending = {}
+        for article in articles:
+            stored_article = hash_store["articles"].get(str(article["id"]))
+            future = executor.submit(process_article_isolated, article, stored_article, raw_data_dir, markdown_dir, boilerplate)
+            pending[future] = article
+            
+            if len(pending) >= workers * 2:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    article = pending.pop(future)
+                    yield article, partial(merge_processed_article, article, future, hash_store)
+        
+        for future in as_completed(list(pending)):
+            article = pending.pop(future)
+            yield article, partial(merge_processed_article, article, future, hash_store)
+
+def index_paragraph_fingerprints(hash_store, raw_data_dir):
+    # Records written before boilerplate detection get their fingerprints from data/raw once.
+    # They are committed straight away, so the persisted frequency index counts them.
+    indexed_ids = []
+    for article_id_str in find_unindexed_articles(hash_store):
+        record = hash_store["articles"][article_id_str]
+        article = read_stored_article(article_id_str, record, raw_data_dir)
+        if article is not None:
+            record["paragraph_fingerprints"] = paragraph_fingerprints(html_to_markdown(article.get("body", "")))
+            indexed_ids.append(article_id_str)
+    checkpoint_hash_store(hash_store, indexed_ids, [])
+    return indexed_ids
+
+def iter_restrip_articles(hash_store, raw_data_dir, boilerplate, seen_ids):
+    # Unchanged articles are not fetched again, so ones affected by a new boilerplate set come from data/raw.
+    # The lookup runs once the fetched articles are done, so anything they reprocessed is skipped.
+    for article_id_str in find_restrip_articles(hash_store, boilerplate):
+        if article_id_str in seen_ids:
+            continue
+        record = hash_store["articles"][article_id_str]
+        # The raw file the record was built from; a stale copy under an old slug would revert the article
+        article = read_stored_article(article_id_str, record, raw_data_dir)
+        if article is not None:
+            yield article
+
+def fingerprint_fetched_articles(articles, hash_store):
+    # Unchanged articles keep their stored fingerprints, so only changed bodies are converted here.
+    # An article listed twice is processed once, as its first copy
+    fetched = {}
+    for article in articles:
+        article_id_str = str(article["id"])
+        if article_id_str in fetched:
+            continue
+        article_body = article.get("body") or ""
+        stored_article = hash_store["articles"].get(article_id_str)
+        source_hash = calculate_source_hash(article["title"], article.get("html_url", ""), article_body)
+        if stored_article and stored_article.get("source_hash") == source_hash and "paragraph_fingerprints" in stored_article:
+            fetched[article_id_str] = stored_article["paragraph_fingerprints"]
+        else:
+            fetched[article_id_str] = paragraph_fingerprints(html_to_markdown(article_body))
+    return fetched
+
+def find_run_boilerplate(hash_store, articles):
+    # Counts the stored corpus with the articles this run processes already swapped in,
+    # so a first sync never uploads paragraphs that the next run would strip again
+    if BOILERPLATE_MIN_ARTICLES <= 0:
+        return frozenset()
+    fetched = fingerprint_fetched_articles(articles, hash_store)
+    return find_boilerplate(count_run_fingerprints(hash_store, fetched, BOILERPLATE_MIN_ARTICLES), BOILERPLATE_MIN_ARTICLES)
+
+def iter_tracking_ids(articles, seen_ids):
+    for article in articles:
+        seen_ids.add(str(article["id"]))
+        yield article
+
+def iter_retry_articles(retry_articles, seen_ids):
+    # Articles that failed last time are retried whatever their updated_at, unless fetched again anyway
+    for article in retry_articles:
+        if str(article["id"]) not in seen_ids:
+            yield article
+
+def record_outcome(changed_articles, article_id, action, chunk_paths):
+    # An article added by an interrupted run and edited since has still never been uploaded
+    if action == "ADDED" or article_id in changed_articles["added"]:
+        changed_articles["updated"].pop(article_id, None)
+        changed_articles["added"][article_id] = chunk_paths
+    else:
+        changed_articles["updated"][article_id] = chunk_paths
+
+def replay_journal(entries, changed_articles):
+    # Outcomes committed by an interrupted run that haven't reached the uploader yet
+    replayed = 0
+    for entry in entries:
+        if entry["action"] not in ("ADDED", "UPDATED"):
+            continue
+        article_id = int(entry["id"]) if entry["id"].isdigit() else entry["id"]
+        record_outcome(changed_articles, article_id, entry["action"], [Path(path) for path in entry["chunk_paths"]])
+        replayed += 1
+    return replayed
+
+def rebuild_chunk_manifests(hash_store, raw_data_dir, markdown_dir):
+    # Sets every record's chunk_files from the slug of its raw file and returns the loose chunk
+    # files no manifest claims: stale parts, old slugs, articles no longer in the store
+    loose_files = {path.name for path in markdown_dir.glob("*.md")}
+    claimed = set()
+    
+    for article_id_str, record in hash_store["articles"].items():
+        raw_file = find_raw_file(article_id_str, record, raw_data_dir)
+        if raw_file is None:
+            # Without the raw file the current slug is unknown, so keep whatever the article has
+            chunk_files = sorted(name for name in loose_files if CHUNK_NAME_FORMAT.match(name) and name.startswith(f"{article_id_str}-"))
+        else:
+            # Chunks are written under the same slug as the raw file they were built from
+            record["raw_file"] = raw_file
+            slug = raw_file.removesuffix(".json")
+            chunk_files = [f"{slug}-part{idx}.md" for idx in range(1, record.get("num_chunks", 0) + 1)]
+        record["chunk_files"] = chunk_files
+        claimed.update(chunk_files)
+    
+    return sorted(loose_files - claimed)
+
+def sweep_packed_chunks(hash_store, markdown_dir):
+    archive = open_archive(markdown_dir)
+    orphans = []
+    for key in archive.keys("chunk/"):
+        _, article_id_str, part = key.split("/")
+        record = hash_store["articles"].get(article_id_str)
+        if record is None or int(part) > record.get("num_chunks", 0):
+            orphans.append(key)
+    for key in orphans:
+        archive.delete(key)
+    return len(orphans)
+
+def sweep_chunks():
+    # One-off cleanup: rebuilds the chunk manifests and removes chunk files nothing refers to
+    data_dir = Path(__file__).parent.parent / "data"
+    raw_data_dir = data_dir / "raw"
+    markdown_dir = data_dir / "markdown"
+    hash_store = load_hash_store(data_dir)
+    
+    orphans = rebuild_chunk_manifests(hash_store, raw_data_dir, markdown_dir)
+    for name in orphans:
+        (markdown_dir / name).unlink()
+    removed = len(orphans)
+    if is_packed():
+        removed += sweep_packed_chunks(hash_store, markdown_dir)
+    
+    save_hash_store(hash_store, data_dir)
+    close_archives()
+    print(f"[MANIFEST]: rebuilt chunk_files for {len(hash_store['articles'])} article(s)")
+    print(f"[ORPHANS]: removed {removed} chunk(s)")
+    return removed
+
+def report_boilerplate(min_articles=BOILERPLATE_MIN_ARTICLES or BOILERPLATE_REPORT_MIN_ARTICLES):
+    data_dir = Path(__file__).parent.parent / "data"
+    raw_data_dir = data_dir / "raw"
+    hash_store = load_hash_store(data_dir)
+    
+    index_paragraph_fingerprints(hash_store, raw_data_dir)
+    counts = count_paragraph_fingerprints(hash_store, min_articles)
+    boilerplate = find_boilerplate(counts, min_articles)
+    chunker = CHUNKERS[CHUNKING_MODE]
+    
+    totals = {"articles": 0, "tokens_before": 0, "tokens_after": 0, "chunks_before": 0, "chunks_after": 0}
+    previews = {}
+    
+    for article_id_str, record in hash_store["articles"].items():
+        article = read_stored_article(article_id_str, record, raw_data_dir)
+        if article is None:
+            continue
+        
+        markdown_content = html_to_markdown(article.get("body", ""))
+        stripped_content = strip_boilerplate(markdown_content, boilerplate)
+        if stripped_content != markdown_content:
+            totals["articles"] += 1
+        
+        for start, end in split_paragraphs(markdown_content):
+            fingerprint = paragraph_fingerprint(markdown_content[start:end])
+            if fingerprint in boilerplate:
+                previews.setdefault(fingerprint, markdown_content[start:end].strip())
+        
+        tokens_before, tokens_after = count_tokens_batch([markdown_content, stripped_content])
+        totals["tokens_before"] += tokens_before
+        totals["tokens_after"] += tokens_after
+        totals["chunks_before"] += len(chunker(markdown_content, max_tokens=CHUNK_BODY_TOKENS, overlap_pct=OVERLAP_PERCENTAGE))
+        totals["chunks_after"] += len(chunker(stripped_content, max_tokens=CHUNK_BODY_TOKENS, overlap_pct=OVERLAP_PERCENTAGE))
+    
+    print(f"[BOILERPLATE]: {len(boilerplate)} paragraph(s) repeated in {min_articles}+ articles, found in {totals['articles']} article(s)")
+    for fingerprint in sorted(previews, key=lambda fingerprint: -counts[fingerprint])[:10]:
+        preview = " ".join(previews[fingerprint].split())[:70]
+        print(f"   |-- {counts[fingerprint]:>5}x  {preview}")
+    print(f"[TOKENS]:  {totals['tokens_before']} -> {totals['tokens_after']} (saves {totals['tokens_before'] - totals['tokens_after']})")
+    print(f"[CHUNKS]:  {totals['chunks_before']} -> {totals['chunks_after']} (saves {totals['chunks_before'] - totals['chunks_after']})")
+    
+    return totals
+
+def probe_updates():
+    data_dir = Path(__file__).parent.parent / "data"
+    hash_store = load_hash_store(data_dir)
+    return has_updated_articles(hash_store.get("last_fetching_time"))
+
+def scraper(max_articles=None, workers=1, time_budget=None):
+    # time_budget (seconds): stop taking new articles once it runs out, keeping finished work
+    # and leaving last_fetching_time where it was, so the next run picks up the rest
+    deadline = None if time_budget is None else time.monotonic() + time_budget
     base_dir = Path(__file__).parent.parent
     data_dir = base_dir / "data"
     raw_data_dir = data_dir / "raw"
     markdown_dir = data_dir / "markdown"
+    http_cache_dir = data_dir / "http_cache"
     
     data_dir.mkdir(parents=True, exist_ok=True)
     raw_data_dir.mkdir(parents=True, exist_ok=True)
@@ -372,38 +1137,106 @@ def scraper(max_articles=None):
     
     hash_store = load_hash_store(data_dir)
     last_fetching_time = hash_store.get("last_fetching_time")
+    incremental_state = json.loads(json.dumps(hash_store.get("incremental", {})))
+    
+    stats = {"ADDED": 0, "UPDATED": 0, "API_SKIPPED": 0, "HASH_SKIPPED": 0, "FAILED": 0}
     
-    stats = {"ADDED": 0, "UPDATED": 0, "API_SKIPPED": 0, "HASH_SKIPPED": 0}
+    # A crashed or stopped run already committed these; they still need uploading
+    changed_articles = {"added": {}, "updated": {}}
+    resumed = replay_journal(load_journal(hash_store), changed_articles)
+    retry_articles = load_retry_articles(hash_store)
+    
+    index_paragraph_fingerprints(hash_store, raw_data_dir)
 
+    # Articles stream in page by page while later pages are still downloading
+    fetch_state = {}
     if last_fetching_time is None:
-        all_articles = fetch_articles(MAX_ARTICLES_IN_DEVELOPMENT)
-        end_time = int(time.time())
-        stats["API_SKIPPED"] = 0
+        articles = iter_articles(MAX_ARTICLES_IN_DEVELOPMENT, http_cache_dir, fetch_state)
     else:
         existing_article_ids = set(hash_store["articles"].keys())
         total_in_store = len(existing_article_ids)
-        all_articles, end_time = fetch_updated_articles(last_fetching_time, MAX_ARTICLES_IN_DEVELOPMENT)
-        stats["API_SKIPPED"] = total_in_store - len(all_articles)
+        articles = iter_updated_articles(
+            last_fetching_time,
+            MAX_ARTICLES_IN_DEVELOPMENT,
+            http_cache_dir,
+            hash_store.setdefault("incremental", {}),
+            fetch_state
+        )
    
-    changed_articles = {"added": {}, "updated": {}}
+    fetched_ids = set()
     
-    for article in all_articles:
-        try:
-            action, chunk_paths = process_article(article, hash_store, raw_data_dir, markdown_dir)
-            if action == "HASH_SKIPPED":
-                stats["HASH_SKIPPED"] += 1
-            else:
+    token_batch = []
+    pending_ids = []
+    pending_entries = []
+    
+    def checkpoint():
+        # Records and their journal entries are committed together, so a crash loses at most this batch
+        record_token_counts(token_batch)
+        flush_archives()
+        checkpoint_hash_store(hash_store, pending_ids, pending_entries)
+        pending_ids.clear()
+        pending_entries.clear()
+    
+    # Boilerplate is decided once per run, so every article sees the same set. With stripping
+    # on, that means fetching every article before processing any, to count their paragraphs
+    if BOILERPLATE_MIN_ARTICLES > 0:
+        articles = list(articles)
+        boilerplate = find_run_boilerplate(hash_store, articles + retry_articles)
+    else:
+        boilerplate = frozenset()
+    
+    fetched_articles = prefetch(articles, FETCH_QUEUE_SIZE)
+    articles = itertools.chain(
+        iter_tracking_ids(fetched_articles, fetched_ids),
+        iter_retry_articles(retry_articles, fetched_ids),
+        iter_restrip_articles(hash_store, raw_data_dir, boilerplate, fetched_ids)
+    )
+    outcomes = iter_article_outcomes(articles, hash_store, raw_data_dir, markdown_dir, workers, token_batch, boilerplate)
+    stopped = False
+    
+    # Raw and chunk files are written in the background; every checkpoint waits for them first
+    with write_behind():
+        for article, outcome in outcomes:
+            article_id = article.get("id")
+            try:
+                action, chunk_paths = outcome()
                 stats[action] += 1
-                article_id = article["id"]
-                if action == "ADDED":
-                    changed_articles["added"][article_id] = chunk_paths
-                elif action == "UPDATED":
-                    changed_articles["updated"][article_id] = chunk_paths
-        except Exception as e:
-            print(f"Error processing article {article.get('id', 'unknown')}: {e}")
+                if action != "HASH_SKIPPED":
+                    record_outcome(changed_articles, article_id, action, chunk_paths)
+                pending_entries.append({"id": str(article_id), "action": action, "chunk_paths": [str(path) for path in chunk_paths]})
+            except Exception as e:
+                print(f"Error processing article {article.get('id', 'unknown')}: {e}")
+                stats["FAILED"] += 1
+                if article_id is not None:
+                    pending_entries.append({"id": str(article_id), "action": "FAILED", "error": str(e), "article": article})
+            
+            if article_id is not None:
+                pending_ids.append(str(article_id))
+            if len(token_batch) >= TOKEN_COUNT_BATCH_ARTICLES or len(pending_ids) >= CHECKPOINT_ARTICLES:
+                checkpoint()
+            
+            if deadline is not None and time.monotonic() > deadline:
+                stopped = True
+                break
+        
+        if stopped:
+            outcomes.close()
+            fetched_articles.close()
+        checkpoint()
+        
+    if stopped:
+        # The fetch may have run ahead of processing, so its cursor is rolled back too
+        end_time = last_fetching_time
+        if last_fetching_time is not None:
+            hash_store["incremental"] = incremental_state
+    else:
+        end_time = fetch_state.get("end_time", int(time.time()))
+        if last_fetching_time is not None:
+            stats["API_SKIPPED"] = total_in_store - len(fetched_ids)
             
     hash_store["last_fetching_time"] = end_time
     save_hash_store(hash_store, data_dir)
+    close_archives()
     
     total_skipped = stats["API_SKIPPED"] + stats["HASH_SKIPPED"]
     
@@ -412,6 +1245,12 @@ def scraper(max_articles=None):
     print(f"[SKIPPED]: {total_skipped} (Total unchanged)")
     print(f"   |-- From API filter: {stats['API_SKIPPED']}")
     print(f"   |-- From Hash match: {stats['HASH_SKIPPED']}")
+    print(f"[FAILED]:  {stats['FAILED']} article(s), retried next run")
+    if resumed:
+        print(f"[RESUMED]: {resumed} article(s) finished by an interrupted run")
+    print(f"[BOILERPLATE]: {len(boilerplate)} repeated paragraph(s) stripped before chunking")
+    if stopped:
+        print(f"[STOPPED]: time budget of {time_budget}s reached, next run resumes from the same start_time")
     print(f"Next start_time: {end_time}")
     
     return changed_articles # Returns {"added": {article_id: [chunk_paths]}, "updated": {article_id: [chunk_paths]}}
@@ -0,0 +1,413 @@
+import json
+import sqlite3
+from collections import Counter
+from collections.abc import MutableMapping
+
+# SQLite-backed hash store. It behaves like the dict hash_store.json used to load into,
+# so callers keep reading and mutating hash_store["articles"][article_id] in place, but
+# only articles that were touched are read, and only ones that changed are written back.
+# Questions about the whole catalog go through the indexed queries on ArticleStore instead
+# of iterating it, which would load and cache every record.
+
+HASH_STORE_DB = "hash_store.db"
+HASH_STORE_JSON = "hash_store.json"
+
+# Record fields kept in their own columns; everything else goes to the JSON "extra" column
+ARTICLE_COLUMNS = ("hash", "source_hash", "updated_at", "num_chunks")
+FILE_ID_FIELDS = ("openai_file_ids", "chunk_file_ids")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS articles (
+    id TEXT PRIMARY KEY,
+    hash TEXT,
+    source_hash TEXT,
+    updated_at TEXT,
+    num_chunks INTEGER,
+    extra TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS articles_updated_at ON articles (updated_at);
+CREATE INDEX IF NOT EXISTS articles_without_fingerprints ON articles (id)
+    WHERE json_type(extra, '$.paragraph_fingerprints') IS NULL;
+CREATE TABLE IF NOT EXISTS file_ids (
+    article_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    file_id TEXT NOT NULL,
+    chunk_hash TEXT,
+    PRIMARY KEY (article_id, position)
+);
+CREATE INDEX IF NOT EXISTS file_ids_file_id ON file_ids (file_id);
+CREATE TABLE IF NOT EXISTS journal (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    article_id TEXT NOT NULL,
+    action TEXT NOT NULL,
+    chunk_paths TEXT NOT NULL DEFAULT '[]',
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS paragraph_counts (
+    fingerprint TEXT PRIMARY KEY,
+    articles INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS paragraph_counts_articles ON paragraph_counts (articles);
+CREATE TABLE IF NOT EXISTS paragraphs (
+    article_id TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    listed INTEGER NOT NULL,
+    stripped INTEGER NOT NULL,
+    PRIMARY KEY (article_id, fingerprint)
+);
+CREATE INDEX IF NOT EXISTS paragraphs_fingerprint ON paragraphs (fingerprint, stripped, listed);
+CREATE INDEX IF NOT EXISTS paragraphs_stripped ON paragraphs (fingerprint, listed) WHERE stripped = 1;
+CREATE TABLE IF NOT EXISTS retry_articles (
+    article_id TEXT PRIMARY KEY,
+    article TEXT NOT NULL,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 1
+);
+"""
+
+def connect(db_path):
+    connection = sqlite3.connect(db_path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(SCHEMA)
+    migrate(connection)
+    return connection
+
+def migrate(connection):
+    # PRAGMA user_version counts the one-time migrations a database has been through
+    version = connection.execute("PRAGMA user_version").fetchone()[0]
+    if version < 1:
+        # paragraph_counts came after the first databases were written, so build it once from their records
+        with connection:
+            counts = Counter()
+            for (extra,) in connection.execute("SELECT extra FROM articles"):
+                counts.update(json.loads(extra).get("paragraph_fingerprints", []))
+            connection.execute("DELETE FROM paragraph_counts")
+            connection.executemany("INSERT INTO paragraph_counts (fingerprint, articles) VALUES (?, ?)", counts.items())
+            connection.execute("PRAGMA user_version = 1")
+    if version < 2:
+        # Same for the per-article paragraphs table behind the re-strip lookup
+        with connection:
+            connection.execute("DELETE FROM paragraphs")
+            for article_id, extra in connection.execute("SELECT id, extra FROM articles").fetchall():
+                connection.executemany(
+                    "INSERT INTO paragraphs (article_id, fingerprint, listed, stripped) VALUES (?, ?, ?, ?)",
+                    paragraph_rows(article_id, json.loads(extra))
+                )
+            connection.execute("PRAGMA user_version = 2")
+
+def paragraph_rows(article_id, record):
+    # One row per fingerprint the record lists or has stripped from its chunks
+    listed = set(record.get("paragraph_fingerprints", []))
+    stripped = set(record.get("stripped_paragraphs", []))
+    return [
+        (article_id, fingerprint, int(fingerprint in listed), int(fingerprint in stripped))
+        for fingerprint in sorted(listed | stripped)
+    ]
+
+def record_to_rows(record):
+    # openai_file_ids keeps its order; chunk_file_ids is folded in as the chunk_hash of each file
+    hash_by_file_id = {file_id: chunk_hash for chunk_hash, file_id in record.get("chunk_file_ids", {}).items()}
+    file_ids = list(record.get("openai_file_ids", []))
+    file_ids += [file_id for file_id in hash_by_file_id if file_id not in file_ids]
+
+    columns = [record.get(column) for column in ARTICLE_COLUMNS]
+    extra = {key: value for key, value in record.items() if key not in ARTICLE_COLUMNS and key not in FILE_ID_FIELDS}
+    file_rows = [(position, file_id, hash_by_file_id.get(file_id)) for position, file_id in enumerate(file_ids)]
+    return columns, json.dumps(extra, ensure_ascii=False), file_rows
+
+def rows_to_record(columns, extra, file_rows):
+    record = {column: value for column, value in zip(ARTICLE_COLUMNS, columns) if value is not None}
+    record["openai_file_ids"] = [file_id for _, file_id, _ in file_rows]
+    chunk_file_ids = {chunk_hash: file_id for _, file_id, chunk_hash in file_rows if chunk_hash is not None}
+    if chunk_file_ids:
+        record["chunk_file_ids"] = chunk_file_ids
+    record.update(json.loads(extra))
+    return record
+
+def snapshot(record):
+    return json.dumps(record, sort_keys=True, ensure_ascii=False)
+
+class ArticleStore(MutableMapping):
+    # article ID -> record dict. Records are cached on first access and compared
+    # against their loaded snapshot on flush, so in-place edits are picked up.
+    def __init__(self, connection):
+        self.connection = connection
+        self.records = {}
+        self.snapshots = {}
+        self.deleted = set()
+
+    def load(self, article_id):
+        row = self.connection.execute(
+            "SELECT hash, source_hash, updated_at, num_chunks, extra FROM articles WHERE id = ?",
+            (article_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        file_rows = self.connection.execute(
+            "SELECT position, file_id, chunk_hash FROM file_ids WHERE article_id = ? ORDER BY position",
+            (article_id,)
+        ).fetchall()
+        return rows_to_record(row[:4], row[4], file_rows)
+
+    def __getitem__(self, article_id):
+        article_id = str(article_id)
+        if article_id in self.records:
+            return self.records[article_id]
+        if article_id in self.deleted:
+            raise KeyError(article_id)
+
+        record = self.load(article_id)
+        if record is None:
+            raise KeyError(article_id)
+        self.records[article_id] = record
+        self.snapshots[article_id] = snapshot(record)
+        return record
+
+    def __setitem__(self, article_id, record):
+        article_id = str(article_id)
+        self.deleted.discard(article_id)
+        self.records[article_id] = record
+
+    def __delitem__(self, article_id):
+        article_id = str(article_id)
+        if article_id not in self:
+            raise KeyError(article_id)
+        self.records.pop(article_id, None)
+        self.snapshots.pop(article_id, None)
+        self.deleted.add(article_id)
+
+    def __contains__(self, article_id):
+        article_id = str(article_id)
+        if article_id in self.records:
+            return True
+        if article_id in self.deleted:
+            return False
+        return self.connection.execute("SELECT 1 FROM articles WHERE id = ?", (article_id,)).fetchone() is not None
+
+    def __iter__(self):
+        stored_ids = [row[0] for row in self.connection.execute("SELECT id FROM articles ORDER BY rowid")]
+        seen = set(stored_ids)
+        for article_id in stored_ids:
+            if article_id not in self.deleted:
+                yield article_id
+        for article_id in list(self.records):
+            if article_id not in seen:
+                yield article_id
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def updated_since(self, updated_at):
+        # Uses the updated_at index instead of loading every record
+        rows = self.connection.execute("SELECT id FROM articles WHERE updated_at > ? ORDER BY updated_at", (updated_at,))
+        return [row[0] for row in rows]
+
+    def find_by_file_id(self, file_id):
+        row = self.connection.execute("SELECT article_id FROM file_ids WHERE file_id = ?", (file_id,)).fetchone()
+        return row[0] if row else None
+
+    def matching(self, query, params, predicate):
+        # IDs the query finds among stored records, checked again on the cached copy when there
+        # is one, since cached records may have been edited since they were loaded
+        matches = [
+            article_id for (article_id,) in self.connection.execute(query, params)
+            if article_id not in self.records and article_id not in self.deleted
+        ]
+        matches += [article_id for article_id, record in self.records.items() if predicate(record)]
+        return matches
+
+    def without_fingerprints(self):
+        # Records written before boilerplate detection; json_type is NULL for a missing key,
+        # and the partial index holds exactly those rows
+        return self.matching(
+            "SELECT id FROM articles WHERE json_type(extra, '$.paragraph_fingerprints') IS NULL",
+            (),
+            lambda record: "paragraph_fingerprints" not in record
+        )
+
+    def restrip_candidates(self, boilerplate, predicate):
+        # Records whose stripped paragraphs differ from their listed ones in boilerplate: a
+        # boilerplate paragraph they still carry, or a stripped one that is no longer boilerplate.
+        # Each half is one index range, so only records with boilerplate paragraphs are visited.
+        return self.matching(
+            "SELECT article_id FROM paragraphs WHERE fingerprint IN (SELECT value FROM json_each(?1)) AND stripped = 0 AND listed = 1 "
+            "UNION "
+            "SELECT article_id FROM paragraphs WHERE stripped = 1 AND (listed = 0 OR fingerprint NOT IN (SELECT value FROM json_each(?1))) "
+            "ORDER BY article_id",
+            (json.dumps(sorted(boilerplate)),),
+            predicate
+        )
+
+    def stored_fingerprints(self, article_id):
+        rows = self.connection.execute("SELECT fingerprint FROM paragraphs WHERE article_id = ? AND listed = 1", (article_id,))
+        return {row[0] for row in rows}
+
+    def update_paragraph_counts(self, old_fingerprints, new_fingerprints):
+        # The corpus frequency index is adjusted by each record's change, never recounted
+        self.connection.executemany(
+            "INSERT INTO paragraph_counts (fingerprint, articles) VALUES (?, 1) "
+            "ON CONFLICT(fingerprint) DO UPDATE SET articles = articles + 1",
+            [(fingerprint,) for fingerprint in new_fingerprints - old_fingerprints]
+        )
+        removed = [(fingerprint,) for fingerprint in old_fingerprints - new_fingerprints]
+        self.connection.executemany("UPDATE paragraph_counts SET articles = articles - 1 WHERE fingerprint = ?", removed)
+        self.connection.executemany("DELETE FROM paragraph_counts WHERE fingerprint = ? AND articles <= 0", removed)
+
+    def flush(self, article_ids=None):
+        # Upserts records that changed since they were loaded; returns how many rows were written.
+        # article_ids limits the check to those records, so a checkpoint doesn't re-serialize the whole cache
+        written = 0
+        if article_ids is None:
+            article_ids = list(self.records)
+        for article_id in article_ids:
+            article_id = str(article_id)
+            record = self.records.get(article_id)
+            if record is None:
+                continue
+            current = snapshot(record)
+            if self.snapshots.get(article_id) == current:
+                continue
+
+            self.update_paragraph_counts(self.stored_fingerprints(article_id), set(record.get("paragraph_fingerprints", [])))
+            columns, extra, file_rows = record_to_rows(record)
+            self.connection.execute(
+                "INSERT INTO articles (id, hash, source_hash, updated_at, num_chunks, extra) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET hash = excluded.hash, source_hash = excluded.source_hash, "
+                "updated_at = excluded.updated_at, num_chunks = excluded.num_chunks, extra = excluded.extra",
+                (article_id, *columns, extra)
+            )
+            self.connection.execute("DELETE FROM file_ids WHERE article_id = ?", (article_id,))
+            self.connection.executemany(
+                "INSERT INTO file_ids (article_id, position, file_id, chunk_hash) VALUES (?, ?, ?, ?)",
+                [(article_id, *file_row) for file_row in file_rows]
+            )
+            self.connection.execute("DELETE FROM paragraphs WHERE article_id = ?", (article_id,))
+            self.connection.executemany(
+                "INSERT INTO paragraphs (article_id, fingerprint, listed, stripped) VALUES (?, ?, ?, ?)",
+                paragraph_rows(article_id, record)
+            )
+            self.snapshots[article_id] = current
+            written += 1
+
+        for article_id in list(self.deleted):
+            self.update_paragraph_counts(self.stored_fingerprints(article_id), set())
+            self.connection.execute("DELETE FROM articles WHERE id = ?", (article_id,))
+            self.connection.execute("DELETE FROM file_ids WHERE article_id = ?", (article_id,))
+            self.connection.execute("DELETE FROM paragraphs WHERE article_id = ?", (article_id,))
+            written += 1
+        self.deleted.clear()
+
+        return written
+
+class HashStore(MutableMapping):
+    # Top level of the store: "articles" is an ArticleStore, every other key
+    # (last_fetching_time, incremental, ...) is a JSON value in the meta table
+    def __init__(self, connection):
+        self.connection = connection
+        self.articles = ArticleStore(connection)
+        self.meta = {key: json.loads(value) for key, value in connection.execute("SELECT key, value FROM meta")}
+        self.meta.setdefault("last_fetching_time", None)
+
+    def __getitem__(self, key):
+        if key == "articles":
+            return self.articles
+        return self.meta[key]
+
+    def __setitem__(self, key, value):
+        if key == "articles":
+            for article_id, record in value.items():
+                self.articles[article_id] = record
+            return
+        self.meta[key] = value
+
+    def __delitem__(self, key):
+        del self.meta[key]
+
+    def __iter__(self):
+        yield "articles"
+        yield from self.meta
+
+    def __len__(self):
+        return len(self.meta) + 1
+
+    def flush(self):
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                [(key, json.dumps(value, ensure_ascii=False)) for key, value in self.meta.items()]
+            )
+            return self.articles.flush()
+
+    def checkpoint(self, article_ids, entries):
+        # Commits these articles' records together with their journal entries. Meta values
+        # (last_fetching_time, the incremental cursor) are left alone until the run finishes.
+        with self.connection:
+            self.articles.flush(article_ids)
+            for entry in entries:
+                self.connection.execute(
+                    "INSERT INTO journal (article_id, action, chunk_paths, error) VALUES (?, ?, ?, ?)",
+                    (entry["id"], entry["action"], json.dumps(entry.get("chunk_paths", [])), entry.get("error"))
+                )
+                if entry["action"] == "FAILED":
+                    self.connection.execute(
+                        "INSERT INTO retry_articles (article_id, article, error) VALUES (?, ?, ?) "
+                        "ON CONFLICT(article_id) DO UPDATE SET article = excluded.article, error = excluded.error, "
+                        "attempts = attempts + 1",
+                        (entry["id"], json.dumps(entry["article"], ensure_ascii=False), entry.get("error"))
+                    )
+                else:
+                    self.connection.execute("DELETE FROM retry_articles WHERE article_id = ?", (entry["id"],))
+
+    def paragraph_counts(self, min_articles=1, fingerprints=None):
+        # Only committed or flushed records are counted; see ArticleStore.update_paragraph_counts
+        if fingerprints is not None:
+            rows = self.connection.execute(
+                "SELECT fingerprint, articles FROM paragraph_counts WHERE articles >= ? AND fingerprint IN (SELECT value FROM json_each(?))",
+                (min_articles, json.dumps(sorted(fingerprints)))
+            )
+        else:
+            rows = self.connection.execute("SELECT fingerprint, articles FROM paragraph_counts WHERE articles >= ?", (min_articles,))
+        return Counter(dict(rows))
+
+    def read_journal(self):
+        rows = self.connection.execute("SELECT article_id, action, chunk_paths, error FROM journal ORDER BY seq")
+        return [
+            {"id": article_id, "action": action, "chunk_paths": json.loads(chunk_paths), "error": error}
+            for article_id, action, chunk_paths, error in rows
+        ]
+
+    def clear_journal(self):
+        with self.connection:
+            self.connection.execute("DELETE FROM journal")
+
+    def retry_articles(self):
+        rows = self.connection.execute("SELECT article FROM retry_articles ORDER BY attempts, article_id")
+        return [json.loads(row[0]) for row in rows]
+
+    def close(self):
+        self.connection.close()
+
+def migrate_json_hash_store(json_path, db_path):
+    # One-time import of hash_store.json; the JSON file is kept as hash_store.json.migrated
+    with open(json_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    store = HashStore(connect(db_path))
+    for key, value in data.items():
+        store[key] = value
+    store.flush()
+    json_path.rename(json_path.with_name(json_path.name + ".migrated"))
+    return store
+
+def open_hash_store(data_dir):
+    db_path = data_dir / HASH_STORE_DB
+    json_path = data_dir / HASH_STORE_JSON
+
+    if not db_path.exists() and json_path.exists():
+        return migrate_json_hash_store(json_path, db_path)
+    return HashStore(connect(db_path))
@@ -0,0 +1,51 @@
+import hashlib
+import os
+import threading
+from pathlib import Path
+from .config import TOKENIZER_MODEL, TOKENIZER_ENCODINGS
+
+# tiktoken reads and verifies the BPE file from here instead of downloading it.
+# The Docker image bakes it at build time (python -m src.tokenizer).
+TOKENIZER_CACHE_DIR = Path(__file__).parent.parent / ".tiktoken_cache"
+
+_tokenizer = None
+_tokenizer_lock = threading.Lock()
+
+def get_tokenizer():
+    global _tokenizer
+    
+    if _tokenizer is None:
+        with _tokenizer_lock:
+            if _tokenizer is None:
+                os.environ.setdefault("TIKTOKEN_CACHE_DIR", str(TOKENIZER_CACHE_DIR))
+                import tiktoken
+                _tokenizer = tiktoken.encoding_for_model(TOKENIZER_MODEL)
+    
+    return _tokenizer
+
+def token_upper_bound(text):
+    # Byte-level BPE never emits a token shorter than one byte, so this bound is exact, not estimated
+    return len(text.encode('utf-8'))
+
+def get_encoding_cache_path(cache_dir, encoding_name):
+    # tiktoken names cache entries after the SHA-1 of the blob URL
+    url, _ = TOKENIZER_ENCODINGS[encoding_name]
+    return Path(cache_dir) / hashlib.sha1(url.encode()).hexdigest()
+
+def bake_encoding():
+    encoding_name = get_tokenizer().name
+    if encoding_name not in TOKENIZER_ENCODINGS:
+        raise ValueError(f"No pinned checksum for {encoding_name} (used by {TOKENIZER_MODEL})")
+    
+    _, expected = TOKENIZER_ENCODINGS[encoding_name]
+    cache_path = get_encoding_cache_path(os.environ["TIKTOKEN_CACHE_DIR"], encoding_name)
+    digest = hashlib.sha256(cache_path.read_bytes()).hexdigest()
+    
+    if digest != expected:
+        raise ValueError(f"Checksum mismatch for {cache_path}: expected {expected}, got {digest}")
+    
+    print(f"Baked {TOKENIZER_MODEL} encoding ({encoding_name}) into {cache_path}")
+    return cache_path
+
+if __name__ == "__main__":
+    bake_encoding()
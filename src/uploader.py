@@ -5,7 +5,7 @@ from openai import OpenAI
 from dotenv import load_dotenv
 from .helper import *
 from .config import *
-import time
+from .archive import read_chunk
 
 load_dotenv()
 
@@ -37,12 +37,18 @@ def upload_added_articles(client, vector_store_id, added_articles):
     
     # Step 1: Upload all files to OpenAI storage
     for article_id, chunk_paths in added_articles.items():
+        article_hashes = set()
         for chunk_path in chunk_paths:
             try:
-                with open(chunk_path, "rb") as f:
-                    file_obj = client.files.create(file=f, purpose="assistants")
-                    file_ids.append(file_obj.id)
-                    chunk_to_file_id[str(chunk_path)] = file_obj.id
+                content = read_chunk(chunk_path)
+                chunk_hash = calculate_content_hash(content.decode('utf-8'))
+                if chunk_hash in article_hashes:
+                    # Identical chunk within the article: one file already covers it
+                    continue
+                file_obj = client.files.create(file=(chunk_path.name, content), purpose="assistants")
+                file_ids.append(file_obj.id)
+                article_hashes.add(chunk_hash)
+                chunk_to_file_id[str(chunk_path)] = (chunk_hash, file_obj.id)
             except Exception as e:
                 print(f"Failed to upload {chunk_path.name}: {e}")
     
@@ -72,13 +78,14 @@ def upload_added_articles(client, vector_store_id, added_articles):
             except Exception as e:
                 print(f"Failed to add batch {batch_num} to vector store: {e}")
     
-    # Step 3: Map file IDs back to articles
+    # Step 3: Map file IDs back to articles, keyed by chunk content hash
     for article_id, chunk_paths in added_articles.items():
-        article_file_ids = []
+        article_file_ids = {}
         for chunk_path in chunk_paths:
-            file_id = chunk_to_file_id.get(str(chunk_path))
-            if file_id:
-                article_file_ids.append(file_id)
+            uploaded = chunk_to_file_id.get(str(chunk_path))
+            if uploaded:
+                chunk_hash, file_id = uploaded
+                article_file_ids[chunk_hash] = file_id
         
         if article_file_ids:
             article_file_mapping[article_id] = article_file_ids
@@ -91,18 +98,49 @@ def upload_updated_articles(client, vector_store_id, updated_articles, hash_stor
     if not updated_articles:
         return {}
     
-    total_chunks = sum(len(chunks) for chunks in updated_articles.values())
-    print(f"Uploading {len(updated_articles)} updated articles ({total_chunks} chunks)...")
+    changed_chunks = {}
+    kept_file_ids = {}
     
-    for article_id, chunk_files in updated_articles.items():
+    for article_id, chunk_paths in updated_articles.items():
         article_id_str = str(article_id)
-        old_file_ids = hash_store.get("articles", {}).get(article_id_str, {}).get("openai_file_ids", [])
+        stored_article = hash_store.get("articles", {}).get(article_id_str, {})
+        old_chunk_file_ids = stored_article.get("chunk_file_ids", {})
+        
+        # Chunks whose content is unchanged keep their existing file
+        kept = {}
+        changed = []
+        for chunk_path in chunk_paths:
+            try:
+                chunk_hash = calculate_content_hash(read_chunk(chunk_path).decode('utf-8'))
+            except Exception as e:
+                print(f"Failed to read {chunk_path.name}: {e}")
+                continue
+            if chunk_hash in old_chunk_file_ids:
+                kept[chunk_hash] = old_chunk_file_ids[chunk_hash]
+            else:
+                changed.append(chunk_path)
         
-        if old_file_ids:
-            print(f"Deleting {len(old_file_ids)} old files for article {article_id}...")
-            delete_old_files(client, vector_store_id, old_file_ids)
+        kept_file_ids[article_id] = kept
+        if changed:
+            changed_chunks[article_id] = changed
+        
+        old_file_ids = stored_article.get("openai_file_ids", []) + list(old_chunk_file_ids.values())
+        stale_file_ids = list(dict.fromkeys(file_id for file_id in old_file_ids if file_id not in kept.values()))
+        
+        if stale_file_ids:
+            print(f"Deleting {len(stale_file_ids)} old files for article {article_id} (keeping {len(kept)})...")
+            delete_old_files(client, vector_store_id, stale_file_ids)
+    
+    total_chunks = sum(len(chunks) for chunks in updated_articles.values())
+    total_changed = sum(len(chunks) for chunks in changed_chunks.values())
+    print(f"Uploading {len(updated_articles)} updated articles ({total_changed} of {total_chunks} chunks changed)...")
+    
+    uploaded_mapping = upload_added_articles(client, vector_store_id, changed_chunks)
     
-    return upload_added_articles(client, vector_store_id, updated_articles)
+    return {
+        article_id: {**kept, **uploaded_mapping.get(article_id, {})}
+        for article_id, kept in kept_file_ids.items()
+    }
     
 def uploader(changed_articles):
     if changed_articles is None:
@@ -130,6 +168,7 @@ def uploader(changed_articles):
     updated_articles = changed_articles.get("updated", {})
     
     if not added_articles and not updated_articles:
+        clear_journal(hash_store)
         print("No changed articles to upload")
         return
     
@@ -150,12 +189,15 @@ def uploader(changed_articles):
     
     article_file_mapping = {**added_mapping, **updated_mapping}
     
-    for article_id, file_ids in article_file_mapping.items():
+    for article_id, chunk_file_ids in article_file_mapping.items():
         article_id_str = str(article_id)  
-        hash_store["articles"][article_id_str]["openai_file_ids"] = file_ids
+        hash_store["articles"][article_id_str]["openai_file_ids"] = list(chunk_file_ids.values())
+        hash_store["articles"][article_id_str]["chunk_file_ids"] = chunk_file_ids
     
-    hash_store["last_fetching_time"] = int(time.time())
+    # last_fetching_time is the scraper's: after a run stopped on its time budget it must not move
     save_hash_store(hash_store, data_dir)
+    # Everything the scraper journaled is uploaded now, so a resumed run must not upload it again
+    clear_journal(hash_store)
     
     total_files = sum(len(ids) for ids in article_file_mapping.values())
     print(f"Upload complete: {len(added_mapping)} added, {len(updated_mapping)} updated ({total_files} files embedded)")
\ No newline at end of file
@@ -0,0 +1,93 @@
+import os
+import threading
+from pathlib import Path
+from .config import WRITE_BEHIND_MAX_PENDING
+
+# Loose raw and chunk files are handed to one background thread while the scraper keeps
+# processing. Pending operations are keyed by path, so a file written twice (or written and
+# then deleted) before the thread gets to it costs one filesystem operation.
+
+class WriteBehind:
+    def __init__(self, max_pending=WRITE_BEHIND_MAX_PENDING):
+        self.max_pending = max_pending
+        # path -> bytes to write, or None to delete; the newest operation per path wins
+        self.pending = {}
+        self.writing = 0
+        self.error = None
+        self.closed = False
+        self.condition = threading.Condition()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def submit(self, path, data):
+        with self.condition:
+            # Bounded: a slow volume holds processing back instead of buffering the whole run
+            while len(self.pending) >= self.max_pending and path not in self.pending:
+                self.condition.wait()
+            self.pending[Path(path)] = data
+            self.condition.notify_all()
+
+    def write(self, path, data):
+        self.submit(path, data)
+
+    def delete(self, path):
+        self.submit(path, None)
+
+    def run(self):
+        while True:
+            with self.condition:
+                while not self.pending and not self.closed:
+                    self.condition.wait()
+                if not self.pending:
+                    return
+                batch = self.pending
+                self.pending = {}
+                self.writing = len(batch)
+                self.condition.notify_all()
+
+            try:
+                for path, data in batch.items():
+                    try:
+                        apply_operation(path, data)
+                    except Exception as e:
+                        # Anything left unreported here would make flush() wait forever
+                        with self.condition:
+                            if self.error is None:
+                                self.error = (path, e)
+            finally:
+                with self.condition:
+                    self.writing = 0
+                    self.condition.notify_all()
+
+    def flush(self):
+        # Waits for every submitted operation; raises if any of them failed
+        with self.condition:
+            while self.pending or self.writing:
+                self.condition.wait()
+            if self.error is not None:
+                path, error = self.error
+                self.error = None
+                raise OSError(f"Background write to {path} failed: {error}") from error
+
+    def close(self, discard=False):
+        with self.condition:
+            if discard:
+                self.pending.clear()
+            self.closed = True
+            self.condition.notify_all()
+        self.thread.join()
+
+def apply_operation(path, data):
+    if data is None:
+        path.unlink(missing_ok=True)
+        return
+
+    # Written beside the target and renamed over it, so readers never see half a file
+    temp_path = path.with_name(f".{path.name}.tmp")
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
@@ -2,6 +2,12 @@ import pytest
 from pathlib import Path
 from unittest.mock import Mock
 import json
+from tests.zendesk_stub import ZendeskStub
+
+@pytest.fixture(autouse=True)
+def no_zendesk_credentials(monkeypatch):
+    monkeypatch.delenv("ZENDESK_EMAIL", raising=False)
+    monkeypatch.delenv("ZENDESK_API_TOKEN", raising=False)
 
 @pytest.fixture
 def sample_html():
@@ -205,3 +211,25 @@ def hash_store_with_files():
         },
         "last_fetching_time": 1705315800
     }
+
+
+@pytest.fixture
+def zendesk_articles():
+    return [
+        {
+            "id": 100 + i,
+            "title": f"Article {i}",
+            "body": f"<p>Body {i}</p>",
+            "html_url": f"https://support.optisigns.com/articles/{100 + i}",
+            "locale": "en-us",
+            "draft": False,
+            "updated_at": f"2024-01-{10 + i:02d}T10:00:00Z"
+        }
+        for i in range(5)
+    ]
+
+@pytest.fixture
+def zendesk_stub(zendesk_articles):
+    stub = ZendeskStub(zendesk_articles, page_size=2).start()
+    yield stub
+    stub.stop()
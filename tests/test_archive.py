@@ -0,0 +1,139 @@
+import pytest
+import json
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.archive import (
+    PackedArchive,
+    close_archives,
+    read_raw_article,
+    read_chunk,
+    iter_raw_articles
+)
+from src.scraper import process_article, process_article_isolated, merge_processed_article
+from concurrent.futures import Future
+
+@pytest.fixture
+def packed():
+    with patch('src.archive.STORAGE_FORMAT', "packed"):
+        yield
+        close_archives()
+
+class TestPackedArchive:
+    def test_put_get_delete(self, tmp_path):
+        archive = PackedArchive(tmp_path)
+        archive.put("raw/1", b"first")
+        archive.put("raw/2", b"second")
+        archive.put("raw/1", b"first, edited")
+        archive.delete("raw/2")
+
+        assert archive.get("raw/1") == b"first, edited"
+        assert archive.get("raw/2") is None
+        assert archive.keys("raw/") == ["raw/1"]
+
+    def test_reopens_from_index(self, tmp_path):
+        archive = PackedArchive(tmp_path)
+        archive.put("chunk/1/1", "héllo".encode('utf-8'))
+        archive.close()
+
+        assert PackedArchive(tmp_path).get("chunk/1/1") == "héllo".encode('utf-8')
+
+    def test_recovers_records_written_after_the_index(self, tmp_path):
+        archive = PackedArchive(tmp_path)
+        archive.put("raw/1", b"indexed")
+        archive.close()
+
+        # Killed before the index was written again
+        archive = PackedArchive(tmp_path)
+        archive.put("raw/2", b"not indexed")
+        archive.delete("raw/1")
+        archive.flush()
+
+        reopened = PackedArchive(tmp_path)
+        assert reopened.get("raw/2") == b"not indexed"
+        assert reopened.get("raw/1") is None
+
+    def test_drops_a_torn_record(self, tmp_path):
+        archive = PackedArchive(tmp_path)
+        archive.put("raw/1", b"complete")
+        archive.put("raw/2", b"torn" * 100)
+        archive.flush()
+
+        segment = next(tmp_path.glob("segment-*.pack"))
+        segment.write_bytes(segment.read_bytes()[:-10])
+
+        reopened = PackedArchive(tmp_path)
+        assert reopened.get("raw/1") == b"complete"
+        assert reopened.get("raw/2") is None
+        reopened.put("raw/3", b"after")
+        reopened.flush()
+        assert PackedArchive(tmp_path).get("raw/3") == b"after"
+
+    def test_rolls_over_to_new_segments(self, tmp_path):
+        archive = PackedArchive(tmp_path, segment_bytes=100)
+        for i in range(10):
+            archive.put(f"raw/{i}", f"article {i}".encode())
+        archive.close()
+
+        assert len(list(tmp_path.glob("segment-*.pack"))) > 1
+        reopened = PackedArchive(tmp_path, segment_bytes=100)
+        assert [reopened.get(f"raw/{i}") for i in range(10)] == [f"article {i}".encode() for i in range(10)]
+
+    def test_compact_keeps_live_records_only(self, tmp_path):
+        archive = PackedArchive(tmp_path, segment_bytes=200)
+        for i in range(20):
+            archive.put(f"raw/{i}", b"x" * 50)
+        for i in range(15):
+            archive.delete(f"raw/{i}")
+
+        reclaimed = archive.compact()
+
+        assert reclaimed > 0
+        assert archive.dead_bytes == 0
+        assert sorted(archive.keys()) == sorted(f"raw/{i}" for i in range(15, 20))
+        reopened = PackedArchive(tmp_path, segment_bytes=200)
+        assert all(reopened.get(f"raw/{i}") == b"x" * 50 for i in range(15, 20))
+        assert reopened.total_bytes() == sum(path.stat().st_size for path in tmp_path.glob("segment-*.pack"))
+
+class TestPackedStorage:
+    def test_process_article_writes_no_loose_files(self, packed, sample_article, empty_hash_store, temp_directories):
+        raw_data_dir, markdown_dir = temp_directories["raw_data_dir"], temp_directories["markdown_dir"]
+        _, chunk_paths = process_article(sample_article, empty_hash_store, raw_data_dir, markdown_dir)
+
+        assert not list(raw_data_dir.glob("*.json"))
+        assert not list(markdown_dir.glob("*.md"))
+        assert read_raw_article(sample_article["id"], raw_data_dir) == sample_article
+        assert read_chunk(chunk_paths[0]).decode('utf-8').startswith(f"# {sample_article['title']}")
+
+    def test_updated_article_replaces_its_chunks(self, packed, sample_article, empty_hash_store, temp_directories):
+        raw_data_dir, markdown_dir = temp_directories["raw_data_dir"], temp_directories["markdown_dir"]
+        process_article(sample_article, empty_hash_store, raw_data_dir, markdown_dir)
+        updated = dict(sample_article, body="<p>Rewritten from scratch</p>")
+        _, chunk_paths = process_article(updated, empty_hash_store, raw_data_dir, markdown_dir)
+
+        assert "Rewritten from scratch" in read_chunk(chunk_paths[0]).decode('utf-8')
+        assert [article["body"] for article in iter_raw_articles(raw_data_dir)] == [updated["body"]]
+
+    def test_pool_workers_hand_writes_to_the_parent(self, packed, sample_article, empty_hash_store, temp_directories):
+        raw_data_dir, markdown_dir = temp_directories["raw_data_dir"], temp_directories["markdown_dir"]
+        result = process_article_isolated(sample_article, None, raw_data_dir, markdown_dir)
+        assert read_raw_article(sample_article["id"], raw_data_dir) is None
+
+        future = Future()
+        future.set_result(result)
+        _, chunk_paths = merge_processed_article(sample_article, future, empty_hash_store)
+
+        assert read_raw_article(sample_article["id"], raw_data_dir) == sample_article
+        assert read_chunk(chunk_paths[0])
+
+    def test_loose_files_stay_readable(self, packed, temp_directories):
+        raw_data_dir, markdown_dir = temp_directories["raw_data_dir"], temp_directories["markdown_dir"]
+        (raw_data_dir / "7-old.json").write_text(json.dumps({"id": 7, "body": "<p>old</p>"}))
+        chunk_path = markdown_dir / "7-old-part1.md"
+        chunk_path.write_text("old chunk")
+
+        assert read_raw_article(7, raw_data_dir)["body"] == "<p>old</p>"
+        assert read_chunk(chunk_path) == b"old chunk"
@@ -0,0 +1,54 @@
+import pytest
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.corpus import build_corpora, make_table_body, make_tutorial_body
+from benchmarks.suite import find_regressions, find_call_regressions, count_tokenizer_calls, save_baselines, load_baselines
+
+def result(relative):
+    return {"per_article_ms": 1.0, "per_mb_ms": 1.0, "relative": relative}
+
+class TestCorpus:
+    def test_corpora_are_deterministic(self):
+        assert build_corpora() == build_corpora()
+
+    def test_corpora_cover_page_shapes(self):
+        assert "<pre><code>" in make_tutorial_body()
+        assert make_table_body().count("<tr>") > 500
+
+class TestFindRegressions:
+    def test_flags_cases_past_threshold(self):
+        results = {"clean_html": {"faq": result(0.16), "table": result(2.0)}}
+        baselines = {"clean_html": {"faq": 0.1, "table": 1.8}}
+        assert find_regressions(results, baselines, threshold=0.5) == [("clean_html", "faq", 0.16, 0.1)]
+
+    def test_ignores_missing_and_tiny_baselines(self):
+        results = {"chunk_text": {"faq": result(5.0)}, "find_backward_safe_split": {"faq": result(0.004)}}
+        baselines = {"find_backward_safe_split": {"faq": 0.0002}}
+        assert find_regressions(results, baselines) == []
+
+    def test_committed_baselines_cover_synthetic_corpora(self):
+        corpora = set(build_corpora())
+        for case, case_baselines in load_baselines().items():
+            assert set(case_baselines) == corpora, case
+
+class TestTokenizerCalls:
+    def test_flags_any_call_over_budget(self):
+        corpora = {"faq": ["body"] * 20, "table": ["body"]}
+        counts = {"chunk_text": {"faq": 18, "table": 2}, "process_article": {"faq": 60}}
+        assert find_call_regressions(counts, corpora) == [("chunk_text", "table", 2, 1)]
+
+    def test_chunker_stays_within_budget(self, tmp_path):
+        # The gate for the tokenizer-bound cases, run with every pytest invocation
+        corpora = build_corpora()
+        counts = count_tokenizer_calls(corpora, tmp_path)
+        assert find_call_regressions(counts, corpora) == []
+
+class TestSaveBaselines:
+    def test_recorded_bodies_are_never_baselined(self, tmp_path):
+        path = tmp_path / "baselines.json"
+        save_baselines({"clean_html": {"faq": result(0.123456), "recorded": result(9.0)}}, path)
+        assert json.loads(path.read_text()) == {"clean_html": {"faq": 0.1235}}
@@ -0,0 +1,95 @@
+import pytest
+import sys
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.boilerplate import (
+    split_paragraphs,
+    paragraph_fingerprint,
+    paragraph_fingerprints,
+    count_paragraph_fingerprints,
+    count_run_fingerprints,
+    find_boilerplate,
+    needs_restrip,
+    strip_boilerplate
+)
+
+FOOTER = "Still need help? Contact our support team at support@optisigns.com and we will get back to you."
+
+def make_markdown(body):
+    return f"# Guide\n\n{body}\n\n{FOOTER}\n"
+
+class TestSplitParagraphs:
+    def test_splits_on_blank_lines(self):
+        markdown = "First paragraph\n\nSecond paragraph\n\n\nThird"
+        paragraphs = [markdown[start:end].strip() for start, end in split_paragraphs(markdown)]
+        assert paragraphs == ["First paragraph", "Second paragraph", "Third"]
+
+    def test_fenced_code_with_blank_lines_stays_one_block(self):
+        markdown = "Intro\n\n```\nline one\n\nline two\n```\n\nOutro"
+        paragraphs = [markdown[start:end].strip() for start, end in split_paragraphs(markdown)]
+        assert paragraphs == ["Intro", "```\nline one\n\nline two\n```", "Outro"]
+
+class TestParagraphFingerprint:
+    def test_ignores_whitespace_and_case(self):
+        assert paragraph_fingerprint(FOOTER) == paragraph_fingerprint("  " + FOOTER.upper().replace(" ", "\n", 3))
+
+    def test_skips_headings_code_and_short_paragraphs(self):
+        assert paragraph_fingerprint("## " + FOOTER) is None
+        assert paragraph_fingerprint("```\n" + FOOTER + "\n```") is None
+        assert paragraph_fingerprint("Need help?") is None
+
+    def test_fingerprints_are_unique_per_article(self):
+        markdown = make_markdown(FOOTER)
+        assert paragraph_fingerprints(markdown) == [paragraph_fingerprint(FOOTER)]
+
+class TestFindBoilerplate:
+    def test_counts_articles_across_hash_store(self):
+        footer = paragraph_fingerprint(FOOTER)
+        hash_store = {"articles": {
+            "1": {"paragraph_fingerprints": [footer, "a"]},
+            "2": {"paragraph_fingerprints": [footer]},
+            "3": {}
+        }}
+        assert count_paragraph_fingerprints(hash_store) == Counter({footer: 2, "a": 1})
+
+    def test_limits_counts_to_given_fingerprints(self):
+        hash_store = {"articles": {"1": {"paragraph_fingerprints": ["a", "b"]}, "2": {"paragraph_fingerprints": ["a"]}}}
+        assert count_paragraph_fingerprints(hash_store, fingerprints={"a"}) == Counter({"a": 2})
+
+    def test_run_counts_swap_in_fetched_fingerprints(self):
+        hash_store = {"articles": {
+            "1": {"paragraph_fingerprints": ["footer", "old"]},
+            "2": {"paragraph_fingerprints": ["footer"]},
+            "3": {"paragraph_fingerprints": ["other"]}
+        }}
+        fetched = {"1": ["new"], "3": ["other", "footer"], "4": ["footer", "new"]}
+        assert count_run_fingerprints(hash_store, fetched, min_articles=2) == Counter({"footer": 3, "new": 2})
+
+    def test_threshold(self):
+        counts = Counter({"common": 5, "rare": 4})
+        assert find_boilerplate(counts, min_articles=5) == {"common"}
+        assert find_boilerplate(counts, min_articles=0) == frozenset()
+
+class TestStripBoilerplate:
+    def test_removes_only_boilerplate_paragraphs(self):
+        body = "Step 1: open the app and sign in with your account to continue."
+        stripped = strip_boilerplate(make_markdown(body), {paragraph_fingerprint(FOOTER)})
+        assert stripped == f"# Guide\n\n{body}"
+
+    def test_returns_markdown_unchanged_without_matches(self):
+        markdown = make_markdown("Some body text")
+        assert strip_boilerplate(markdown, {"0123456789abcdef"}) is markdown
+        assert strip_boilerplate(markdown, frozenset()) is markdown
+
+class TestNeedsRestrip:
+    def test_detects_boilerplate_set_changes(self):
+        record = {"paragraph_fingerprints": ["a", "b"], "stripped_paragraphs": ["a"]}
+        assert not needs_restrip(record, frozenset({"a", "z"}))
+        assert needs_restrip(record, frozenset({"a", "b"}))
+        assert needs_restrip(record, frozenset())
+
+    def test_legacy_record_without_fingerprints(self):
+        assert not needs_restrip({"hash": "abc"}, frozenset({"a"}))
@@ -0,0 +1,350 @@
+import pytest
+from unittest.mock import Mock, MagicMock, patch
+from pathlib import Path
+from urllib.parse import urlsplit, parse_qs
+import sys
+import threading
+import requests
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.fetcher import (
+    create_session,
+    fetch_page,
+    load_cached_page,
+    build_page_url,
+    iter_all_pages,
+    fetch_all_pages,
+    prefetch,
+    get_retry_delay,
+    FetchThrottle
+)
+from src.config import FETCH_TIMEOUT
+
+def make_response(payload, status_code=200, headers=None):
+    response = Mock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    response.json.return_value = payload
+    response.raise_for_status = Mock()
+    return response
+
+def make_paged_session(pages):
+    session = MagicMock()
+    
+    def get(url, **kwargs):
+        page = int(parse_qs(urlsplit(url).query).get("page", ["1"])[0])
+        return make_response(pages[page - 1])
+    
+    session.get.side_effect = get
+    return session
+
+class TestCreateSession:
+    def test_mounts_pooled_adapters(self):
+        session = create_session(4)
+        adapter = session.get_adapter("https://support.optisigns.com")
+        assert adapter._pool_maxsize == 4
+
+    def test_applies_default_headers(self):
+        session = create_session(2, {"Accept-Encoding": "gzip"})
+        assert session.headers["Accept-Encoding"] == "gzip"
+
+class TestBuildPageUrl:
+    def test_appends_page_param(self):
+        url = build_page_url("https://example.com/articles?per_page=100", 3)
+        query = parse_qs(urlsplit(url).query)
+        assert query["page"] == ["3"]
+        assert query["per_page"] == ["100"]
+
+    def test_replaces_existing_page_param(self):
+        url = build_page_url("https://example.com/articles?page=1&per_page=100", 2)
+        assert parse_qs(urlsplit(url).query)["page"] == ["2"]
+
+class TestFetchPage:
+    def test_raises_on_http_error(self):
+        session = MagicMock()
+        response = make_response({})
+        response.raise_for_status.side_effect = Exception("500")
+        session.get.return_value = response
+        
+        with pytest.raises(Exception):
+            fetch_page(session, "https://example.com")
+
+class TestRetries:
+    @patch('src.fetcher.time.sleep')
+    def test_retries_throttled_request(self, mock_sleep):
+        session = MagicMock()
+        session.get.side_effect = [
+            make_response(None, status_code=429, headers={"Retry-After": "3"}),
+            make_response({"articles": [{"id": 1}]})
+        ]
+        throttle = FetchThrottle(4)
+        
+        data = fetch_page(session, "https://example.com", throttle=throttle)
+        
+        assert data == {"articles": [{"id": 1}]}
+        mock_sleep.assert_called_once_with(3.0)
+        assert throttle.throttled_count == 1
+        assert throttle.throttled_seconds == 3.0
+
+    @patch('src.fetcher.time.sleep')
+    def test_retries_server_errors_with_backoff(self, mock_sleep):
+        session = MagicMock()
+        session.get.side_effect = [
+            make_response(None, status_code=503),
+            make_response(None, status_code=502),
+            make_response({"articles": []})
+        ]
+        throttle = FetchThrottle(4)
+        
+        fetch_page(session, "https://example.com", throttle=throttle)
+        
+        assert session.get.call_count == 3
+        assert mock_sleep.call_count == 2
+        # 503 is Zendesk shedding load; a 502 from a proxy says nothing about our request rate
+        assert throttle.throttled_count == 1
+
+    @patch('src.fetcher.time.sleep')
+    @patch('src.fetcher.FETCH_MAX_RETRIES', 2)
+    def test_gives_up_after_max_retries(self, mock_sleep):
+        session = MagicMock()
+        response = make_response(None, status_code=429)
+        response.raise_for_status.side_effect = Exception("429")
+        session.get.return_value = response
+        
+        with pytest.raises(Exception):
+            fetch_page(session, "https://example.com")
+        
+        assert session.get.call_count == 3
+
+    @patch('src.fetcher.time.sleep')
+    def test_retries_connection_errors_and_timeouts(self, mock_sleep):
+        session = MagicMock()
+        session.get.side_effect = [
+            requests.ConnectionError("reset"),
+            requests.ReadTimeout("stalled"),
+            make_response({"articles": []})
+        ]
+        throttle = FetchThrottle(4)
+        
+        assert fetch_page(session, "https://example.com", throttle=throttle) == {"articles": []}
+        assert mock_sleep.call_count == 2
+        # A network blip isn't server throttling, so concurrency and the throttle stats stay put
+        assert throttle.throttled_count == 0
+        assert throttle.concurrency == 4
+        assert session.get.call_args.kwargs["timeout"] == FETCH_TIMEOUT
+
+    @patch('src.fetcher.time.sleep')
+    @patch('src.fetcher.FETCH_MAX_RETRIES', 1)
+    def test_raises_connection_error_after_max_retries(self, mock_sleep):
+        session = MagicMock()
+        session.get.side_effect = requests.ConnectTimeout("unreachable")
+        
+        with pytest.raises(requests.ConnectTimeout):
+            fetch_page(session, "https://example.com")
+        
+        assert session.get.call_count == 2
+
+    def test_does_not_retry_client_errors(self):
+        session = MagicMock()
+        response = make_response(None, status_code=404)
+        response.raise_for_status.side_effect = Exception("404")
+        session.get.return_value = response
+        
+        with pytest.raises(Exception):
+            fetch_page(session, "https://example.com")
+        
+        assert session.get.call_count == 1
+
+class TestGetRetryDelay:
+    def test_honors_retry_after_seconds(self):
+        assert get_retry_delay(make_response(None, 429, {"Retry-After": "7"}), 0) == 7.0
+
+    def test_honors_retry_after_http_date(self):
+        response = make_response(None, 429, {"Retry-After": "Mon, 15 Jan 2024 10:30:00 GMT"})
+        assert get_retry_delay(response, 0) == 0.0
+
+    @patch('src.fetcher.FETCH_BACKOFF_BASE', 1)
+    @patch('src.fetcher.FETCH_BACKOFF_MAX', 60)
+    def test_jittered_backoff_is_capped(self):
+        for attempt in range(10):
+            delay = get_retry_delay(make_response(None, 503), attempt)
+            assert 0 <= delay <= min(60, 2 ** attempt)
+
+class TestFetchThrottle:
+    def test_halves_concurrency_on_throttle(self):
+        throttle = FetchThrottle(8)
+        
+        throttle.on_throttle(1)
+        throttle.on_throttle(1)
+        
+        assert throttle.concurrency == 2
+        assert throttle.throttled_seconds == 2
+
+    def test_never_drops_below_one(self):
+        throttle = FetchThrottle(2)
+        
+        for _ in range(5):
+            throttle.on_throttle(0)
+        
+        assert throttle.concurrency == 1
+
+    def test_grows_by_one_per_successful_window(self):
+        throttle = FetchThrottle(8)
+        throttle.on_throttle(0)
+        throttle.on_throttle(0)
+        
+        for _ in range(2):
+            throttle.on_success()
+        assert throttle.concurrency == 3
+        
+        for _ in range(100):
+            throttle.on_success()
+        assert throttle.concurrency == 8
+
+class TestConditionalCache:
+    def test_stores_validators_and_body(self, tmp_path):
+        session = MagicMock()
+        session.get.return_value = make_response({"articles": [{"id": 1}]}, headers={"ETag": '"v1"'})
+        
+        fetch_page(session, "https://example.com/articles", tmp_path)
+        
+        cached = load_cached_page(tmp_path, "https://example.com/articles")
+        assert cached["etag"] == '"v1"'
+        assert cached["body"] == {"articles": [{"id": 1}]}
+
+    def test_sends_validators_and_reuses_body_on_304(self, tmp_path):
+        session = MagicMock()
+        session.get.side_effect = [
+            make_response({"articles": [{"id": 1}]}, headers={"ETag": '"v1"', "Last-Modified": "Mon, 15 Jan 2024 10:30:00 GMT"}),
+            make_response(None, status_code=304)
+        ]
+        
+        fetch_page(session, "https://example.com/articles", tmp_path)
+        data = fetch_page(session, "https://example.com/articles", tmp_path)
+        
+        sent_headers = session.get.call_args_list[1].kwargs["headers"]
+        assert sent_headers["If-None-Match"] == '"v1"'
+        assert sent_headers["If-Modified-Since"] == "Mon, 15 Jan 2024 10:30:00 GMT"
+        assert data == {"articles": [{"id": 1}]}
+
+    def test_skips_cache_without_validators(self, tmp_path):
+        session = MagicMock()
+        session.get.return_value = make_response({"articles": []})
+        
+        fetch_page(session, "https://example.com/articles", tmp_path)
+        
+        assert load_cached_page(tmp_path, "https://example.com/articles") is None
+
+    def test_no_conditional_headers_without_cache_dir(self):
+        session = MagicMock()
+        session.get.return_value = make_response({"articles": []}, headers={"ETag": '"v1"'})
+        
+        fetch_page(session, "https://example.com/articles")
+        
+        assert session.get.call_args.kwargs["headers"] == {}
+
+class TestFetchAllPages:
+    def test_fetches_remaining_pages_in_order(self):
+        pages = [
+            {"articles": [{"id": page * 10 + i} for i in range(2)], "page_count": 5}
+            for page in range(1, 6)
+        ]
+        session = make_paged_session(pages)
+        
+        articles = fetch_all_pages(session, "https://example.com/articles?per_page=2", workers=4)
+        
+        assert [a["id"] for a in articles] == [page * 10 + i for page in range(1, 6) for i in range(2)]
+        assert session.get.call_count == 5
+
+    def test_single_page(self):
+        session = make_paged_session([{"articles": [{"id": 1}], "page_count": 1}])
+        
+        articles = fetch_all_pages(session, "https://example.com/articles", workers=4)
+        
+        assert articles == [{"id": 1}]
+        assert session.get.call_count == 1
+
+    def test_falls_back_to_next_page_without_page_count(self):
+        session = MagicMock()
+        session.get.side_effect = [
+            make_response({"articles": [{"id": 1}], "next_page": "https://example.com/p2"}),
+            make_response({"articles": [{"id": 2}], "next_page": None})
+        ]
+        
+        articles = fetch_all_pages(session, "https://example.com/articles", workers=4)
+        
+        assert [a["id"] for a in articles] == [1, 2]
+
+class TestIterAllPages:
+    def test_yields_pages_in_order(self):
+        pages = [
+            {"articles": [{"id": page}], "page_count": 4}
+            for page in range(1, 5)
+        ]
+        session = make_paged_session(pages)
+        
+        yielded = list(iter_all_pages(session, "https://example.com/articles", workers=2))
+        
+        assert yielded == [[{"id": 1}], [{"id": 2}], [{"id": 3}], [{"id": 4}]]
+
+    def test_bounds_pages_in_flight(self):
+        pages = [
+            {"articles": [{"id": page}], "page_count": 10}
+            for page in range(1, 11)
+        ]
+        session = make_paged_session(pages)
+        
+        stream = iter_all_pages(session, "https://example.com/articles", workers=2)
+        next(stream)
+        next(stream)
+        
+        # First page, plus at most `workers` pages prefetched ahead of the consumer
+        assert session.get.call_count <= 4
+        stream.close()
+
+    def test_limits_in_flight_pages_to_throttle_concurrency(self):
+        pages = [
+            {"articles": [{"id": page}], "page_count": 10}
+            for page in range(1, 11)
+        ]
+        session = make_paged_session(pages)
+        throttle = FetchThrottle(4)
+        throttle.concurrency = 1
+        throttle.max_concurrency = 1
+        
+        stream = iter_all_pages(session, "https://example.com/articles", workers=4, throttle=throttle)
+        next(stream)
+        next(stream)
+        
+        assert session.get.call_count <= 3
+        stream.close()
+
+class TestPrefetch:
+    def test_yields_items_in_order(self):
+        assert list(prefetch(iter(range(50)), maxsize=3)) == list(range(50))
+
+    def test_reraises_producer_errors(self):
+        def produce():
+            yield 1
+            raise ValueError("page failed")
+        
+        stream = prefetch(produce(), maxsize=2)
+        
+        assert next(stream) == 1
+        with pytest.raises(ValueError):
+            next(stream)
+
+    def test_stops_producer_when_consumer_stops(self):
+        produced = []
+        
+        def produce():
+            for i in range(1000):
+                produced.append(i)
+                yield i
+        
+        stream = prefetch(produce(), maxsize=2)
+        next(stream)
+        stream.close()
+        
+        assert len(produced) < 1000
@@ -2,23 +2,42 @@ import pytest
 from unittest.mock import Mock, patch, mock_open, MagicMock
 from pathlib import Path
 import json
+import random
+import time
+import re
 import sys
 from datetime import datetime
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from src.boilerplate import paragraph_fingerprint
+from src.helper import load_hash_store, save_hash_store
+from src.archive import read_chunk
 from src.scraper import (
     clean_html,
+    html_to_markdown,
     create_slug,
     count_tokens,
+    count_tokens_batch,
     chunk_text,
+    chunk_text_optimal,
+    chunk_text_bounded,
     find_backward_safe_split,
     is_heading,
     is_in_code_block,
+    build_structure_index,
     process_article,
+    record_token_counts,
+    iter_restrip_articles,
+    index_paragraph_fingerprints,
     fetch_articles,
     fetch_updated_articles,
+    iter_articles,
+    iter_updated_articles,
+    has_updated_articles,
+    iter_article_outcomes,
     delete_old_chunks,
+    rebuild_chunk_manifests,
     scraper
 )
 
@@ -62,6 +81,59 @@ class TestCleanHTML:
         result = clean_html(html)
         assert "Simple text" in result
 
+    @patch('src.scraper.HTML_PARSER', 'html.parser')
+    def test_matches_css_selector_cleaning(self, sample_html):
+        from bs4 import BeautifulSoup
+        
+        html = sample_html + """
+            <div class="header-title">Substring match on class</div>
+            <p id="download-link">Substring match on id</p>
+            <section><div><span class="menu-item">Nested</span><p>Kept</p></div></section>
+            <ul class="steps"><li>Step one</li></ul>
+        """
+        
+        soup = BeautifulSoup(html, 'html.parser')
+        for selector in ['nav', 'header', 'footer', '[class*="nav"]', '[class*="menu"]',
+                         '[class*="sidebar"]', '[class*="ad"]', '[id*="nav"]', '[id*="menu"]',
+                         '[id*="sidebar"]', '[id*="ad"]', 'script', 'style', 'iframe']:
+            for element in soup.select(selector):
+                element.decompose()
+        
+        assert clean_html(html) == str(soup)
+
+    @patch('src.scraper.HTML_PARSER', 'lxml')
+    def test_lxml_keeps_fragments_unwrapped(self):
+        pytest.importorskip("lxml")
+        
+        result = clean_html("<p>Simple text</p><nav>Navigation</nav>")
+        
+        assert result == "<p>Simple text</p>"
+
+
+class TestHtmlToMarkdown:
+    def assert_matches_markdownify(self, html):
+        from markdownify import markdownify
+        assert html_to_markdown(html) == markdownify(clean_html(html), heading_style="ATX")
+
+    @patch('src.scraper.HTML_PARSER', 'html.parser')
+    def test_matches_two_pass_conversion(self, sample_html, sample_article):
+        self.assert_matches_markdownify(sample_html)
+        self.assert_matches_markdownify(sample_article["body"])
+
+    @patch('src.scraper.HTML_PARSER', 'html.parser')
+    def test_matches_when_removal_splits_text(self):
+        self.assert_matches_markdownify('hello<br>  world <script>x()</script>  world &nbsp;')
+        self.assert_matches_markdownify('<p>one <span class="menu">skip</span> two</p>')
+
+    @patch('src.scraper.HTML_PARSER', 'html.parser')
+    def test_matches_lists_code_and_links(self):
+        self.assert_matches_markdownify(
+            '<h2>Steps</h2><ol><li>Click <a href="https://x.com/a">here</a></li><li>Save</li></ol>'
+            '<pre><code>print("hi")\n</code></pre><table><tr><th>A</th></tr><tr><td>1</td></tr></table>'
+        )
+
+    def test_handles_empty_html(self):
+        assert html_to_markdown("") == ""
 
 class TestCreateSlug:
     def test_basic_slug_creation(self):
@@ -122,6 +194,13 @@ class TestCountTokens:
         result = count_tokens(code)
         assert result > 5
 
+    def test_batch_matches_single_counts(self):
+        texts = ["Hello world", "", "def hello():\n    return True", "Long text. " * 50]
+        assert count_tokens_batch(texts) == [count_tokens(text) for text in texts]
+
+    def test_empty_batch(self):
+        assert count_tokens_batch([]) == []
+
 class TestChunkText:
     def test_text_smaller_than_max_returns_single_chunk(self):
         text = "Short text"
@@ -173,6 +252,30 @@ class TestChunkText:
         all_text = ''.join(chunks)
         assert '```python' in all_text or all_text.count('```') % 2 == 0
 
+    def test_encodes_text_once(self, long_text_with_headings):
+        from src.tokenizer import get_tokenizer
+        mock_tokenizer = Mock(wraps=get_tokenizer())
+        
+        with patch('src.scraper.get_tokenizer', return_value=mock_tokenizer):
+            chunks = chunk_text(long_text_with_headings * 5, max_tokens=50)
+        
+        assert len(chunks) > 1
+        assert mock_tokenizer.encode.call_count == 1
+
+    def test_chunks_stay_within_token_budget(self, long_text_with_headings):
+        text = long_text_with_headings * 5
+        
+        for max_tokens in (30, 50, 120):
+            for chunk in chunk_text(text, max_tokens=max_tokens):
+                # Re-encoding a slice can merge a token or two differently at its edges
+                assert count_tokens(chunk) <= max_tokens + 2
+
+    def test_chunks_cover_whole_text(self, long_text_with_headings):
+        chunks = chunk_text(long_text_with_headings, max_tokens=40)
+        
+        assert long_text_with_headings.startswith(chunks[0])
+        assert long_text_with_headings.rstrip().endswith(chunks[-1])
+
     def test_handles_lists_properly(self, text_with_lists):
         chunks = chunk_text(text_with_lists, max_tokens=40)
         
@@ -183,6 +286,134 @@ class TestChunkText:
                 if list_lines:
                     assert True
 
+class TestTokenBudgetFastPath:
+    def test_short_text_skips_encoding(self):
+        from src.tokenizer import get_tokenizer
+        tokenizer = Mock(wraps=get_tokenizer())
+        
+        with patch('src.scraper.get_tokenizer', return_value=tokenizer):
+            for chunker in (chunk_text, chunk_text_optimal, chunk_text_bounded):
+                assert chunker("Short text", max_tokens=100) == ["Short text"]
+        
+        assert not tokenizer.encode.called
+
+class TestChunkTextOptimal:
+    def test_short_and_empty_text(self):
+        assert chunk_text_optimal("Short text", max_tokens=100) == ["Short text"]
+        assert chunk_text_optimal("   \n\n  ", max_tokens=100) == []
+
+    def test_chunks_stay_within_token_budget(self, long_text_with_headings):
+        text = long_text_with_headings * 5
+        
+        for max_tokens in (30, 50, 120):
+            for chunk in chunk_text_optimal(text, max_tokens=max_tokens):
+                assert count_tokens(chunk) <= max_tokens + 2
+
+    def test_never_uses_more_chunks_than_greedy(self, long_text_with_headings, text_with_lists):
+        for text in (long_text_with_headings * 5, text_with_lists * 5, "Sentence one. " * 200):
+            for max_tokens in (40, 80):
+                assert len(chunk_text_optimal(text, max_tokens)) <= len(chunk_text(text, max_tokens))
+
+    def test_prefers_heading_boundaries(self):
+        section = "## Section\n\n" + "Words and more words. " * 8 + "\n\n"
+        text = section * 6
+        
+        chunks = chunk_text_optimal(text, max_tokens=count_tokens(section) * 2, overlap_pct=0)
+        
+        assert len(chunks) == 3
+        assert all(chunk.startswith("## Section") for chunk in chunks)
+
+    def test_does_not_split_code_blocks_that_fit(self):
+        code = "```\n" + "\n".join(f"line_{i} = {i}" for i in range(10)) + "\n```\n\n"
+        text = ("Intro sentence here. " * 5 + "\n\n" + code) * 4
+        
+        for chunk in chunk_text_optimal(text, max_tokens=count_tokens(code) * 2, overlap_pct=0):
+            assert chunk.count("```") % 2 == 0
+
+    def test_falls_back_to_token_cuts_without_structure(self):
+        text = "x" * 5000
+        
+        chunks = chunk_text_optimal(text, max_tokens=50, overlap_pct=0)
+        
+        assert "".join(chunks) == text
+
+ADVERSARIAL_FRAGMENTS = [
+    "a=b;c=d;",                      # minified code: no whitespace at all
+    "x\n",                           # a newline after every token
+    "# h\n",                         # a heading on every line
+    "```\n",                         # fences that may never close
+    "| a | b | c |\n",               # giant table rows
+    "- item\n",
+    "\n\n\n",
+    "End. ",
+    "[link](https://example.com) ",
+    "word " * 30,
+]
+
+def make_adversarial_markdown(rng):
+    fragment_pool = rng.sample(ADVERSARIAL_FRAGMENTS, rng.randint(1, 3))
+    # Up to ~80 KB: large enough for thousands of windows, small enough to check coverage quickly
+    return "".join(rng.choice(fragment_pool) * rng.randint(1, 100) for _ in range(rng.randint(1, 20)))
+
+# The deadline is checked before each window search, after the full encode and decode,
+# so a run may overshoot its budget by that fixed cost; the bound leaves ample room for it
+FUZZ_TIME_BUDGET = 0.1
+FUZZ_RUNTIME_BOUND = FUZZ_TIME_BUDGET * 10
+
+class TestChunkTextBounded:
+    def test_short_and_empty_text(self):
+        assert chunk_text_bounded("Short text", max_tokens=100) == ["Short text"]
+        assert chunk_text_bounded("   \n\n  ", max_tokens=100) == []
+
+    def test_prefers_boundaries_near_chunk_end(self):
+        section = "## Section\n\n" + "Words and more words. " * 8 + "\n\n"
+        text = section * 6
+        
+        for chunk in chunk_text_bounded(text, max_tokens=count_tokens(section), overlap_pct=0.5)[:-1]:
+            assert chunk.endswith(".")
+
+    def test_time_budget_falls_back_to_token_slices(self, long_text_with_headings):
+        text = long_text_with_headings * 5
+        
+        chunks = chunk_text_bounded(text, max_tokens=40, overlap_pct=0, time_budget=0)
+        
+        # Pure token slices: every chunk but the last is cut exactly at the budget
+        assert len(chunks) == -(-count_tokens(text) // 40)
+        assert all(count_tokens(chunk) <= 40 for chunk in chunks)
+
+    @pytest.mark.slow
+    def test_fuzz_progress_budget_and_runtime_bounds(self):
+        rng = random.Random(19)
+        
+        for _ in range(60):
+            text = make_adversarial_markdown(rng)
+            max_tokens = rng.choice([8, 20, 50, 200])
+            overlap_pct = rng.choice([0, 0.15, 0.5, 0.9])
+            n_tokens = count_tokens(text)
+            overlap_tokens = min(int(max_tokens * overlap_pct), max_tokens - 1)
+            stride = max_tokens - overlap_tokens
+            
+            start = time.perf_counter()
+            chunks = chunk_text_bounded(text, max_tokens, overlap_pct, time_budget=FUZZ_TIME_BUDGET)
+            elapsed = time.perf_counter() - start
+            
+            assert len(chunks) <= max(1, -(-(n_tokens - overlap_tokens) // stride))
+            assert all(count_tokens(chunk) <= max_tokens + 2 for chunk in chunks)
+            assert elapsed < FUZZ_RUNTIME_BOUND
+            
+            # Each chunk starts no later than the text covered so far (skipping whitespace),
+            # so nothing is dropped. Repetitive input makes a chunk match in several places;
+            # the latest admissible match covers the most.
+            covered = 0
+            for chunk in chunks:
+                gap_end = covered
+                while gap_end < len(text) and text[gap_end].isspace():
+                    gap_end += 1
+                found = text.rfind(chunk, 0, gap_end + len(chunk))
+                assert found != -1
+                covered = max(covered, found + len(chunk))
+            assert not text[covered:].strip()
+
 class TestFindBackwardSafeSplit:
     def test_finds_heading(self):
         text = "Some text\n\n## Heading\n\nMore text"
@@ -242,25 +473,262 @@ class TestIsInCodeBlock:
         assert is_in_code_block(text, 5)
         assert not is_in_code_block(text, 20)
 
+def reference_is_in_code_block(text, position):
+    return text[:position].count('```') % 2 == 1
+
+def reference_find_backward_safe_split(text, target_pos):
+    # Line-splitting implementation the structural index replaced, kept as the oracle
+    if target_pos >= len(text):
+        return len(text)
+    
+    search_start = max(0, int(target_pos * 0.5))
+    
+    if reference_is_in_code_block(text, target_pos):
+        code_start = text.rfind('```', 0, target_pos)
+        if code_start > search_start:
+            return code_start
+    
+    lines = text[:target_pos].split('\n')
+    for i in range(len(lines) - 1, max(0, len(lines) - 20), -1):
+        if is_heading(lines[i].strip()):
+            return sum(len(l) + 1 for l in lines[:i])
+    
+    next_line_start = text.rfind('\n', search_start, target_pos)
+    if next_line_start != -1 and next_line_start > search_start:
+        potential_line = text[next_line_start:target_pos].strip()
+        if '](' in potential_line or '![' in potential_line:
+            link_start = text.rfind('[', search_start, next_line_start)
+            if link_start > search_start:
+                return link_start
+    
+    para_break = text.rfind('\n\n', search_start, target_pos)
+    if para_break > search_start:
+        return para_break + 2
+    
+    for i in range(len(lines) - 1, max(0, len(lines) - 10), -1):
+        line = lines[i].strip()
+        if re.match(r'^[\*\-\+\d]+\.?\s', line) and i < len(lines) - 1:
+            next_line = lines[i + 1].strip()
+            if not next_line or not re.match(r'^[\*\-\+\d]+\.?\s|^\s+', next_line):
+                pos = sum(len(l) + 1 for l in lines[:i+1])
+                if pos > search_start:
+                    return pos
+    
+    sentence_end = max(
+        text.rfind('. ', search_start, target_pos),
+        text.rfind('.\n', search_start, target_pos),
+        text.rfind('!\n', search_start, target_pos),
+        text.rfind('?\n', search_start, target_pos)
+    )
+    if sentence_end > search_start:
+        return sentence_end + 2
+    
+    last_newline = text.rfind('\n', search_start, target_pos)
+    if last_newline > search_start:
+        return last_newline + 1
+    
+    return target_pos
+
+class TestStructureIndex:
+    PIECES = [
+        '# H', '## Head two', '####### no', '#', '#x', '## ', '\n', '\n\n', '```', '````', '`',
+        ' ', '  ', '\t', 'word', 'text here', '. ', '.', '!', '?', '- item', '* x', '1. one',
+        '12.a', '+ p', '-', '1.', '[link](u)', '![img](i)', '[', ']', '('
+    ]
+
+    def assert_matches_reference(self, text):
+        index = build_structure_index(text)
+        for pos in range(len(text) + 2):
+            assert find_backward_safe_split(text, pos, index) == reference_find_backward_safe_split(text, pos), (text, pos)
+            assert is_in_code_block(text, pos, index) == reference_is_in_code_block(text, pos), (text, pos)
+
+    def test_matches_reference_on_fixtures(self, long_text_with_headings, text_with_lists):
+        self.assert_matches_reference(long_text_with_headings)
+        self.assert_matches_reference(text_with_lists)
+
+    def test_matches_reference_on_random_markdown(self):
+        rng = random.Random(0)
+        for _ in range(300):
+            text = ''.join(
+                rng.choice(self.PIECES) + rng.choice(['', '\n', ' '])
+                for _ in range(rng.randint(1, 60))
+            )
+            self.assert_matches_reference(text)
+
+    def test_records_structure(self):
+        text = "# Title\n\nIntro. More\n- a\n- b\n\n```\ncode\n```\n"
+        index = build_structure_index(text)
+        
+        assert index["heading_lines"] == [0]
+        assert index["list_end_lines"] == [4]
+        assert index["fence_starts"] == [text.index("```"), text.rindex("```")]
+        assert index["paragraph_breaks"] == [7, text.index("\n\n```")]
+        assert index["sentence_ends"] == [text.index(". ")]
+
 class TestDeleteOldChunks:
-    def test_deletes_matching_chunks(self, temp_directories):
+    def test_deletes_manifest_chunks(self, temp_directories):
         markdown_dir = temp_directories["markdown_dir"]
         
         (markdown_dir / "123-test-slug-part1.md").write_text("chunk1")
         (markdown_dir / "123-test-slug-part2.md").write_text("chunk2")
         (markdown_dir / "456-other-part1.md").write_text("other")
         
-        delete_old_chunks(123, "test-slug", markdown_dir)
+        delete_old_chunks(123, ["123-test-slug-part1.md", "123-test-slug-part2.md"], markdown_dir)
         
         assert not (markdown_dir / "123-test-slug-part1.md").exists()
         assert not (markdown_dir / "123-test-slug-part2.md").exists()
         assert (markdown_dir / "456-other-part1.md").exists()
 
-    def test_handles_no_matching_chunks(self, temp_directories):
+    def test_records_without_manifest_delete_every_chunk_of_the_article(self, temp_directories):
+        markdown_dir = temp_directories["markdown_dir"]
+        
+        (markdown_dir / "123-old-title-part1.md").write_text("renamed")
+        (markdown_dir / "123-test-slug-part1.md").write_text("chunk1")
+        (markdown_dir / "1234-other-part1.md").write_text("other")
+        
+        delete_old_chunks(123, None, markdown_dir)
+        
+        assert sorted(path.name for path in markdown_dir.iterdir()) == ["1234-other-part1.md"]
+
+    def test_handles_missing_chunks(self, temp_directories):
+        markdown_dir = temp_directories["markdown_dir"]
+        delete_old_chunks(999, ["999-gone-part1.md"], markdown_dir)
+
+    def test_renamed_article_leaves_no_orphans(self, sample_article, empty_hash_store, temp_directories):
         markdown_dir = temp_directories["markdown_dir"]
-        delete_old_chunks(999, "nonexistent", markdown_dir)
+        process_article(sample_article, empty_hash_store, temp_directories["raw_data_dir"], markdown_dir)
+        renamed = dict(sample_article, title="Embedding YouTube Videos", body="<p>New steps</p>")
+        _, chunk_paths = process_article(renamed, empty_hash_store, temp_directories["raw_data_dir"], markdown_dir)
+        
+        assert sorted(markdown_dir.iterdir()) == sorted(chunk_paths)
+        assert empty_hash_store["articles"]["123456"]["chunk_files"] == [path.name for path in chunk_paths]
+
+    def test_renamed_article_replaces_its_raw_file(self, sample_article, empty_hash_store, temp_directories):
+        raw_data_dir = temp_directories["raw_data_dir"]
+        process_article(sample_article, empty_hash_store, raw_data_dir, temp_directories["markdown_dir"])
+        renamed = dict(sample_article, title="Embedding YouTube Videos", body="<p>New steps</p>")
+        process_article(renamed, empty_hash_store, raw_data_dir, temp_directories["markdown_dir"])
+        
+        assert [path.name for path in raw_data_dir.iterdir()] == ["123456-embedding-youtube-videos.json"]
+        assert empty_hash_store["articles"]["123456"]["raw_file"] == "123456-embedding-youtube-videos.json"
+
+class TestRebuildChunkManifests:
+    def test_finds_orphans_and_rebuilds_manifests(self, sample_article, empty_hash_store, temp_directories):
+        raw_data_dir, markdown_dir = temp_directories["raw_data_dir"], temp_directories["markdown_dir"]
+        _, chunk_paths = process_article(sample_article, empty_hash_store, raw_data_dir, markdown_dir)
+        del empty_hash_store["articles"]["123456"]["chunk_files"]
+        (markdown_dir / "123456-old-title-part1.md").write_text("old slug")
+        (markdown_dir / "777-deleted-article-part1.md").write_text("gone from the help center")
+        
+        orphans = rebuild_chunk_manifests(empty_hash_store, raw_data_dir, markdown_dir)
+        
+        assert orphans == ["123456-old-title-part1.md", "777-deleted-article-part1.md"]
+        assert empty_hash_store["articles"]["123456"]["chunk_files"] == [path.name for path in chunk_paths]
+
+    def test_stale_raw_file_never_claims_the_manifest(self, sample_article, empty_hash_store, temp_directories):
+        raw_data_dir, markdown_dir = temp_directories["raw_data_dir"], temp_directories["markdown_dir"]
+        process_article(dict(sample_article, title="Old Title"), empty_hash_store, raw_data_dir, markdown_dir)
+        renamed = dict(sample_article, title="New Title", body="<p>New steps</p>")
+        _, chunk_paths = process_article(renamed, empty_hash_store, raw_data_dir, markdown_dir)
+        # An artifact restore brings the old raw file back, newer than the current one
+        (raw_data_dir / "123456-old-title.json").write_text(json.dumps(dict(sample_article, title="Old Title")))
+        
+        orphans = rebuild_chunk_manifests(empty_hash_store, raw_data_dir, markdown_dir)
+        
+        assert orphans == []
+        assert empty_hash_store["articles"]["123456"]["chunk_files"] == [path.name for path in chunk_paths]
+
+    def test_records_without_raw_file_are_matched_by_source_hash(self, sample_article, empty_hash_store, temp_directories):
+        raw_data_dir, markdown_dir = temp_directories["raw_data_dir"], temp_directories["markdown_dir"]
+        process_article(dict(sample_article, title="Old Title"), empty_hash_store, raw_data_dir, markdown_dir)
+        old_raw = (raw_data_dir / "123456-old-title.json").read_text()
+        renamed = dict(sample_article, title="New Title", body="<p>New steps</p>")
+        _, chunk_paths = process_article(renamed, empty_hash_store, raw_data_dir, markdown_dir)
+        (raw_data_dir / "123456-old-title.json").write_text(old_raw)
+        del empty_hash_store["articles"]["123456"]["raw_file"]
+        
+        orphans = rebuild_chunk_manifests(empty_hash_store, raw_data_dir, markdown_dir)
+        
+        assert orphans == []
+        assert empty_hash_store["articles"]["123456"]["raw_file"] == "123456-new-title.json"
+        assert empty_hash_store["articles"]["123456"]["chunk_files"] == [path.name for path in chunk_paths]
 
 class TestProcessArticle:
+    def test_records_token_count_per_chunk(self, sample_article, empty_hash_store, temp_directories):
+        _, chunk_paths = process_article(
+            sample_article,
+            empty_hash_store,
+            temp_directories["raw_data_dir"],
+            temp_directories["markdown_dir"]
+        )
+        
+        record = empty_hash_store["articles"]["123456"]
+        assert record["num_tokens"] == [count_tokens(path.read_text(encoding='utf-8')) for path in chunk_paths]
+
+    @patch('src.scraper.MAX_CHUNK_TOKENS', 200)
+    @patch('src.scraper.CHUNK_BODY_TOKENS', 150)
+    def test_long_title_shrinks_body_to_fit_max_chunk_tokens(self, sample_article, empty_hash_store, temp_directories):
+        article = sample_article.copy()
+        article["title"] = "A very long article title that keeps going " * 3
+        article["body"] = "<p>" + "Words and more words. " * 600 + "</p>"
+        
+        _, chunk_paths = process_article(
+            article,
+            empty_hash_store,
+            temp_directories["raw_data_dir"],
+            temp_directories["markdown_dir"]
+        )
+        
+        assert len(chunk_paths) > 1
+        assert all(count <= 200 + 2 for count in empty_hash_store["articles"]["123456"]["num_tokens"])
+
+    @patch('src.scraper.MAX_CHUNK_TOKENS', 200)
+    @patch('src.scraper.CHUNK_BODY_TOKENS', 150)
+    def test_overlong_title_is_shortened_instead_of_the_body(self, sample_article, empty_hash_store, temp_directories):
+        article = sample_article.copy()
+        # Punctuation costs tokens but keeps the slug (and the file names) short
+        article["title"] = "Setup: " + "!? " * 150
+        article["body"] = "<p>" + "Words and more words. " * 600 + "</p>"
+        
+        _, chunk_paths = process_article(
+            article,
+            empty_hash_store,
+            temp_directories["raw_data_dir"],
+            temp_directories["markdown_dir"]
+        )
+        
+        first_line = chunk_paths[0].read_text(encoding='utf-8').split("\n")[0]
+        assert first_line.startswith("# Setup:") and first_line.endswith("...")
+        # The body keeps at least half of CHUNK_BODY_TOKENS per chunk instead of collapsing to one token
+        assert len(chunk_paths) <= count_tokens("Words and more words. " * 600) // 30
+        assert all(count <= 200 + 2 for count in empty_hash_store["articles"]["123456"]["num_tokens"])
+
+    def test_token_batch_counts_several_articles_in_one_encode(self, sample_article, empty_hash_store, temp_directories):
+        second_article = sample_article.copy()
+        second_article["id"] = 654321
+        second_article["title"] = "Another Article"
+        token_batch = []
+        
+        from src.tokenizer import get_tokenizer
+        tokenizer = Mock(wraps=get_tokenizer())
+        with patch('src.scraper.get_tokenizer', return_value=tokenizer):
+            for article in (sample_article, second_article):
+                process_article(
+                    article,
+                    empty_hash_store,
+                    temp_directories["raw_data_dir"],
+                    temp_directories["markdown_dir"],
+                    token_batch
+                )
+            assert "num_tokens" not in empty_hash_store["articles"]["123456"]
+            record_token_counts(token_batch)
+        
+        assert token_batch == []
+        assert tokenizer.encode_batch.call_count == 1
+        for article_id in ("123456", "654321"):
+            record = empty_hash_store["articles"][article_id]
+            assert len(record["num_tokens"]) == record["num_chunks"]
+
     def test_adds_new_article(self, sample_article, empty_hash_store, temp_directories):
         action, chunk_paths = process_article(
             sample_article,
@@ -291,6 +759,46 @@ class TestProcessArticle:
         assert action == "HASH_SKIPPED"
         assert chunk_paths == []
 
+    def test_unchanged_raw_body_skips_html_parsing(self, sample_article, empty_hash_store, temp_directories):
+        process_article(
+            sample_article,
+            empty_hash_store,
+            temp_directories["raw_data_dir"],
+            temp_directories["markdown_dir"]
+        )
+        
+        with patch('src.scraper.html_to_markdown') as mock_html_to_markdown:
+            action, chunk_paths = process_article(
+                sample_article,
+                empty_hash_store,
+                temp_directories["raw_data_dir"],
+                temp_directories["markdown_dir"]
+            )
+        
+        assert action == "HASH_SKIPPED"
+        assert not mock_html_to_markdown.called
+
+    def test_records_source_hash_when_only_markup_changed(self, sample_article, empty_hash_store, temp_directories):
+        process_article(
+            sample_article,
+            empty_hash_store,
+            temp_directories["raw_data_dir"],
+            temp_directories["markdown_dir"]
+        )
+        first_source_hash = empty_hash_store["articles"]["123456"]["source_hash"]
+        
+        reformatted = sample_article.copy()
+        reformatted["body"] = sample_article["body"] + "<script>track();</script>"
+        action, chunk_paths = process_article(
+            reformatted,
+            empty_hash_store,
+            temp_directories["raw_data_dir"],
+            temp_directories["markdown_dir"]
+        )
+        
+        assert action == "HASH_SKIPPED"
+        assert empty_hash_store["articles"]["123456"]["source_hash"] != first_source_hash
+
     def test_updates_changed_article(self, sample_article, sample_article_updated, empty_hash_store, temp_directories):
         markdown_dir = temp_directories["markdown_dir"]
         
@@ -313,6 +821,63 @@ class TestProcessArticle:
         assert action == "UPDATED"
         assert len(chunk_paths) > 0
 
+    def test_update_keeps_chunk_file_ids_for_uploader(self, sample_article, sample_article_updated, empty_hash_store, temp_directories):
+        process_article(
+            sample_article,
+            empty_hash_store,
+            temp_directories["raw_data_dir"],
+            temp_directories["markdown_dir"]
+        )
+        empty_hash_store["articles"]["123456"]["chunk_file_ids"] = {"chunk-hash": "file-1"}
+        
+        process_article(
+            sample_article_updated,
+            empty_hash_store,
+            temp_directories["raw_data_dir"],
+            temp_directories["markdown_dir"]
+        )
+        
+        assert empty_hash_store["articles"]["123456"]["chunk_file_ids"] == {"chunk-hash": "file-1"}
+
+    def test_strips_boilerplate_before_chunking(self, sample_article, empty_hash_store, temp_directories):
+        footer = "Still need help? Contact our support team and we will get back to you."
+        article = sample_article.copy()
+        article["body"] = sample_article["body"] + f"<p>{footer}</p>"
+        
+        _, chunk_paths = process_article(
+            article,
+            empty_hash_store,
+            temp_directories["raw_data_dir"],
+            temp_directories["markdown_dir"],
+            boilerplate=frozenset({paragraph_fingerprint(footer)})
+        )
+        
+        assert all(footer not in path.read_text(encoding='utf-8') for path in chunk_paths)
+        record = empty_hash_store["articles"]["123456"]
+        assert record["stripped_paragraphs"] == [paragraph_fingerprint(footer)]
+        assert paragraph_fingerprint(footer) in record["paragraph_fingerprints"]
+
+    def test_reprocesses_unchanged_article_when_boilerplate_changes(self, sample_article, empty_hash_store, temp_directories):
+        footer = "Still need help? Contact our support team and we will get back to you."
+        article = sample_article.copy()
+        article["body"] = sample_article["body"] + f"<p>{footer}</p>"
+        process_article(
+            article,
+            empty_hash_store,
+            temp_directories["raw_data_dir"],
+            temp_directories["markdown_dir"]
+        )
+        
+        action, _ = process_article(
+            article,
+            empty_hash_store,
+            temp_directories["raw_data_dir"],
+            temp_directories["markdown_dir"],
+            boilerplate=frozenset({paragraph_fingerprint(footer)})
+        )
+        
+        assert action == "UPDATED"
+
     def test_creates_raw_json_file(self, sample_article, empty_hash_store, temp_directories):
         process_article(
             sample_article,
@@ -336,6 +901,54 @@ class TestProcessArticle:
         assert sample_article["title"] in chunk_content
         assert sample_article["html_url"] in chunk_content
 
+class TestIterArticleOutcomes:
+    def make_articles(self, sample_article, count):
+        articles = []
+        for i in range(count):
+            article = sample_article.copy()
+            article["id"] = sample_article["id"] + i
+            article["body"] = f"<p>Body {i}</p>" * (1 + i * 50)
+            articles.append(article)
+        return articles
+
+    def run(self, articles, hash_store, temp_directories, workers):
+        results = []
+        for article, outcome in iter_article_outcomes(
+            articles, hash_store, temp_directories["raw_data_dir"], temp_directories["markdown_dir"], workers
+        ):
+            try:
+                action, chunk_paths = outcome()
+                results.append((article["id"], action, [path.name for path in chunk_paths]))
+            except Exception:
+                results.append((article["id"], "ERROR", []))
+        return results
+
+    @pytest.mark.slow
+    def test_pool_matches_serial_processing(self, sample_article, temp_directories):
+        articles = self.make_articles(sample_article, 6)
+        serial_store = {"articles": {}}
+        pool_store = {"articles": {}}
+        
+        serial_results = self.run(articles, serial_store, temp_directories, workers=1)
+        for path in temp_directories["markdown_dir"].glob("*.md"):
+            path.unlink()
+        pool_results = self.run(articles, pool_store, temp_directories, workers=2)
+        
+        # The pool yields outcomes as they complete, so only the order may differ
+        assert sorted(pool_results) == serial_results
+        assert pool_store == serial_store
+
+    @pytest.mark.slow
+    def test_pool_isolates_article_errors(self, sample_article, temp_directories):
+        articles = self.make_articles(sample_article, 3)
+        articles[1]["body"] = None
+        hash_store = {"articles": {}}
+        
+        results = self.run(articles, hash_store, temp_directories, workers=2)
+        
+        assert [action for _, action, _ in sorted(results)] == ["ADDED", "ERROR", "ADDED"]
+        assert str(articles[1]["id"]) not in hash_store["articles"]
+
 class TestFetchArticles:
     @patch('src.scraper.requests.get')
     @patch('src.scraper.ENV', 'development')
@@ -351,9 +964,9 @@ class TestFetchArticles:
         assert len(articles) == 2
         assert mock_get.called
 
-    @patch('src.scraper.requests.get')
+    @patch('src.scraper.create_session')
     @patch('src.scraper.ENV', 'production')
-    def test_production_mode_fetches_all_pages(self, mock_get):
+    def test_production_mode_fetches_all_pages(self, mock_create_session):
         mock_response_1 = Mock()
         mock_response_1.json.return_value = {
             "articles": [{"id": 1}],
@@ -368,6 +981,7 @@ class TestFetchArticles:
         }
         mock_response_2.raise_for_status = Mock()
         
+        mock_get = mock_create_session.return_value.get
         mock_get.side_effect = [mock_response_1, mock_response_2]
         
         articles = fetch_articles()
@@ -417,8 +1031,189 @@ class TestFetchUpdatedArticles:
         assert isinstance(end_time, int)
         assert end_time > 0
 
+class TestIterArticles:
+    @patch('src.scraper.ENV', 'production')
+    def test_streams_listing_and_records_end_time(self, zendesk_stub, monkeypatch, zendesk_articles):
+        monkeypatch.setattr('src.scraper.API_BASE_URL', zendesk_stub.base_url)
+        fetch_state = {}
+        
+        articles = list(iter_articles(fetch_state=fetch_state))
+        
+        assert [a["id"] for a in articles] == [a["id"] for a in zendesk_articles]
+        assert isinstance(fetch_state["end_time"], int)
+
+    def test_incremental_stream_records_end_time(self, zendesk_stub, monkeypatch):
+        monkeypatch.setattr('src.scraper.API_BASE_URL', zendesk_stub.base_url)
+        monkeypatch.setenv("ZENDESK_EMAIL", "agent@example.com")
+        monkeypatch.setenv("ZENDESK_API_TOKEN", "token")
+        incremental_state = {}
+        fetch_state = {}
+        
+        articles = list(iter_updated_articles(0, incremental_state=incremental_state, fetch_state=fetch_state))
+        
+        assert len(articles) == 5
+        assert fetch_state["end_time"] == incremental_state["end_time"]
+
+class TestSortedCrawl:
+    @pytest.fixture(autouse=True)
+    def point_at_stub(self, zendesk_stub, monkeypatch):
+        monkeypatch.setattr('src.scraper.API_BASE_URL', zendesk_stub.base_url)
+
+    @patch('src.scraper.ENV', 'production')
+    def test_stops_at_first_older_article(self, zendesk_stub):
+        start_time = int(datetime.fromisoformat("2024-01-13T00:00:00+00:00").timestamp())
+        
+        articles, end_time = fetch_updated_articles(start_time)
+        
+        assert [a["id"] for a in articles] == [104, 103]
+        listing_requests = [path for path in zendesk_stub.requests if "/en-us/articles" in path]
+        assert len(listing_requests) == 1
+        assert "sort_order=desc" in listing_requests[0]
+
+    @patch('src.scraper.ENV', 'production')
+    def test_requests_no_page_after_the_stop_point(self, zendesk_stub):
+        zendesk_stub.articles = [
+            {"id": 1000 + i, "title": f"Article {i}", "body": "<p>Body</p>", "locale": "en-us", "draft": False,
+             "updated_at": f"2024-{1 + i // 100:02d}-15T10:00:00Z"}
+            for i in range(350)
+        ]
+        start_time = int(datetime.fromisoformat("2024-03-01T00:00:00+00:00").timestamp())
+        
+        articles, end_time = fetch_updated_articles(start_time)
+        
+        assert len(articles) == 150
+        listing_requests = [path for path in zendesk_stub.requests if "/en-us/articles" in path]
+        assert len(listing_requests) == 2
+        assert not any("page=3" in path or "page=4" in path for path in listing_requests)
+
+    @patch('src.scraper.ENV', 'production')
+    def test_keeps_crawling_when_listing_is_unsorted(self, zendesk_stub):
+        zendesk_stub.update_article(100, updated_at="2024-02-01T10:00:00Z")
+        start_time = int(datetime.fromisoformat("2024-01-13T00:00:00+00:00").timestamp())
+        
+        zendesk_stub.ignore_sort = True
+        
+        articles, end_time = fetch_updated_articles(start_time)
+        
+        assert sorted(a["id"] for a in articles) == [100, 103, 104]
+
+    def test_probe_detects_newer_article(self, zendesk_stub):
+        start_time = int(datetime.fromisoformat("2024-01-13T00:00:00+00:00").timestamp())
+        
+        assert has_updated_articles(start_time)
+        assert "per_page=1" in zendesk_stub.requests[-1]
+
+    def test_probe_reports_nothing_newer(self, zendesk_stub):
+        start_time = int(datetime.fromisoformat("2024-03-01T00:00:00+00:00").timestamp())
+        
+        assert not has_updated_articles(start_time)
+        assert len(zendesk_stub.requests) == 1
+
+    def test_probe_without_previous_sync(self, zendesk_stub):
+        assert has_updated_articles(None)
+        assert zendesk_stub.requests == []
+
+class TestFetchIncrementalArticles:
+    @pytest.fixture(autouse=True)
+    def point_at_stub(self, zendesk_stub, monkeypatch):
+        monkeypatch.setattr('src.scraper.API_BASE_URL', zendesk_stub.base_url)
+        monkeypatch.setenv("ZENDESK_EMAIL", "agent@example.com")
+        monkeypatch.setenv("ZENDESK_API_TOKEN", "token")
+
+    def test_follows_cursor_to_end_of_stream(self, zendesk_stub):
+        start_time = int(datetime.fromisoformat("2024-01-11T00:00:00+00:00").timestamp())
+        state = {}
+        
+        articles, end_time = fetch_updated_articles(start_time, incremental_state=state)
+        
+        assert [a["id"] for a in articles] == [101, 102, 103, 104]
+        assert end_time == int(datetime.fromisoformat("2024-01-14T10:00:00+00:00").timestamp())
+        assert state["end_time"] == end_time
+        assert "cursor=" in state["cursor"]
+        assert not any("/en-us/articles" in path for path in zendesk_stub.requests)
+
+    def test_resumes_from_saved_cursor(self, zendesk_stub):
+        state = {}
+        fetch_updated_articles(0, incremental_state=state)
+        
+        zendesk_stub.update_article(101, updated_at="2024-02-01T10:00:00Z")
+        articles, end_time = fetch_updated_articles(0, incremental_state=state)
+        
+        assert [a["id"] for a in articles] == [101]
+
+    def test_no_changes_keeps_start_time(self, zendesk_stub):
+        start_time = int(datetime.fromisoformat("2024-03-01T00:00:00+00:00").timestamp())
+        
+        articles, end_time = fetch_updated_articles(start_time, incremental_state={})
+        
+        assert articles == []
+        assert end_time == start_time
+
+    def test_skips_other_locales_and_drafts(self, zendesk_stub):
+        zendesk_stub.update_article(101, locale="fr")
+        zendesk_stub.update_article(102, draft=True)
+        
+        articles, end_time = fetch_updated_articles(0, incremental_state={})
+        
+        assert [a["id"] for a in articles] == [100, 103, 104]
+
+    @patch('src.scraper.ENV', 'production')
+    def test_falls_back_to_full_crawl_without_credentials(self, zendesk_stub, monkeypatch):
+        monkeypatch.delenv("ZENDESK_API_TOKEN")
+        start_time = int(datetime.fromisoformat("2024-01-12T00:00:00+00:00").timestamp())
+        
+        articles, end_time = fetch_updated_articles(start_time)
+        
+        assert sorted(a["id"] for a in articles) == [102, 103, 104]
+        assert not any("/incremental/" in path for path in zendesk_stub.requests)
+
+class TestRestripArticles:
+    def test_yields_affected_articles_from_raw_data(self, sample_article, empty_hash_store, temp_directories):
+        footer = "Still need help? Contact our support team and we will get back to you."
+        article = sample_article.copy()
+        article["body"] = sample_article["body"] + f"<p>{footer}</p>"
+        process_article(
+            article,
+            empty_hash_store,
+            temp_directories["raw_data_dir"],
+            temp_directories["markdown_dir"]
+        )
+        boilerplate = frozenset({paragraph_fingerprint(footer)})
+        
+        restrip = list(iter_restrip_articles(empty_hash_store, temp_directories["raw_data_dir"], boilerplate, set()))
+        
+        assert restrip == [article]
+        assert list(iter_restrip_articles(empty_hash_store, temp_directories["raw_data_dir"], boilerplate, {"123456"})) == []
+        assert list(iter_restrip_articles(empty_hash_store, temp_directories["raw_data_dir"], frozenset(), set())) == []
+
+    def test_reads_the_raw_file_the_record_was_built_from(self, sample_article, empty_hash_store, temp_directories):
+        raw_data_dir = temp_directories["raw_data_dir"]
+        footer = "Still need help? Contact our support team and we will get back to you."
+        old = dict(sample_article, title="Old Title", body="<p>Old steps</p>" + f"<p>{footer}</p>")
+        current = dict(sample_article, title="New Title", body="<p>New steps</p>" + f"<p>{footer}</p>")
+        process_article(old, empty_hash_store, raw_data_dir, temp_directories["markdown_dir"])
+        process_article(current, empty_hash_store, raw_data_dir, temp_directories["markdown_dir"])
+        # A stale copy under the old slug, newer than the current raw file
+        (raw_data_dir / "123456-old-title.json").write_text(json.dumps(old))
+        boilerplate = frozenset({paragraph_fingerprint(footer)})
+        
+        assert list(iter_restrip_articles(empty_hash_store, raw_data_dir, boilerplate, set())) == [current]
+
+    def test_backfilled_fingerprints_reach_the_persisted_index(self, sample_article, tmp_path, temp_directories):
+        footer = "Still need help? Contact our support team and we will get back to you."
+        article = dict(sample_article, body=sample_article["body"] + f"<p>{footer}</p>")
+        hash_store = load_hash_store(tmp_path)
+        process_article(article, hash_store, temp_directories["raw_data_dir"], temp_directories["markdown_dir"])
+        del hash_store["articles"]["123456"]["paragraph_fingerprints"]
+        save_hash_store(hash_store, tmp_path)
+        
+        hash_store = load_hash_store(tmp_path)
+        assert hash_store.paragraph_counts() == {}
+        assert index_paragraph_fingerprints(hash_store, temp_directories["raw_data_dir"]) == ["123456"]
+        assert paragraph_fingerprint(footer) in load_hash_store(tmp_path).paragraph_counts()
+
 class TestScraperIntegration:
-    @patch('src.scraper.fetch_articles')
+    @patch('src.scraper.iter_articles')
     @patch('src.scraper.save_hash_store')
     @patch('src.scraper.load_hash_store')
     @patch('src.scraper.Path')
@@ -436,7 +1231,7 @@ class TestScraperIntegration:
         assert len(result["added"]) > 0
         assert len(result["updated"]) == 0
 
-    @patch('src.scraper.fetch_updated_articles')
+    @patch('src.scraper.iter_updated_articles')
     @patch('src.scraper.save_hash_store')
     @patch('src.scraper.load_hash_store')
     @patch('src.scraper.Path')
@@ -446,13 +1241,13 @@ class TestScraperIntegration:
         mock_path_class.return_value = mock_path_instance
         
         mock_load.return_value = populated_hash_store
-        mock_fetch.return_value = ([sample_article], 1705400000)
+        mock_fetch.return_value = [sample_article]
         
         result = scraper(1)
         
         assert isinstance(result, dict)
 
-    @patch('src.scraper.fetch_updated_articles')
+    @patch('src.scraper.iter_updated_articles')
     @patch('src.scraper.save_hash_store')
     @patch('src.scraper.load_hash_store')
     @patch('src.scraper.Path')
@@ -465,8 +1260,134 @@ class TestScraperIntegration:
         
         bad_article = sample_article.copy()
         bad_article["body"] = None
-        mock_fetch.return_value = ([bad_article], 1705400000)
+        mock_fetch.return_value = [bad_article]
         
         result = scraper(1)
         
         assert isinstance(result, dict)
+
+    @patch('src.scraper.iter_updated_articles')
+    @patch('src.scraper.save_hash_store')
+    @patch('src.scraper.load_hash_store')
+    @patch('src.scraper.Path')
+    def test_streams_articles_and_saves_end_time(self, mock_path_class, mock_load, mock_save, mock_fetch, sample_article, temp_directories):
+        mock_path_instance = MagicMock()
+        mock_path_instance.parent.parent = temp_directories["base_dir"]
+        mock_path_class.return_value = mock_path_instance
+        
+        mock_load.return_value = {"articles": {}, "last_fetching_time": 1705315800}
+        
+        def stream(start_time, max_articles, cache_dir, incremental_state, fetch_state):
+            for i in range(3):
+                article = sample_article.copy()
+                article["id"] = sample_article["id"] + i
+                yield article
+            fetch_state["end_time"] = 1705400000
+        
+        mock_fetch.side_effect = stream
+        
+        result = scraper(1)
+        
+        saved_store = mock_save.call_args[0][0]
+        assert len(result["added"]) == 3
+        assert saved_store["last_fetching_time"] == 1705400000
+
+class TestScraperResume:
+    START_TIME = 1705315800
+
+    @pytest.fixture
+    def data_dir(self, temp_directories):
+        store = load_hash_store(temp_directories["data_dir"])
+        store["last_fetching_time"] = self.START_TIME
+        save_hash_store(store, temp_directories["data_dir"])
+        
+        with patch('src.scraper.Path') as mock_path_class:
+            mock_path_instance = MagicMock()
+            mock_path_instance.parent.parent = temp_directories["base_dir"]
+            mock_path_class.return_value = mock_path_instance
+            yield temp_directories["data_dir"]
+
+    def make_articles(self, sample_article, count=3):
+        return [dict(sample_article, id=sample_article["id"] + i) for i in range(count)]
+
+    @patch('src.scraper.iter_updated_articles')
+    def test_failed_article_is_retried_next_run(self, mock_fetch, data_dir, sample_article):
+        mock_fetch.return_value = [sample_article]
+        with patch('src.scraper.create_slug', side_effect=RuntimeError("disk full")):
+            result = scraper(1)
+        assert result["added"] == {}
+        
+        # Not fetched again (its updated_at is old now), but retried from the queue
+        mock_fetch.return_value = []
+        result = scraper(1)
+        assert list(result["added"]) == [sample_article["id"]]
+        assert load_hash_store(data_dir).retry_articles() == []
+
+    @patch('src.scraper.CHECKPOINT_ARTICLES', 1)
+    @patch('src.scraper.iter_updated_articles')
+    def test_crash_keeps_finished_articles(self, mock_fetch, data_dir, sample_article):
+        articles = self.make_articles(sample_article)
+        
+        def crashing_stream(*args):
+            yield from articles
+            raise RuntimeError("connection reset")
+        
+        mock_fetch.side_effect = crashing_stream
+        with pytest.raises(RuntimeError):
+            scraper(1)
+        
+        store = load_hash_store(data_dir)
+        assert store["last_fetching_time"] == self.START_TIME
+        assert len(store.read_journal()) == 3
+        
+        # The restarted run skips the committed articles but still hands them to the uploader
+        mock_fetch.side_effect = None
+        mock_fetch.return_value = articles
+        result = scraper(1)
+        assert sorted(result["added"]) == [article["id"] for article in articles]
+
+    @patch('src.scraper.iter_updated_articles')
+    def test_time_budget_stops_without_moving_start_time(self, mock_fetch, data_dir, sample_article):
+        articles = self.make_articles(sample_article)
+        mock_fetch.return_value = articles
+        
+        result = scraper(1, time_budget=0)
+        assert list(result["added"]) == [articles[0]["id"]]
+        assert load_hash_store(data_dir)["last_fetching_time"] == self.START_TIME
+        
+        result = scraper(1)
+        assert sorted(result["added"]) == [article["id"] for article in articles]
+        assert mock_fetch.call_args[0][0] == self.START_TIME
+
+    @patch('src.scraper.BOILERPLATE_MIN_ARTICLES', 2)
+    @patch('src.scraper.iter_updated_articles')
+    def test_first_sync_strips_boilerplate_the_next_run_would_find(self, mock_fetch, data_dir, sample_article):
+        footer = "Still need help? Contact our support team and we will get back to you."
+        articles = [dict(article, body=article["body"] + f"<p>{footer}</p>") for article in self.make_articles(sample_article)]
+        mock_fetch.return_value = articles
+        
+        result = scraper(1)
+        assert sorted(result["added"]) == [article["id"] for article in articles]
+        chunk_paths = [path for paths in result["added"].values() for path in paths]
+        assert not any(footer in read_chunk(path).decode('utf-8') for path in chunk_paths)
+        
+        # The stored corpus now yields the same boilerplate set, so nothing is re-stripped
+        store = load_hash_store(data_dir)
+        store.clear_journal()
+        store.close()
+        mock_fetch.return_value = []
+        result = scraper(1)
+        assert result == {"added": {}, "updated": {}}
+
+    @patch('src.scraper.iter_updated_articles')
+    def test_failed_background_write_stops_before_commit(self, mock_fetch, data_dir, sample_article):
+        mock_fetch.return_value = self.make_articles(sample_article)
+        
+        with patch('src.write_behind.apply_operation', side_effect=OSError("No space left on device")):
+            with pytest.raises(OSError, match="No space left"):
+                scraper(1)
+        
+        store = load_hash_store(data_dir)
+        assert dict(store["articles"]) == {}
+        assert store.read_journal() == []
+        assert store["last_fetching_time"] == self.START_TIME
@@ -0,0 +1,245 @@
+import pytest
+import json
+import sqlite3
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.helper import load_hash_store, save_hash_store
+from src.store import open_hash_store, HASH_STORE_DB
+from src.boilerplate import count_paragraph_fingerprints, find_unindexed_articles, find_restrip_articles
+
+def make_record(file_ids=("file-a", "file-b")):
+    return {
+        "hash": "abc",
+        "source_hash": "def",
+        "openai_file_ids": list(file_ids),
+        "chunk_file_ids": {f"chunk-{file_id}": file_id for file_id in file_ids},
+        "updated_at": "2024-01-15T10:30:00Z",
+        "num_chunks": len(file_ids),
+        "num_tokens": [120, 80],
+    }
+
+class TestHashStore:
+    def test_new_store_matches_empty_json_store(self, tmp_path):
+        store = load_hash_store(tmp_path)
+        assert store.get("last_fetching_time") is None
+        assert dict(store["articles"]) == {}
+        assert (tmp_path / HASH_STORE_DB).exists()
+
+    def test_round_trip(self, tmp_path):
+        store = load_hash_store(tmp_path)
+        store["articles"]["123"] = make_record()
+        store["last_fetching_time"] = 1705315800
+        store.setdefault("incremental", {})["cursor"] = "abc"
+        save_hash_store(store, tmp_path)
+
+        reloaded = load_hash_store(tmp_path)
+        assert reloaded["articles"]["123"] == make_record()
+        assert reloaded["last_fetching_time"] == 1705315800
+        assert reloaded["incremental"] == {"cursor": "abc"}
+
+    def test_in_place_edits_are_saved(self, tmp_path):
+        store = load_hash_store(tmp_path)
+        store["articles"]["123"] = make_record()
+        save_hash_store(store, tmp_path)
+
+        store = load_hash_store(tmp_path)
+        store["articles"]["123"]["openai_file_ids"] = ["file-c"]
+        store["articles"]["123"]["chunk_file_ids"] = {"chunk-c": "file-c"}
+        save_hash_store(store, tmp_path)
+
+        record = load_hash_store(tmp_path)["articles"]["123"]
+        assert record["openai_file_ids"] == ["file-c"]
+        assert record["chunk_file_ids"] == {"chunk-c": "file-c"}
+
+    def test_only_changed_articles_are_written(self, tmp_path):
+        store = load_hash_store(tmp_path)
+        for article_id in ("1", "2", "3"):
+            store["articles"][article_id] = make_record()
+        assert save_hash_store(store, tmp_path) == 3
+
+        store = load_hash_store(tmp_path)
+        for article_id in store["articles"]:
+            store["articles"][article_id]
+        store["articles"]["2"]["hash"] = "changed"
+        assert save_hash_store(store, tmp_path) == 1
+
+    def test_keeps_insertion_order(self, tmp_path):
+        store = load_hash_store(tmp_path)
+        for article_id in ("30", "10", "20"):
+            store["articles"][article_id] = make_record()
+        save_hash_store(store, tmp_path)
+        store["articles"]["5"] = make_record()
+
+        assert list(store["articles"]) == ["30", "10", "20", "5"]
+        assert list(load_hash_store(tmp_path)["articles"]) == ["30", "10", "20"]
+
+    def test_delete(self, tmp_path):
+        store = load_hash_store(tmp_path)
+        store["articles"]["1"] = make_record()
+        save_hash_store(store, tmp_path)
+
+        del store["articles"]["1"]
+        assert "1" not in store["articles"]
+        save_hash_store(store, tmp_path)
+        assert "1" not in load_hash_store(tmp_path)["articles"]
+
+    def test_records_without_file_ids(self, tmp_path):
+        store = load_hash_store(tmp_path)
+        store["articles"]["1"] = {"hash": "abc", "openai_file_ids": [], "num_chunks": 0}
+        save_hash_store(store, tmp_path)
+        assert load_hash_store(tmp_path)["articles"]["1"] == {"hash": "abc", "openai_file_ids": [], "num_chunks": 0}
+
+    def test_indexed_lookups(self, tmp_path):
+        store = load_hash_store(tmp_path)
+        store["articles"]["1"] = dict(make_record(["file-1"]), updated_at="2024-01-01T00:00:00Z")
+        store["articles"]["2"] = dict(make_record(["file-2"]), updated_at="2024-03-01T00:00:00Z")
+        save_hash_store(store, tmp_path)
+
+        assert store["articles"].updated_since("2024-02-01T00:00:00Z") == ["2"]
+        assert store["articles"].find_by_file_id("file-1") == "1"
+        assert store["articles"].find_by_file_id("file-missing") is None
+
+    def test_uses_wal_journal(self, tmp_path):
+        store = load_hash_store(tmp_path)
+        assert store.connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    def test_saving_a_plain_dict(self, tmp_path, populated_hash_store):
+        save_hash_store(populated_hash_store, tmp_path)
+        store = load_hash_store(tmp_path)
+        assert store["articles"]["123456"] == populated_hash_store["articles"]["123456"]
+        assert store["last_fetching_time"] == 1705315800
+
+class TestParagraphCounts:
+    def test_counts_follow_record_changes(self, tmp_path):
+        store = load_hash_store(tmp_path)
+        store["articles"]["1"] = dict(make_record(), paragraph_fingerprints=["footer", "intro"])
+        store["articles"]["2"] = dict(make_record(), paragraph_fingerprints=["footer"])
+        save_hash_store(store, tmp_path)
+        assert count_paragraph_fingerprints(load_hash_store(tmp_path)) == {"footer": 2, "intro": 1}
+        
+        store["articles"]["1"]["paragraph_fingerprints"] = ["footer", "outro"]
+        del store["articles"]["2"]
+        save_hash_store(store, tmp_path)
+        assert count_paragraph_fingerprints(load_hash_store(tmp_path)) == {"footer": 1, "outro": 1}
+
+    def test_unchanged_records_leave_counts_alone(self, tmp_path):
+        store = load_hash_store(tmp_path)
+        store["articles"]["1"] = dict(make_record(), paragraph_fingerprints=["footer"])
+        save_hash_store(store, tmp_path)
+        
+        store = load_hash_store(tmp_path)
+        store["articles"]["1"]["hash"] = "changed"
+        save_hash_store(store, tmp_path)
+        assert load_hash_store(tmp_path).paragraph_counts() == {"footer": 1}
+
+    def test_threshold(self, tmp_path):
+        store = load_hash_store(tmp_path)
+        for article_id in ("1", "2", "3"):
+            store["articles"][article_id] = dict(make_record(), paragraph_fingerprints=["footer"] + (["intro"] if article_id == "1" else []))
+        save_hash_store(store, tmp_path)
+        assert store.paragraph_counts(min_articles=2) == {"footer": 3}
+
+    def test_built_once_for_databases_written_before_the_index(self, tmp_path):
+        store = load_hash_store(tmp_path)
+        store["articles"]["1"] = dict(make_record(), paragraph_fingerprints=["footer"])
+        save_hash_store(store, tmp_path)
+        store.close()
+        
+        connection = sqlite3.connect(tmp_path / HASH_STORE_DB)
+        connection.execute("DELETE FROM paragraph_counts")
+        connection.execute("DELETE FROM paragraphs")
+        connection.execute("PRAGMA user_version = 0")
+        connection.commit()
+        connection.close()
+        
+        store = load_hash_store(tmp_path)
+        assert store.paragraph_counts() == {"footer": 1}
+        assert find_restrip_articles(store, frozenset({"footer"})) == ["1"]
+
+class TestBulkQueries:
+    def make_store(self, tmp_path):
+        store = load_hash_store(tmp_path)
+        store["articles"]["1"] = dict(make_record(), paragraph_fingerprints=["footer", "intro"], stripped_paragraphs=["footer"])
+        store["articles"]["2"] = dict(make_record(), paragraph_fingerprints=["footer"], stripped_paragraphs=[])
+        store["articles"]["3"] = dict(make_record(), paragraph_fingerprints=["intro"], stripped_paragraphs=["intro"])
+        store["articles"]["4"] = make_record()
+        save_hash_store(store, tmp_path)
+        return store
+
+    def test_restrip_candidates_match_a_full_scan(self, tmp_path):
+        store = self.make_store(tmp_path)
+        plain = {"articles": {article_id: dict(store["articles"][article_id]) for article_id in store["articles"]}}
+        
+        for boilerplate in (frozenset(), frozenset({"footer"}), frozenset({"intro"}), frozenset({"footer", "intro"})):
+            expected = find_restrip_articles(plain, boilerplate)
+            assert sorted(find_restrip_articles(load_hash_store(tmp_path), boilerplate)) == sorted(expected), boilerplate
+
+    def test_finds_records_without_fingerprints(self, tmp_path):
+        self.make_store(tmp_path)
+        assert find_unindexed_articles(load_hash_store(tmp_path)) == ["4"]
+
+    def test_cached_edits_are_checked_as_they_are_now(self, tmp_path):
+        self.make_store(tmp_path)
+        store = load_hash_store(tmp_path)
+        store["articles"]["2"]["stripped_paragraphs"] = ["footer"]
+        store["articles"]["4"]["paragraph_fingerprints"] = []
+        
+        assert find_restrip_articles(store, frozenset({"footer"})) == ["3"]
+        assert find_unindexed_articles(store) == []
+
+    def test_startup_lookups_load_no_records(self, tmp_path):
+        self.make_store(tmp_path)
+        store = load_hash_store(tmp_path)
+        
+        find_unindexed_articles(store)
+        count_paragraph_fingerprints(store, 2)
+        find_restrip_articles(store, frozenset({"footer"}))
+        
+        assert store["articles"].records == {}
+
+class TestMigration:
+    def test_imports_json_store_once(self, tmp_path, populated_hash_store):
+        json_path = tmp_path / "hash_store.json"
+        json_path.write_text(json.dumps(populated_hash_store))
+
+        store = open_hash_store(tmp_path)
+        assert store["articles"]["123456"] == populated_hash_store["articles"]["123456"]
+        assert store["last_fetching_time"] == 1705315800
+        assert not json_path.exists()
+        assert (tmp_path / "hash_store.json.migrated").exists()
+
+        # A stale JSON file left next to the database is never imported again
+        json_path.write_text(json.dumps({"articles": {}, "last_fetching_time": None}))
+        assert "123456" in open_hash_store(tmp_path)["articles"]
+
+class TestJournal:
+    def test_checkpoint_commits_records_with_entries(self, tmp_path):
+        store = load_hash_store(tmp_path)
+        store["articles"]["1"] = make_record()
+        store["last_fetching_time"] = 1705315800
+        store.checkpoint(["1"], [{"id": "1", "action": "ADDED", "chunk_paths": ["data/markdown/1-a-part1.md"]}])
+        
+        reloaded = load_hash_store(tmp_path)
+        assert reloaded["articles"]["1"] == make_record()
+        assert reloaded.read_journal() == [{"id": "1", "action": "ADDED", "chunk_paths": ["data/markdown/1-a-part1.md"], "error": None}]
+        # Meta values wait for the end of the run
+        assert reloaded["last_fetching_time"] is None
+
+    def test_failed_articles_are_queued_until_they_succeed(self, tmp_path):
+        store = load_hash_store(tmp_path)
+        article = {"id": 1, "title": "Broken", "body": None}
+        store.checkpoint([], [{"id": "1", "action": "FAILED", "error": "boom", "article": article}])
+        store.checkpoint([], [{"id": "1", "action": "FAILED", "error": "boom", "article": article}])
+        assert load_hash_store(tmp_path).retry_articles() == [article]
+        
+        store.checkpoint([], [{"id": "1", "action": "HASH_SKIPPED"}])
+        assert load_hash_store(tmp_path).retry_articles() == []
+
+    def test_clear_journal(self, tmp_path):
+        store = load_hash_store(tmp_path)
+        store.checkpoint([], [{"id": "1", "action": "UPDATED", "chunk_paths": []}])
+        store.clear_journal()
+        assert load_hash_store(tmp_path).read_journal() == []
@@ -0,0 +1,98 @@
+import pytest
+import hashlib
+import os
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import src.tokenizer
+from src.tokenizer import (
+    get_tokenizer,
+    get_encoding_cache_path,
+    bake_encoding,
+    token_upper_bound
+)
+from src.config import TOKENIZER_ENCODINGS
+
+IMPORT_BUDGET_SECONDS = 2.0
+
+@pytest.fixture
+def reset_tokenizer(monkeypatch):
+    monkeypatch.setattr(src.tokenizer, "_tokenizer", None)
+
+class TestLazyLoading:
+    def test_import_does_not_load_tokenizer(self):
+        # A fresh interpreter, so modules imported by other tests don't hide the cost
+        script = (
+            "import time\n"
+            "start = time.perf_counter()\n"
+            "import src.scraper, src.uploader, src.tokenizer\n"
+            "print(time.perf_counter() - start, src.tokenizer._tokenizer is None)\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=Path(__file__).parent.parent,
+            capture_output=True,
+            text=True,
+            check=True
+        )
+        elapsed, not_loaded = result.stdout.split()
+        
+        assert not_loaded == "True"
+        assert float(elapsed) < IMPORT_BUDGET_SECONDS
+
+    def test_loads_once_on_first_use(self, reset_tokenizer):
+        with patch("tiktoken.encoding_for_model", return_value=Mock()) as mock_load:
+            first = get_tokenizer()
+            second = get_tokenizer()
+        
+        assert first is second
+        assert mock_load.call_count == 1
+
+    def test_points_tiktoken_at_local_cache(self, reset_tokenizer, monkeypatch):
+        monkeypatch.delenv("TIKTOKEN_CACHE_DIR", raising=False)
+        
+        with patch("tiktoken.encoding_for_model", return_value=Mock()):
+            get_tokenizer()
+        
+        assert os.environ["TIKTOKEN_CACHE_DIR"] == str(src.tokenizer.TOKENIZER_CACHE_DIR)
+
+class TestBakeEncoding:
+    def test_cache_path_matches_tiktoken_naming(self, tmp_path):
+        url, _ = TOKENIZER_ENCODINGS["cl100k_base"]
+        expected = hashlib.sha1(url.encode()).hexdigest()
+        assert get_encoding_cache_path(tmp_path, "cl100k_base") == tmp_path / expected
+
+    def test_accepts_pinned_checksum(self, tmp_path, monkeypatch):
+        contents = b"bpe ranks"
+        url, _ = TOKENIZER_ENCODINGS["cl100k_base"]
+        monkeypatch.setenv("TIKTOKEN_CACHE_DIR", str(tmp_path))
+        monkeypatch.setitem(src.tokenizer.TOKENIZER_ENCODINGS, "cl100k_base", (url, hashlib.sha256(contents).hexdigest()))
+        get_encoding_cache_path(tmp_path, "cl100k_base").write_bytes(contents)
+        
+        with patch("src.tokenizer.get_tokenizer", return_value=Mock(name="encoding")) as mock_tokenizer:
+            mock_tokenizer.return_value.name = "cl100k_base"
+            assert bake_encoding() == get_encoding_cache_path(tmp_path, "cl100k_base")
+
+    def test_rejects_checksum_mismatch(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("TIKTOKEN_CACHE_DIR", str(tmp_path))
+        get_encoding_cache_path(tmp_path, "cl100k_base").write_bytes(b"tampered")
+        
+        with patch("src.tokenizer.get_tokenizer") as mock_tokenizer:
+            mock_tokenizer.return_value.name = "cl100k_base"
+            with pytest.raises(ValueError):
+                bake_encoding()
+
+    def test_rejects_encoding_without_pin(self, monkeypatch):
+        with patch("src.tokenizer.get_tokenizer") as mock_tokenizer:
+            mock_tokenizer.return_value.name = "unpinned_base"
+            with pytest.raises(ValueError, match="No pinned checksum"):
+                bake_encoding()
+
+class TestTokenUpperBound:
+    def test_upper_bound_holds(self):
+        for text in ("Hello world", "a" * 500, "Ünïcödé ✓ 文字", "def f():\n    return 1\n" * 20):
+            assert len(get_tokenizer().encode(text)) <= token_upper_bound(text)
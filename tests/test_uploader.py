@@ -12,6 +12,7 @@ from src.uploader import (
     upload_updated_articles,
     uploader
 )
+from src.helper import calculate_content_hash
 
 class TestDeleteOldFiles:
     def test_deletes_all_files_successfully(self, mock_openai_client):
@@ -102,6 +103,25 @@ class TestUploadAddedArticles:
         assert "456" in result
         assert mock_openai_client.files.create.call_count == 3
 
+    def test_maps_chunk_hashes_to_file_ids(self, mock_openai_client, sample_chunk_files):
+        added_articles = {"456": sample_chunk_files["456"]}
+        
+        result = upload_added_articles(mock_openai_client, "vs_test", added_articles)
+        
+        chunk_hash = calculate_content_hash(sample_chunk_files["456"][0].read_text(encoding='utf-8'))
+        assert result["456"] == {chunk_hash: "file-test123"}
+
+    def test_uploads_identical_chunks_once(self, mock_openai_client, temp_directories):
+        markdown_dir = temp_directories["markdown_dir"]
+        chunks = [markdown_dir / f"789-repeated-part{i}.md" for i in (1, 2)]
+        for chunk in chunks:
+            chunk.write_text("# Repeated\n\nSame content")
+        
+        result = upload_added_articles(mock_openai_client, "vs_test", {"789": chunks})
+        
+        assert mock_openai_client.files.create.call_count == 1
+        assert len(result["789"]) == 1
+
     @patch('src.uploader.BATCH_SIZE', 2)
     def test_batches_files_correctly(self, mock_openai_client, sample_chunk_files):
         file_counter = [0]
@@ -220,6 +240,45 @@ class TestUploadUpdatedArticles:
         assert "456" in result
         assert not mock_openai_client.vector_stores.files.delete.called
 
+    def test_keeps_files_of_unchanged_chunks(self, mock_openai_client, sample_chunk_files, hash_store_with_files):
+        unchanged_hash = calculate_content_hash(sample_chunk_files["123"][0].read_text(encoding='utf-8'))
+        changed_hash = calculate_content_hash(sample_chunk_files["123"][1].read_text(encoding='utf-8'))
+        hash_store_with_files["articles"]["123"]["chunk_file_ids"] = {
+            unchanged_hash: "file-old1",
+            "edited-chunk-hash": "file-old2"
+        }
+        
+        result = upload_updated_articles(
+            mock_openai_client,
+            "vs_test",
+            {"123": sample_chunk_files["123"]},
+            hash_store_with_files
+        )
+        
+        assert mock_openai_client.files.create.call_count == 1
+        mock_openai_client.vector_stores.files.delete.assert_called_once_with(
+            vector_store_id="vs_test",
+            file_id="file-old2"
+        )
+        assert result["123"] == {unchanged_hash: "file-old1", changed_hash: "file-test123"}
+
+    def test_unchanged_article_uploads_nothing(self, mock_openai_client, sample_chunk_files, hash_store_with_files):
+        hash_store_with_files["articles"]["123"]["chunk_file_ids"] = {
+            calculate_content_hash(path.read_text(encoding='utf-8')): file_id
+            for path, file_id in zip(sample_chunk_files["123"], ["file-old1", "file-old2"])
+        }
+        
+        result = upload_updated_articles(
+            mock_openai_client,
+            "vs_test",
+            {"123": sample_chunk_files["123"]},
+            hash_store_with_files
+        )
+        
+        assert not mock_openai_client.files.create.called
+        assert not mock_openai_client.vector_stores.files.delete.called
+        assert sorted(result["123"].values()) == ["file-old1", "file-old2"]
+
 class TestUploaderIntegration:
     @patch('src.uploader.OpenAI')
     @patch('src.uploader.save_hash_store')
@@ -331,6 +390,8 @@ class TestUploaderIntegration:
         saved_hash_store = mock_save.call_args[0][0]
         assert "123" in saved_hash_store["articles"]
         assert "openai_file_ids" in saved_hash_store["articles"]["123"]
+        saved_article = saved_hash_store["articles"]["123"]
+        assert list(saved_article["chunk_file_ids"].values()) == saved_article["openai_file_ids"]
 
     @patch('src.uploader.OpenAI')
     @patch('src.uploader.save_hash_store')
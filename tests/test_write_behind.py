@@ -0,0 +1,96 @@
+import pytest
+import sys
+import threading
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import archive
+from src.archive import write_behind, write_chunk, read_chunk
+from src.write_behind import WriteBehind, apply_operation
+
+class TestWriteBehind:
+    def test_writes_land_by_flush(self, tmp_path):
+        stage = WriteBehind()
+        stage.write(tmp_path / "a.md", b"first")
+        stage.write(tmp_path / "b.md", b"second")
+        stage.flush()
+        stage.close()
+
+        assert (tmp_path / "a.md").read_bytes() == b"first"
+        assert (tmp_path / "b.md").read_bytes() == b"second"
+        assert sorted(path.name for path in tmp_path.iterdir()) == ["a.md", "b.md"]
+
+    def test_coalesces_operations_on_the_same_path(self, tmp_path):
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def slow_apply(path, data):
+            calls.append((path.name, data))
+            started.set()
+            release.wait()
+            apply_operation(path, data)
+
+        with patch('src.write_behind.apply_operation', side_effect=slow_apply):
+            stage = WriteBehind()
+            stage.write(tmp_path / "a.md", b"v1")
+            started.wait()
+            stage.write(tmp_path / "a.md", b"v2")
+            stage.write(tmp_path / "a.md", b"v3")
+            stage.write(tmp_path / "gone.md", b"temporary")
+            stage.delete(tmp_path / "gone.md")
+            release.set()
+            stage.flush()
+            stage.close()
+
+        assert calls == [("a.md", b"v1"), ("a.md", b"v3"), ("gone.md", None)]
+        assert (tmp_path / "a.md").read_bytes() == b"v3"
+        assert not (tmp_path / "gone.md").exists()
+
+    def test_flush_raises_when_a_write_failed(self, tmp_path):
+        stage = WriteBehind()
+        stage.write(tmp_path / "missing-dir" / "a.md", b"lost")
+        stage.write(tmp_path / "b.md", b"kept")
+
+        with pytest.raises(OSError, match="missing-dir"):
+            stage.flush()
+        stage.close()
+        assert (tmp_path / "b.md").read_bytes() == b"kept"
+
+    def test_flush_raises_on_any_exception(self, tmp_path):
+        stage = WriteBehind()
+        stage.write(tmp_path / "a.md", "not bytes")
+        stage.write(tmp_path / "b.md", b"kept")
+
+        with pytest.raises(OSError, match="a.md"):
+            stage.flush()
+        stage.close()
+        assert (tmp_path / "b.md").read_bytes() == b"kept"
+        assert sorted(path.name for path in tmp_path.iterdir()) == ["b.md"]
+
+    def test_failed_write_leaves_no_temp_file(self, tmp_path):
+        target = tmp_path / "a.md"
+        with patch('src.write_behind.os.replace', side_effect=OSError("disk full")):
+            with pytest.raises(OSError):
+                apply_operation(target, b"data")
+        assert list(tmp_path.iterdir()) == []
+
+class TestWriteBehindBlock:
+    def test_reads_wait_for_pending_writes(self, tmp_path):
+        chunk_path = tmp_path / "1-guide-part1.md"
+        with write_behind():
+            write_chunk(chunk_path, "queued")
+            assert read_chunk(chunk_path) == b"queued"
+        assert archive._write_behind is None
+
+    def test_exception_drops_queued_writes(self, tmp_path):
+        with pytest.raises(RuntimeError):
+            with write_behind() as stage:
+                stage.close()
+                write_chunk(tmp_path / "1-guide-part1.md", "never written")
+                raise RuntimeError("processing failed")
+
+        assert archive._write_behind is None
+        assert not (tmp_path / "1-guide-part1.md").exists()
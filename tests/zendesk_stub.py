@@ -0,0 +1,120 @@
+import json
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs, urlencode
+
+# Offline stand-in for the Help Center endpoints the scraper talks to:
+#   GET /api/v2/help_center/en-us/articles?per_page=&page=[&sort_by=updated_at&sort_order=]
+#   GET /api/v2/help_center/incremental/articles?start_time=[&cursor=]
+
+def to_timestamp(updated_at):
+    return int(datetime.fromisoformat(updated_at.replace('Z', '+00:00')).timestamp())
+
+class ZendeskStub:
+    def __init__(self, articles, page_size=2):
+        self.articles = list(articles)
+        self.page_size = page_size
+        self.ignore_sort = False
+        self.requests = []
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self.make_handler())
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}/api/v2/help_center"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def update_article(self, article_id, **fields):
+        for article in self.articles:
+            if article["id"] == article_id:
+                article.update(fields)
+
+    def list_articles(self, query):
+        per_page = int(query.get("per_page", ["30"])[0])
+        page = int(query.get("page", ["1"])[0])
+        page_count = max(1, -(-len(self.articles) // per_page))
+        start = (page - 1) * per_page
+        
+        articles = self.articles
+        sort = {}
+        if query.get("sort_by", [None])[0] == "updated_at" and not self.ignore_sort:
+            sort_order = query.get("sort_order", ["asc"])[0]
+            articles = sorted(articles, key=lambda a: to_timestamp(a["updated_at"]), reverse=sort_order == "desc")
+            sort = {"sort_by": "updated_at", "sort_order": sort_order}
+        
+        next_page = None
+        if page < page_count:
+            next_page = f"{self.base_url}/en-us/articles?{urlencode({'per_page': per_page, 'page': page + 1, **sort})}"
+        
+        return 200, {
+            "articles": articles[start:start + per_page],
+            "page": page,
+            "per_page": per_page,
+            "page_count": page_count,
+            "count": len(self.articles),
+            "next_page": next_page
+        }
+
+    def export_articles(self, query, authorized):
+        if not authorized:
+            return 401, {"error": "Couldn't authenticate you"}
+        
+        start_time = int(query.get("start_time", ["0"])[0])
+        
+        # The cursor is the (updated_at, id) of the last article handed out
+        cursor = query.get("cursor", [None])[0]
+        after = tuple(int(part) for part in cursor.split(":")) if cursor else (start_time, -1)
+        
+        matching = sorted(
+            (a for a in self.articles if to_timestamp(a["updated_at"]) >= start_time),
+            key=lambda a: (to_timestamp(a["updated_at"]), a["id"])
+        )
+        remaining = [a for a in matching if (to_timestamp(a["updated_at"]), a["id"]) > after]
+        page_articles = remaining[:self.page_size]
+        
+        if page_articles:
+            last = page_articles[-1]
+            after = (to_timestamp(last["updated_at"]), last["id"])
+        next_cursor = f"{after[0]}:{after[1]}"
+        
+        return 200, {
+            "articles": page_articles,
+            "count": len(page_articles),
+            "end_time": after[0],
+            "after_cursor": next_cursor,
+            "after_url": f"{self.base_url}/incremental/articles?{urlencode({'start_time': start_time, 'cursor': next_cursor})}",
+            "end_of_stream": len(remaining) <= self.page_size
+        }
+
+    def make_handler(self):
+        stub = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                query = parse_qs(parts.query)
+                stub.requests.append(self.path)
+                
+                if parts.path.endswith("/incremental/articles"):
+                    status, payload = stub.export_articles(query, "Authorization" in self.headers)
+                elif parts.path.endswith("/en-us/articles"):
+                    status, payload = stub.list_articles(query)
+                else:
+                    status, payload = 404, {"error": "Not found"}
+                
+                body = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+        
+        return Handler